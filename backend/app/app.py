@@ -1,9 +1,16 @@
-from flask import Flask, redirect, request, make_response, send_from_directory
+from flask import Flask, abort, redirect, request, make_response
 from flasgger import Swagger
 from .config import settings
 from .extensions import db, migrate, jwt, cors
 from app.config import Config
 from .core.storage import _safe_prefix
+from .core.cache import response_cache
+from .core.etag import register_conditional_get
+from .core.timing import register_request_timing
+from .core.metrics import instrument_engine, register_metrics
+from .core.query_budget import register_query_budget
+from .core import slow_queries
+from .core.profiler import register_profiler
 
 
     # --- Blueprints ---
@@ -63,6 +70,36 @@ def create_app() -> Flask:
     app.config["STORAGE_ROOT"] = str(settings.STORAGE_ROOT)
     app.config["MEDIA_URL_PREFIX"] = settings.MEDIA_URL_PREFIX
     app.config["PROTECT_MEDIA"] = settings.PROTECT_MEDIA
+    app.config["FILE_DELIVERY"] = settings.FILE_DELIVERY
+    app.config["FILE_ACCEL_PREFIX"] = settings.FILE_ACCEL_PREFIX
+    app.config["RESPONSE_CACHE_ENABLED"] = settings.RESPONSE_CACHE_ENABLED
+    app.config["RESPONSE_CACHE_TTL"] = settings.RESPONSE_CACHE_TTL
+    app.config["RESPONSE_CACHE_MAX_ENTRIES"] = settings.RESPONSE_CACHE_MAX_ENTRIES
+    app.config["RESPONSE_CACHE_MAX_BYTES"] = settings.RESPONSE_CACHE_MAX_BYTES
+    app.config["RESPONSE_CACHE_SHARED_PATH"] = settings.RESPONSE_CACHE_SHARED_PATH
+    app.config["RESPONSE_CACHE_SINGLE_PROCESS"] = settings.RESPONSE_CACHE_SINGLE_PROCESS
+    app.config["TEXT_EXTRACT_ENABLED"] = settings.TEXT_EXTRACT_ENABLED
+    app.config["TEXT_EXTRACT_WORKERS"] = settings.TEXT_EXTRACT_WORKERS
+    app.config["TEXT_EXTRACT_MAX_CHARS"] = settings.TEXT_EXTRACT_MAX_CHARS
+    app.config["UPLOAD_CHUNK_SIZE"] = settings.UPLOAD_CHUNK_SIZE
+    app.config["UPLOAD_MAX_SIZE"] = settings.UPLOAD_MAX_SIZE
+    app.config["UPLOAD_SESSION_TTL"] = settings.UPLOAD_SESSION_TTL
+    app.config["PREVIEW_WORKERS"] = settings.PREVIEW_WORKERS
+    app.config["PREVIEW_CACHE_MAX_BYTES"] = settings.PREVIEW_CACHE_MAX_BYTES
+    app.config["PREVIEW_TIMEOUT"] = settings.PREVIEW_TIMEOUT
+    app.config["REQUEST_TIMING_ENABLED"] = settings.REQUEST_TIMING_ENABLED
+    app.config["REQUEST_TIMING_LOG_MIN_MS"] = settings.REQUEST_TIMING_LOG_MIN_MS
+    app.config["METRICS_ENABLED"] = settings.METRICS_ENABLED
+    app.config["METRICS_TOKEN"] = settings.METRICS_TOKEN
+    app.config["QUERY_BUDGET_MODE"] = settings.QUERY_BUDGET_MODE
+    app.config["QUERY_BUDGET_DEFAULT"] = settings.QUERY_BUDGET_DEFAULT
+    app.config["QUERY_BUDGET_MAX_REPEAT"] = settings.QUERY_BUDGET_MAX_REPEAT
+    app.config["SLOW_QUERY_MS"] = settings.SLOW_QUERY_MS
+    app.config["SLOW_QUERY_BUFFER"] = settings.SLOW_QUERY_BUFFER
+    app.config["SLOW_QUERY_EXPLAIN"] = settings.SLOW_QUERY_EXPLAIN
+    app.config["PROFILER_ENABLED"] = settings.PROFILER_ENABLED
+    app.config["PROFILE_INTERVAL_MS"] = settings.PROFILE_INTERVAL_MS
+    app.config["PROFILE_KEEP"] = settings.PROFILE_KEEP
 
     # Évite les redirections 308 entre /path et /path/
     app.url_map.strict_slashes = False
@@ -97,9 +134,17 @@ def create_app() -> Flask:
         from app.routes.commandes import bp_commandes
         from app.routes.soumissionnaires import  bp_soumissionnaires
         from .routes.transactions_1 import bp_transactions
-        from .routes.document_1 import bp_doc_crud, bp_doc_utils,bp_doc_events,bp_storage
+        from .routes.document_1 import bp_doc_crud, bp_doc_utils,bp_doc_events,bp_storage, bp_doc_projects
         from .routes.evenement import bp_evenement
         from .routes.auth import auth_bp
+        from .routes.search import bp_search
+        from .routes.admin import bp_admin
+        from .core.counters import register_cli as register_counters_cli
+        from .core.rollup import register_cli as register_rollup_cli
+        from .core.search import register_cli as register_search_cli
+        from .core.extract import register_cli as register_extract_cli
+        from .core.uploads import register_cli as register_uploads_cli
+        from .core.scrub import register_cli as register_scrub_cli
 
     cors.init_app(
         app,
@@ -107,8 +152,8 @@ def create_app() -> Flask:
             r"/api/*": {
                 "origins": ALLOWED_ORIGINS,
                 "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-                "allow_headers": ["Content-Type", "Authorization", "Accept"],
-                "expose_headers": ["Content-Disposition"],
+                "allow_headers": ["Content-Type", "Authorization", "Accept", "X-Profile"],
+                "expose_headers": ["Content-Disposition", "ETag", "X-Profile-Id", "X-Profile-Url"],
                 "supports_credentials": True,
                 "max_age": 86400,
             }
@@ -117,6 +162,22 @@ def create_app() -> Flask:
 
     jwt.init_app(app)
 
+    response_cache.init_app(app)
+    register_conditional_get(app)
+    register_request_timing(app)
+    register_query_budget(app)
+    slow_queries.configure(app)
+    register_metrics(app)
+    register_profiler(app)
+    with app.app_context():
+        instrument_engine(db.engine)
+    register_counters_cli(app)
+    register_rollup_cli(app)
+    register_search_cli(app)
+    register_extract_cli(app)
+    register_uploads_cli(app)
+    register_scrub_cli(app)
+
     Swagger(app, template=SWAGGER_TEMPLATE)
 
     @app.before_request
@@ -148,10 +209,13 @@ def create_app() -> Flask:
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(bp_evenement)
+    app.register_blueprint(bp_search)
+    app.register_blueprint(bp_admin)
     app.register_blueprint(bp_doc_events)
     app.register_blueprint(bp_doc_crud)
     app.register_blueprint(bp_doc_utils)
     app.register_blueprint(bp_storage)
+    app.register_blueprint(bp_doc_projects)
     app.register_blueprint(bp_transactions)
     app.register_blueprint(bp_commandes)
     app.register_blueprint(bp_soumissionnaires)
@@ -182,15 +246,11 @@ def create_app() -> Flask:
     @app.get(media_prefix + "/<path:rel>")
     def _serve_media(rel: str):
         # settings.STORAGE_ROOT pointe vers le dossier "storage"
-        from .core.storage import fs_path
-        # send_from_directory veut un dossier + le fichier relatif à ce dossier
-        # On découpe pour rester simple
-        from pathlib import Path
-        abs_path = fs_path(rel)
-        root = Path(settings.STORAGE_ROOT).resolve()
-        # calcul du "relatif" par rapport au root
-        rel_from_root = abs_path.relative_to(root)
-        return send_from_directory(str(root), str(rel_from_root).replace("\\", "/"))
+        from .core.delivery import send_stored, stored_path
+        abs_path = stored_path(rel)
+        if abs_path is None:
+            abort(404)
+        return send_stored(abs_path)
 
 
     # --------- Blueprints --------------------------
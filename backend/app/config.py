@@ -1,5 +1,5 @@
 # app/config.py
-from typing import List, Optional, ClassVar
+from typing import List, Literal, Optional, ClassVar
 from pathlib import Path
 import os
 
@@ -42,6 +42,55 @@ class Settings(BaseSettings):
 
     MEDIA_URL_PREFIX: str = os.getenv("MEDIA_URL_PREFIX", "/media")
     PROTECT_MEDIA: bool = False
+    # qui envoie les octets : "direct" (Flask), "x-accel" (nginx) ou "x-sendfile" (Apache)
+    FILE_DELIVERY: Literal["direct", "x-accel", "x-sendfile"] = "direct"
+    FILE_ACCEL_PREFIX: str = "/_protected_storage"        # location nginx `internal` -> STORAGE_ROOT
+
+    # ----- Cache des réponses GET (app/core/cache.py) -----
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: int = 60                          # secondes
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_SHARED_PATH: Optional[str] = None      # fichier SQLite partagé entre workers (requis avec gunicorn -w N)
+    RESPONSE_CACHE_SINGLE_PROCESS: bool = False           # sans fichier partagé : cache local, un seul processus (dev, waitress)
+
+    # ----- Extraction du texte des fichiers (app/core/extract.py) -----
+    TEXT_EXTRACT_ENABLED: bool = True                     # extraction après chaque écriture de document
+    TEXT_EXTRACT_WORKERS: int = 2                         # taille du pool de processus
+    TEXT_EXTRACT_MAX_CHARS: int = 2_000_000               # texte indexé par fichier
+
+    # ----- Téléversements reprenables (app/core/uploads.py) -----
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024              # taille de morceau par défaut
+    UPLOAD_MAX_SIZE: int = 2 * 1024 * 1024 * 1024
+    UPLOAD_SESSION_TTL: int = 24 * 3600                   # secondes sans activité avant purge
+
+    # ----- Aperçus / vignettes (app/core/previews.py) -----
+    PREVIEW_WORKERS: int = 2                              # taille du pool de rendu
+    PREVIEW_CACHE_MAX_BYTES: int = 512 * 1024 * 1024      # budget disque du cache (LRU)
+    PREVIEW_TIMEOUT: int = 20                             # secondes d'attente d'un rendu avant 503
+
+    # ----- Mesures par requête (app/core/timing.py) -----
+    REQUEST_TIMING_ENABLED: bool = True                   # Server-Timing + ligne de log par requête
+    REQUEST_TIMING_LOG_MIN_MS: float = 0                  # ne journaliser que les requêtes plus lentes
+
+    # ----- Métriques Prometheus (app/core/metrics.py) -----
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None                   # si défini : Authorization: Bearer <token> sur /metrics
+
+    # ----- Budget de requêtes par endpoint (app/core/query_budget.py) -----
+    QUERY_BUDGET_MODE: Literal["off", "warn", "raise"] = "off"   # warn en préproduction, raise en CI
+    QUERY_BUDGET_DEFAULT: int = 30                        # routes sans @query_budget
+    QUERY_BUDGET_MAX_REPEAT: int = 8                      # même forme de requête au-delà : N+1 probable
+
+    # ----- Journal des requêtes lentes (app/core/slow_queries.py) -----
+    SLOW_QUERY_MS: float = 200                            # seuil ; <= 0 désactive
+    SLOW_QUERY_BUFFER: int = 200                          # entrées gardées par worker
+    SLOW_QUERY_EXPLAIN: bool = True                       # EXPLAIN des SELECT lents (connexion séparée)
+
+    # ----- Profil à la demande, en-tête X-Profile (app/core/profiler.py) -----
+    PROFILER_ENABLED: bool = True                         # réservé aux jetons role=admin
+    PROFILE_INTERVAL_MS: float = 5                        # période d'échantillonnage
+    PROFILE_KEEP: int = 50                                # profils gardés sous <instance_path>/profiles
 
 
 # instance prête à l’emploi
@@ -0,0 +1,117 @@
+# app/core/blobs.py
+"""
+Stockage adressé par contenu des fichiers téléversés.
+
+Le fichier est haché (SHA-256) pendant sa copie dans un fichier temporaire
+sous STORAGE_ROOT/.tmp, puis renommé atomiquement en
+
+    STORAGE_ROOT/blobs/<sha[0:2]>/<sha[2:4]>/<sha><ext>
+
+Si ce blob existe déjà, le temporaire est simplement supprimé (et la date
+de modification du blob rafraîchie) : un fichier identique n'est stocké qu'une fois, sans sonder base.ext, base-2.ext, ...
+et sans course entre workers (deux renommages du même contenu donnent le
+même fichier).
+
+Le chemin relatif renvoyé ("/storage/blobs/...") se résout avec fs_path /
+public_url comme les anciens fichiers. La table stored_file garde, par
+téléversement, le nom d'origine et le nom logique pointant vers le blob.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.files_ import _slugify_base
+from app.core.storage import fs_path
+from app.models.stored_file import StoredFile  # noqa: F401 (table connue de Flask-Migrate)
+
+BLOB_DIR = "blobs"
+_CHUNK = 1024 * 1024
+_EXT_RE = re.compile(r"^(\.[a-z0-9]{1,8}){1,2}$")
+
+
+class Blob(NamedTuple):
+    sha256: str
+    size: int
+    rel: str          # relatif à STORAGE_ROOT, ex: "blobs/ab/cd/abcd…ef.pdf"
+    created: bool     # False : contenu déjà présent (dédupliqué)
+
+
+def safe_ext(filename: Optional[str]) -> str:
+    """Extension(s) en minuscules ('.pdf', '.tar.gz'), '' si douteuse."""
+    ext = "".join(Path(filename or "").suffixes[-2:]).lower()
+    return ext if _EXT_RE.match(ext) else ""
+
+
+def blob_rel(sha256: str, ext: str = "") -> str:
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def tmp_dir(*parts: str) -> Path:
+    """Répertoire de travail sous STORAGE_ROOT/.tmp (même volume : renommage atomique)."""
+    d = Path(settings.STORAGE_ROOT).resolve().joinpath(".tmp", *parts)
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def finalize(tmp_name: str, sha256: str, size: int, filename: Optional[str]) -> Blob:
+    """Renomme atomiquement un temporaire déjà haché en blob (ou le jette si déjà présent)."""
+    rel = blob_rel(sha256, safe_ext(filename))
+    final = fs_path(rel)
+    if final.exists():
+        try:
+            # l'âge d'un blob orphelin (storage-scrub) repart de ce téléversement
+            os.utime(final)
+        except FileNotFoundError:
+            pass          # supprimé entre-temps : on le recrée ci-dessous
+        else:
+            os.unlink(tmp_name)
+            return Blob(sha256, size, rel, False)
+    final.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_name, final)
+    return Blob(sha256, size, rel, True)
+
+
+def store_stream(stream: BinaryIO, filename: Optional[str]) -> Blob:
+    """Copie `stream` dans le stockage en le hachant au passage ; mémoire constante."""
+    h = hashlib.sha256()
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(dir=tmp_dir(), prefix="up-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for block in iter(lambda: stream.read(_CHUNK), b""):
+                h.update(block)
+                out.write(block)
+                size += len(block)
+            out.flush()
+            os.fsync(out.fileno())
+        return finalize(tmp_name, h.hexdigest(), size, filename)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def add_reference(session: Session, blob: Blob, original_name: Optional[str], mime_type: Optional[str]) -> str:
+    """Enregistre le téléversement dans stored_file ; retourne le chemin pour document.chemin. Pas de commit."""
+    chemin = "/storage/" + blob.rel
+    base = _slugify_base(original_name or "")
+    session.execute(text("""
+        INSERT INTO stored_file (sha256, size, chemin, nom_original, nom_logique, mime_type, created_at)
+        VALUES (:sha, :size, :chemin, :orig, :logique, :mime, :at)
+    """), {
+        "sha": blob.sha256, "size": blob.size, "chemin": chemin,
+        "orig": (original_name or "")[:255] or None,
+        "logique": f"{base}{safe_ext(original_name)}"[:150],
+        "mime": mime_type, "at": datetime.utcnow(),
+    })
+    return chemin
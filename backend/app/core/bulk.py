@@ -0,0 +1,137 @@
+# app/core/bulk.py
+"""
+Créations en lot (POST .../bulk).
+
+Corps : tableau JSON d'objets (ou {"items": [...]}), au plus MAX_ROWS lignes.
+- ?mode=atomic (défaut) : tout ou rien ; la moindre ligne invalide -> 400,
+  rien n'est inséré ;
+- ?mode=partial : les lignes valides sont insérées, les autres sont signalées.
+
+Toutes les lignes sont validées avant la première écriture (FK comprises, en
+une requête pour tout le lot), puis insérées par paquets de CHUNK_SIZE avec
+executemany, dans une seule transaction.
+
+Réponse : {"mode", "created", "failed", "results": [{"index", "id", "error"}]}
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import jsonify, request
+from sqlalchemy import TextClause
+from sqlalchemy.orm import Session
+from werkzeug.exceptions import BadRequest
+
+from app.core.fk import FkRef, missing_fk_values
+
+MAX_ROWS = 1000
+CHUNK_SIZE = 200
+
+
+def read_items() -> List[Any]:
+    body = request.get_json(silent=True)
+    if isinstance(body, dict):
+        body = body.get("items")
+    if not isinstance(body, list):
+        raise BadRequest(description="Un tableau JSON (ou {\"items\": [...]}) est attendu.")
+    if len(body) > MAX_ROWS:
+        raise BadRequest(description=f"Au plus {MAX_ROWS} lignes par lot.")
+    return body
+
+
+def read_mode() -> str:
+    mode = request.args.get("mode", "atomic")
+    if mode not in ("atomic", "partial"):
+        raise BadRequest(description="mode doit être 'atomic' ou 'partial'.")
+    return mode
+
+
+def prepare_rows(items: List[Any], prepare: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 errors: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+    """
+    Applique `prepare` (validation + normalisation d'une ligne, lève BadRequest)
+    à chaque élément ; remplit `errors` et retourne {index: ligne prête}.
+    """
+    rows: Dict[int, Dict[str, Any]] = {}
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[i] = "Objet JSON attendu."
+            continue
+        try:
+            rows[i] = prepare(dict(item))
+        except BadRequest as e:
+            errors[i] = e.description
+    return rows
+
+
+def check_fks(session: Session, rows: Dict[int, Dict[str, Any]],
+              refs_of: Callable[[Dict[str, Any]], List[FkRef]], errors: Dict[int, str]) -> None:
+    """Vérifie les FK de tout le lot en une requête ; retire les lignes fautives de `rows`."""
+    refs = {i: refs_of(row) for i, row in rows.items()}
+    missing = missing_fk_values(session, (r for lst in refs.values() for r in lst))
+    if not missing:
+        return
+    for i, lst in refs.items():
+        bad = [r.detail for r in lst if r.value is not None and (r.table, r.column, str(r.value)) in missing]
+        if bad:
+            errors[i] = " ".join(bad)
+            del rows[i]
+
+
+def insert_chunks(session: Session, sql: TextClause, rows: List[Dict[str, Any]],
+                  chunk_size: int = CHUNK_SIZE) -> List[int]:
+    """
+    executemany par paquets ; PyMySQL réécrit chaque paquet en un seul
+    INSERT multi-lignes. InnoDB attribue des ids consécutifs à un INSERT
+    multi-lignes (« simple insert ») : id = premier id + rang dans le paquet.
+    Si le pilote ne renvoie pas d'id après executemany, les ids valent None.
+    """
+    ids: List[Optional[int]] = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        first = session.execute(sql, chunk).lastrowid
+        if first:
+            ids.extend(range(int(first), int(first) + len(chunk)))
+        else:
+            ids.extend([None] * len(chunk))
+    return ids
+
+
+def respond(mode: str, n_items: int, ids: Dict[int, Optional[int]], errors: Dict[int, str]):
+    results = [
+        {"index": i, "id": ids.get(i), "error": errors.get(i)}
+        for i in range(n_items)
+    ]
+    payload = {"mode": mode, "created": len(ids), "failed": len(errors), "results": results}
+    if errors and mode == "atomic":
+        return jsonify(payload), 400
+    return jsonify(payload), 201 if ids else 200
+
+
+def run_bulk(session: Session, sql: TextClause,
+             prepare: Callable[[Dict[str, Any]], Dict[str, Any]],
+             refs_of: Optional[Callable[[Dict[str, Any]], List[FkRef]]] = None,
+             after_insert: Optional[Callable[[List[Dict[str, Any]], List[Optional[int]]], None]] = None):
+    """
+    Enchaîne lecture, validation, insertion et réponse pour un endpoint /bulk.
+    `after_insert(rows, ids)` s'exécute avant le commit (compteurs, index...).
+    """
+    mode = read_mode()
+    items = read_items()
+    errors: Dict[int, str] = {}
+    rows = prepare_rows(items, prepare, errors)
+    if refs_of is not None and rows:
+        check_fks(session, rows, refs_of, errors)
+
+    if errors and mode == "atomic":
+        return respond(mode, len(items), {}, errors)
+
+    order = sorted(rows)
+    ids: Dict[int, Optional[int]] = {}
+    if order:
+        new_ids = insert_chunks(session, sql, [rows[i] for i in order])
+        ids = dict(zip(order, new_ids))
+        if after_insert is not None:
+            after_insert([rows[i] for i in order], new_ids)
+        session.commit()
+    return respond(mode, len(items), ids, errors)
@@ -0,0 +1,244 @@
+# app/core/cache.py
+"""
+Cache des réponses GET, invalidé par versions de tables.
+
+Chaque blueprint déclare les tables qu'il lit et celles qu'il écrit :
+
+    response_cache.reads(bp_commandes, "commande", "procedure_table", "projet")
+    response_cache.writes(bp_commandes, "commande", "procedure_table")
+
+- lecture : clé = chemin + query string + version de chaque table lue ;
+- écriture (POST/PUT/PATCH/DELETE réussi) : la version des tables écrites est
+  incrémentée, les anciennes clés ne sont donc plus jamais servies (elles
+  sortent ensuite de la LRU ou expirent).
+
+Niveau 1 : LRU en mémoire (TTL + bornes en entrées et en octets).
+Niveau 2 (RESPONSE_CACHE_SHARED_PATH) : fichier SQLite partagé par les
+workers d'une même machine ; les versions y sont alors stockées aussi, pour
+qu'une écriture traitée par un worker invalide les autres. Sans ce fichier,
+les versions restent propres au processus : le cache n'est alors actif que
+si RESPONSE_CACHE_SINGLE_PROCESS=true (serveur de dev, waitress), sinon
+d'autres workers serviraient (et valideraient en 304) un JSON périmé.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from flask import Response, g, request
+
+from app.core.etag import body_etag
+
+_WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class Entry(NamedTuple):
+    body: bytes
+    mimetype: str
+    expires: float
+    etag: str
+
+
+class LRUCache:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry.expires < time.time():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Entry) -> None:
+        # une réponse énorme viderait tout le cache : on ne la garde pas
+        if len(entry.body) > self.max_bytes // 8:
+            return
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = entry
+            self.size += len(entry.body)
+            while self._data and (len(self._data) > self.max_entries or self.size > self.max_bytes):
+                self._pop(next(iter(self._data)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._data.pop(key)
+        self.size -= len(entry.body)
+
+
+class SqliteBackend:
+    """Cache partagé dans un fichier SQLite (une connexion par thread)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (k TEXT PRIMARY KEY, body BLOB, mimetype TEXT, expires REAL, etag TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS versions (t TEXT PRIMARY KEY, v INTEGER NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Entry]:
+        row = self._conn().execute(
+            "SELECT body, mimetype, expires, etag FROM cache WHERE k = ? AND expires >= ?", (key, time.time())
+        ).fetchone()
+        return Entry(bytes(row[0]), row[1], row[2], row[3]) if row else None
+
+    def set(self, key: str, entry: Entry) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (k, body, mimetype, expires, etag) VALUES (?, ?, ?, ?, ?)",
+            (key, entry.body, entry.mimetype, entry.expires, entry.etag),
+        )
+        conn.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+
+    def versions(self, tables: Iterable[str]) -> Dict[str, int]:
+        tables = list(tables)
+        marks = ",".join("?" * len(tables))
+        rows = self._conn().execute(f"SELECT t, v FROM versions WHERE t IN ({marks})", tables).fetchall()
+        return dict(rows)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        self._conn().executemany(
+            "INSERT INTO versions (t, v) VALUES (?, 1) ON CONFLICT(t) DO UPDATE SET v = v + 1",
+            [(t,) for t in tables],
+        )
+
+
+class ResponseCache:
+    def __init__(self):
+        self.enabled = False
+        self.ttl = 60
+        self.lru: Optional[LRUCache] = None
+        self.shared: Optional[SqliteBackend] = None
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.enabled = bool(app.config.get("RESPONSE_CACHE_ENABLED", True))
+        self.ttl = int(app.config.get("RESPONSE_CACHE_TTL", 60))
+        self.lru = LRUCache(
+            int(app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 2048)),
+            int(app.config.get("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+        )
+        path = app.config.get("RESPONSE_CACHE_SHARED_PATH")
+        self.shared = SqliteBackend(str(path)) if path else None
+        if self.enabled and self.shared is None and not app.config.get("RESPONSE_CACHE_SINGLE_PROCESS", False):
+            # versions locales : une écriture n'invaliderait que le worker qui l'a traitée
+            self.enabled = False
+            app.logger.warning(
+                "Cache des réponses désactivé : RESPONSE_CACHE_SHARED_PATH n'est pas défini "
+                "(ou RESPONSE_CACHE_SINGLE_PROCESS=true pour un seul processus)"
+            )
+
+    # ---------- versions ----------
+    def versions(self, tables: Iterable[str]) -> Dict[str, int]:
+        tables = sorted(set(tables))
+        if self.shared is not None:
+            found = self.shared.versions(tables)
+            return {t: found.get(t, 0) for t in tables}
+        with self._lock:
+            return {t: self._versions.get(t, 0) for t in tables}
+
+    def bump(self, *tables: str) -> None:
+        with self._lock:
+            for t in tables:
+                self._versions[t] = self._versions.get(t, 0) + 1
+        if self.shared is not None:
+            self.shared.bump(tables)
+
+    def clear(self) -> None:
+        if self.lru is not None:
+            self.lru.clear()
+
+    # ---------- clés ----------
+    @staticmethod
+    def _key(tables: Dict[str, int]) -> str:
+        args = urlencode(sorted(request.args.items(multi=True)))
+        ver = ",".join(f"{t}:{v}" for t, v in tables.items())
+        return f"{request.path}?{args}#{ver}"
+
+    def _get(self, key: str) -> Optional[Entry]:
+        entry = self.lru.get(key)
+        if entry is None and self.shared is not None:
+            entry = self.shared.get(key)
+            if entry is not None:
+                self.lru.set(key, entry)
+        return entry
+
+    def _set(self, key: str, entry: Entry) -> None:
+        self.lru.set(key, entry)
+        if self.shared is not None:
+            self.shared.set(key, entry)
+
+    # ---------- déclarations par blueprint ----------
+    def reads(self, bp, *tables: str) -> None:
+        """Met en cache les réponses JSON 200 des GET de `bp` (dépendant de `tables`)."""
+
+        @bp.before_request
+        def _cache_lookup():
+            if not self.enabled or request.method != "GET":
+                return None
+            if "_profile" in g:
+                return None      # requête profilée (app/core/profiler.py) : exécuter le handler
+            key = self._key(self.versions(tables))
+            entry = self._get(key)
+            if entry is not None:
+                # hit : ni requête SQL ni sérialisation ; 304 si le client a déjà ce corps
+                g._cache_hit = True
+                resp = Response(entry.body, mimetype=entry.mimetype)
+                resp.set_etag(entry.etag)
+                resp.headers["X-Cache"] = "HIT"
+                return resp.make_conditional(request)
+            g._cache_key = key
+            return None
+
+        @bp.after_request
+        def _cache_store(resp):
+            key = g.pop("_cache_key", None)
+            if key is None or getattr(g, "_cache_hit", False):
+                return resp
+            if (resp.status_code == 200 and resp.mimetype == "application/json"
+                    and not resp.is_streamed and not resp.direct_passthrough):
+                body = resp.get_data()
+                etag = body_etag(body)
+                resp.set_etag(etag)
+                self._set(key, Entry(body, resp.mimetype, time.time() + self.ttl, etag))
+                resp.headers["X-Cache"] = "MISS"
+            return resp
+
+    def writes(self, bp, *tables: str) -> None:
+        """Incrémente la version de `tables` après chaque écriture réussie de `bp`."""
+
+        @bp.after_request
+        def _cache_bump(resp):
+            if request.method in _WRITE_METHODS and resp.status_code < 400:
+                self.bump(*tables)
+            return resp
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,120 @@
+# app/core/counters.py
+"""
+Compteurs dénormalisés (nb_archives, nb_soumissions, ...).
+
+Les listes lisaient ces nombres via LEFT JOIN + GROUP BY sur chaque ligne ;
+ils sont désormais stockés dans la table parente et ajustés dans la même
+transaction que l'INSERT / DELETE / UPDATE de la ligne enfant.
+
+    bump("soumission", {"idcommande": 5, "idsoumissionnaire": 2}, +1)
+    move("commande", old_row, new_row)      # FK modifiée par un UPDATE
+
+`flask counters-repair` recalcule tout (après import SQL, écriture hors API...).
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Mapping, NamedTuple
+
+import click
+from sqlalchemy import event, text
+
+from app.extensions import db
+
+
+class Counter(NamedTuple):
+    parent: str      # table portant le compteur
+    pk: str          # clé primaire du parent
+    column: str      # colonne compteur
+    child: str       # table comptée
+    fk: str          # FK (child -> parent)
+
+
+COUNTERS = (
+    Counter("document",        "iddocument",        "nb_archives",    "archive",    "iddocument"),
+    Counter("evenement",       "idevenement",       "nb_documents",   "archive",    "idevenement"),
+    Counter("commande",        "idcommande",        "nb_soumissions", "soumission", "idcommande"),
+    Counter("soumissionnaire", "idsoumissionnaire", "nb_soumissions", "soumission", "idsoumissionnaire"),
+    Counter("procedure_table", "idprocedure",       "nb_commandes",   "commande",   "idprocedure"),
+)
+
+
+def _apply(conn, c: Counter, parent_id: Any, delta: int) -> None:
+    conn.execute(
+        text(f"UPDATE {c.parent} SET {c.column} = {c.column} + :d WHERE {c.pk} = :id"),
+        {"d": delta, "id": parent_id},
+    )
+
+
+def bump(child: str, row: Mapping[str, Any], delta: int, conn=None) -> None:
+    """Ajuste (+delta) les compteurs des parents référencés par `row` (ligne de `child`)."""
+    conn = conn if conn is not None else db.session
+    for c in COUNTERS:
+        if c.child == child and row.get(c.fk) is not None:
+            _apply(conn, c, row[c.fk], delta)
+
+
+def bump_many(child: str, rows: Iterable[Mapping[str, Any]], sign: int = +1) -> None:
+    """Comme bump(), pour un lot : une seule mise à jour par parent distinct."""
+    for c in COUNTERS:
+        if c.child != child:
+            continue
+        deltas: Dict[Any, int] = {}
+        for row in rows:
+            if row.get(c.fk) is not None:
+                deltas[row[c.fk]] = deltas.get(row[c.fk], 0) + sign
+        for parent_id, delta in deltas.items():
+            _apply(db.session, c, parent_id, delta)
+
+
+def move(child: str, old: Mapping[str, Any], new: Mapping[str, Any]) -> None:
+    """UPDATE d'une ligne enfant : déplace le compte si une FK a changé."""
+    for c in COUNTERS:
+        if c.child != child or old.get(c.fk) == new.get(c.fk):
+            continue
+        if old.get(c.fk) is not None:
+            _apply(db.session, c, old[c.fk], -1)
+        if new.get(c.fk) is not None:
+            _apply(db.session, c, new[c.fk], +1)
+
+
+def recompute_all() -> None:
+    """Recalcule chaque compteur depuis les tables enfants (pas de commit)."""
+    for c in COUNTERS:
+        db.session.execute(text(
+            f"UPDATE {c.parent} SET {c.column} = "
+            f"(SELECT COUNT(*) FROM {c.child} x WHERE x.{c.fk} = {c.parent}.{c.pk})"
+        ))
+
+
+# Les archives ne sont pas écrites en SQL brut par l'API : on suit les
+# écritures ORM pour rester cohérent (le reste est rattrapé par counters-repair).
+def _register_archive_listeners() -> None:
+    from app.models.archive import Archive
+
+    if event.contains(Archive, "after_insert", _archive_inserted):
+        return
+    event.listen(Archive, "after_insert", _archive_inserted)
+    event.listen(Archive, "after_delete", _archive_deleted)
+
+
+def _archive_row(target) -> dict:
+    return {"iddocument": target.iddocument, "idevenement": target.idevenement}
+
+
+def _archive_inserted(mapper, connection, target):
+    bump("archive", _archive_row(target), +1, connection)
+
+
+def _archive_deleted(mapper, connection, target):
+    bump("archive", _archive_row(target), -1, connection)
+
+
+def register_cli(app) -> None:
+    _register_archive_listeners()
+
+    @app.cli.command("counters-repair")
+    def counters_repair_cmd():
+        """Recalcule nb_archives / nb_documents / nb_soumissions / nb_commandes."""
+        recompute_all()
+        db.session.commit()
+        click.echo("✔ Compteurs recalculés")
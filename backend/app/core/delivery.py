@@ -0,0 +1,116 @@
+# app/core/delivery.py
+"""
+Envoi des fichiers stockés sous STORAGE_ROOT.
+
+FILE_DELIVERY choisit qui lit les octets :
+
+- "direct"     : Flask/gunicorn (send_file conditionnel : ETag, 304 et
+                 Range/206 pour les lecteurs PDF qui chargent par morceaux) ;
+- "x-accel"    : nginx, via l'en-tête X-Accel-Redirect vers une location
+                 interne (FILE_ACCEL_PREFIX) ; le worker répond aussitôt ;
+- "x-sendfile" : Apache (mod_xsendfile) / lighttpd, via X-Sendfile (chemin disque).
+
+Exemple nginx pour "x-accel" :
+
+    location /_protected_storage/ {
+        internal;
+        alias /srv/app/storage/;
+    }
+
+Le contrôle d'accès reste dans Flask : avec PROTECT_MEDIA, un jeton valide est
+exigé avant toute délégation (nginx ne sert jamais une location `internal`
+sans l'en-tête posé par l'application).
+"""
+from __future__ import annotations
+
+import mimetypes
+import unicodedata
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from flask import Response, abort, current_app, request, send_file
+
+from app.core import metrics
+from app.core.security import request_claims
+from app.core.storage import _normalize
+
+MODES = ("direct", "x-accel", "x-sendfile")
+
+
+def stored_path(rel: str) -> Optional[Path]:
+    """
+    Chemin disque d'un fichier stocké ; None s'il est absent, hors de
+    STORAGE_ROOT ou sous un répertoire technique (.tmp : téléversements en
+    cours, .cache, .quarantine : tout nom commençant par un point).
+    """
+    root = Path(current_app.config["STORAGE_ROOT"]).resolve()
+    p = (root / _normalize(rel)).resolve()
+    if root not in p.parents or not p.is_file():
+        return None
+    if any(part.startswith(".") for part in p.relative_to(root).parts):
+        return None
+    return p
+
+
+def check_access() -> None:
+    """401 si PROTECT_MEDIA est actif et que la requête n'a pas de jeton valide."""
+    if current_app.config.get("PROTECT_MEDIA") and request_claims(request) is None:
+        abort(401, description="Jeton requis pour accéder aux fichiers.")
+
+
+def _disposition(resp: Response, as_attachment: bool, name: str) -> None:
+    # même encodage que send_file : nom ASCII + filename* UTF-8 si nécessaire
+    kind = "attachment" if as_attachment else "inline"
+    try:
+        name.encode("ascii")
+        resp.headers.set("Content-Disposition", kind, filename=name)
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+        resp.headers.set("Content-Disposition", kind, filename=simple,
+                         **{"filename*": "UTF-8''" + quote(name, safe="!#$&+^`|~")})
+
+
+def send_stored(
+    path: Path,
+    *,
+    mimetype: Optional[str] = None,
+    as_attachment: bool = False,
+    download_name: Optional[str] = None,
+    max_age: Optional[int] = None,
+) -> Response:
+    """Réponse pour un fichier de STORAGE_ROOT (voir `stored_path`) selon FILE_DELIVERY."""
+    check_access()
+    mimetype = mimetype or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    mode = current_app.config.get("FILE_DELIVERY", "direct")
+
+    if mode == "direct":
+        resp = send_file(path, mimetype=mimetype, as_attachment=as_attachment,
+                         download_name=download_name or path.name,
+                         conditional=True, etag=True, max_age=max_age)
+        if request.method != "HEAD":
+            metrics.storage_sent(resp.content_length, mode)
+        return _cache_scope(resp)
+
+    resp = Response(mimetype=mimetype)
+    if request.method != "HEAD":
+        metrics.storage_sent(path.stat().st_size, mode)   # envoyé par le proxy (hors Range)
+    if mode == "x-accel":
+        root = Path(current_app.config["STORAGE_ROOT"]).resolve()
+        prefix = current_app.config.get("FILE_ACCEL_PREFIX", "/_protected_storage").rstrip("/")
+        resp.headers["X-Accel-Redirect"] = prefix + "/" + quote(path.relative_to(root).as_posix())
+    else:
+        resp.headers["X-Sendfile"] = str(path)
+    _disposition(resp, as_attachment, download_name or path.name)
+    if max_age is not None:
+        resp.cache_control.max_age = max_age
+        resp.cache_control.public = True
+    return _cache_scope(resp)
+
+
+def _cache_scope(resp: Response) -> Response:
+    """Avec PROTECT_MEDIA, une réponse servie sur jeton ne doit pas être gardée par un cache partagé."""
+    if current_app.config.get("PROTECT_MEDIA") and resp.cache_control.public:
+        resp.cache_control.public = False
+        resp.cache_control.private = True
+    return resp
@@ -0,0 +1,31 @@
+# app/core/etag.py
+"""
+GET conditionnels pour les réponses JSON.
+
+Toute réponse GET 200 `application/json` (hors streaming) reçoit un ETag fort
+calculé sur le corps ; si le client renvoie le même `If-None-Match`, il reçoit
+un 304 sans corps. Les réponses servies par le cache (app/core/cache.py)
+portent l'ETag mémorisé avec l'entrée : le 304 est alors rendu sans aucune
+requête SQL.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from flask import request
+
+
+def body_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def register_conditional_get(app) -> None:
+    @app.after_request
+    def _conditional_get(resp):
+        if (request.method != "GET" or resp.status_code != 200
+                or resp.mimetype != "application/json"
+                or resp.is_streamed or resp.direct_passthrough):
+            return resp
+        if resp.get_etag()[0] is None:
+            resp.set_etag(body_etag(resp.get_data()))
+        return resp.make_conditional(request)
@@ -0,0 +1,291 @@
+# app/core/extract.py
+"""
+Extraction en arrière-plan du texte des fichiers stockés (PDF, bureautique,
+texte), indexé dans search_index sous l'entité 'document_text' (même id que
+le document) : la recherche dans le contenu ne relit jamais les fichiers.
+
+- incrémental : un fichier dont (mtime, taille) n'a pas bougé depuis la
+  dernière passe est ignoré ; si seuls ceux-ci ont changé mais pas le
+  sha256, le texte n'est pas ré-extrait ;
+- la lecture, le hachage et l'extraction tournent dans un pool de processus
+  (TEXT_EXTRACT_WORKERS), l'écriture en base reste dans le processus Flask ;
+- après chaque création / modification de document, schedule() lance la
+  passe dans un thread, sans retarder la réponse ;
+- `flask documents-extract [--force]` traite tout le stock (cron / reprise).
+
+PDF : pypdf s'il est installé, sinon lecture directe des opérateurs de texte
+(Tj/TJ) des flux, suffisante pour les rapports produits par un traitement
+de texte. Bureautique : docx/xlsx/pptx et odt/ods/odp (XML dans un zip).
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import click
+from flask import current_app
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from app.core import search
+from app.core.delivery import stored_path
+from app.extensions import db
+from app.models.document_text import DocumentText  # noqa: F401 (table connue de Flask-Migrate)
+
+try:  # dépendance optionnelle
+    from pypdf import PdfReader
+except ImportError:  # pragma: no cover
+    PdfReader = None
+
+ENTITY = "document_text"
+
+_TEXT_SUFFIXES = {".txt", ".csv", ".md"}
+_OOXML_PARTS = {
+    ".docx": re.compile(r"word/(document|header\d*|footer\d*)\.xml"),
+    ".pptx": re.compile(r"ppt/slides/slide\d+\.xml"),
+    ".xlsx": re.compile(r"xl/sharedStrings\.xml"),
+}
+_ODF_SUFFIXES = {".odt", ".ods", ".odp"}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_PDF_STREAM_RE = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+_PDF_TEXT_RE = re.compile(rb"\((?:\\.|[^\\)])*\)\s*(?:Tj|'|\")|\[(?:[^\]\\]|\\.)*\]\s*TJ", re.S)
+# dans un tableau TJ : chaînes et décalages ; un grand décalage négatif = espace entre mots
+_PDF_STRING_RE = re.compile(rb"\(((?:\\.|[^\\)])*)\)|(-?\d+(?:\.\d+)?)", re.S)
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"", b"f": b"", b"(": b"(", b")": b")", b"\\": b"\\"}
+
+
+# ---------- extraction (exécutée dans les processus du pool) ----------
+def _xml_text(data: bytes) -> str:
+    return html.unescape(_TAG_RE.sub(" ", data.decode("utf-8", "ignore")))
+
+
+def _zip_text(path: Path, part: "re.Pattern[str]") -> str:
+    with zipfile.ZipFile(path) as z:
+        return "\n".join(_xml_text(z.read(n)) for n in z.namelist() if part.fullmatch(n))
+
+
+def _pdf_unescape(raw: bytes) -> bytes:
+    out, i = bytearray(), 0
+    while i < len(raw):
+        c = raw[i:i + 1]
+        if c == b"\\" and i + 1 < len(raw):
+            nxt = raw[i + 1:i + 2]
+            m = re.match(rb"[0-7]{1,3}", raw[i + 1:i + 4])
+            if m:
+                out.append(int(m.group(), 8) & 0xFF)
+                i += 1 + len(m.group())
+                continue
+            out += _PDF_ESCAPES.get(nxt, nxt)
+            i += 2
+            continue
+        out += c
+        i += 1
+    return bytes(out)
+
+
+def _pdf_text_raw(data: bytes) -> str:
+    chunks: List[str] = []
+    for m in _PDF_STREAM_RE.finditer(data):
+        body = m.group(1)
+        try:
+            body = zlib.decompress(body)
+        except zlib.error:
+            pass
+        for op in _PDF_TEXT_RE.findall(body):
+            parts = [_pdf_unescape(s) if not num else (b" " if float(num) < -200 else b"")
+                     for s, num in _PDF_STRING_RE.findall(op)]
+            chunks.append(b"".join(parts).decode("latin-1"))
+    return " ".join(chunks)
+
+
+def _pdf_text(path: Path) -> str:
+    if PdfReader is not None:
+        return "\n".join(page.extract_text() or "" for page in PdfReader(str(path)).pages)
+    return _pdf_text_raw(path.read_bytes())
+
+
+def extract_text(path: Path) -> Optional[str]:
+    """Texte brut du fichier ; None si le format n'est pas pris en charge."""
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        return _pdf_text(path)
+    if suffix in _OOXML_PARTS:
+        return _zip_text(path, _OOXML_PARTS[suffix])
+    if suffix in _ODF_SUFFIXES:
+        return _zip_text(path, re.compile(r"content\.xml"))
+    if suffix in _TEXT_SUFFIXES:
+        return path.read_text("utf-8", errors="ignore")
+    return None
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _extract_job(iddocument: int, path: str, known_sha: Optional[str], max_chars: int) -> Dict[str, Any]:
+    p = Path(path)
+    st = p.stat()
+    out: Dict[str, Any] = {"iddocument": iddocument, "mtime": st.st_mtime, "size": st.st_size,
+                           "sha256": file_sha256(p), "text": None, "error": None}
+    if out["sha256"] == known_sha:
+        out["status"] = "unchanged"
+        return out
+    try:
+        txt = extract_text(p)
+    except Exception as e:  # fichier corrompu, chiffré, ...
+        out.update(status="error", error=f"{type(e).__name__}: {e}"[:255])
+        return out
+    if txt is None:
+        out["status"] = "unsupported"
+    else:
+        out["text"] = txt[:max_chars]
+        out["status"] = "ok" if out["text"].strip() else "empty"
+    return out
+
+
+# ---------- pool ----------
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_dispatcher: Optional[ThreadPoolExecutor] = None
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """Pool créé à la demande, une fois par processus (workers gunicorn compris)."""
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # spawn : pas de fork d'un processus qui a déjà des threads
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+# ---------- passe d'extraction (processus Flask) ----------
+def _store(session: Session, doc: Dict[str, Any], res: Dict[str, Any]) -> None:
+    params = {
+        "id": doc["iddocument"], "chemin": doc["chemin"], "mtime": res.get("mtime"), "size": res.get("size"),
+        "sha256": res.get("sha256"), "status": res["status"], "nb": len(res.get("text") or ""),
+        "error": res.get("error"), "at": datetime.utcnow(),
+    }
+    if res["status"] == "unchanged":
+        session.execute(text("""
+            UPDATE document_text SET chemin = :chemin, mtime = :mtime, size = :size
+             WHERE iddocument = :id
+        """), params)
+        return
+
+    session.execute(text("DELETE FROM document_text WHERE iddocument = :id"), params)
+    session.execute(text("""
+        INSERT INTO document_text (iddocument, chemin, mtime, size, sha256, status, nb_chars, error, extracted_at)
+        VALUES (:id, :chemin, :mtime, :size, :sha256, :status, :nb, :error, :at)
+    """), params)
+    search.index_weights(session, ENTITY, doc["iddocument"], search.text_weights(res.get("text") or ""))
+
+
+def run(session: Session, ids: Optional[Iterable[int]] = None, *, force: bool = False,
+        executor: Optional[Executor] = None, commit_every: int = 20) -> Dict[str, int]:
+    """
+    Extrait le texte des documents `ids` (tous si None) dont le fichier a
+    changé. Commit par paquets ; retourne le nombre de documents par statut.
+    """
+    sql = """
+        SELECT d.iddocument, d.chemin, t.mtime, t.size, t.sha256
+          FROM document d
+          LEFT JOIN document_text t ON t.iddocument = d.iddocument
+    """
+    params: Dict[str, Any] = {}
+    stmt = text(sql)
+    if ids is not None:
+        params["ids"] = list(ids)
+        if not params["ids"]:
+            return {}
+        stmt = text(sql + " WHERE d.iddocument IN :ids").bindparams(bindparam("ids", expanding=True))
+    docs = [dict(r) for r in session.execute(stmt, params).mappings()]
+
+    cfg = current_app.config
+    max_chars = int(cfg.get("TEXT_EXTRACT_MAX_CHARS", 2_000_000))
+    stats: Dict[str, int] = {}
+    jobs = []
+    for doc in docs:
+        # même règle que les routes de fichiers : rien hors de STORAGE_ROOT
+        path = stored_path(doc["chemin"]) if doc["chemin"] else None
+        if path is None:
+            _store(session, doc, {"status": "missing"})
+            stats["missing"] = stats.get("missing", 0) + 1
+            continue
+        st = path.stat()
+        if not force and doc["mtime"] == st.st_mtime and doc["size"] == st.st_size:
+            stats["skipped"] = stats.get("skipped", 0) + 1
+            continue
+        jobs.append((doc, str(path), None if force else doc["sha256"]))
+
+    if jobs:
+        pool = executor or _process_pool(int(cfg.get("TEXT_EXTRACT_WORKERS", 2)))
+        futures = [(doc, pool.submit(_extract_job, doc["iddocument"], path, sha, max_chars))
+                   for doc, path, sha in jobs]
+        for n, (doc, fut) in enumerate(futures, 1):
+            try:
+                res = fut.result()
+            except Exception as e:  # fichier disparu entre-temps, worker tué, ...
+                res = {"status": "error", "error": f"{type(e).__name__}: {e}"[:255]}
+            _store(session, doc, res)
+            stats[res["status"]] = stats.get(res["status"], 0) + 1
+            if n % commit_every == 0:
+                session.commit()
+    session.commit()
+    return stats
+
+
+def forget(session: Session, iddocument: int) -> None:
+    """À appeler à la suppression d'un document. Pas de commit."""
+    session.execute(text("DELETE FROM document_text WHERE iddocument = :id"), {"id": iddocument})
+    search.unindex(session, ENTITY, [iddocument])
+
+
+def schedule(ids: Iterable[int]) -> None:
+    """Lance l'extraction de `ids` en arrière-plan (après le commit de la requête)."""
+    global _dispatcher
+    app = current_app._get_current_object()
+    if not app.config.get("TEXT_EXTRACT_ENABLED", True):
+        return
+    ids = list(ids)
+    with _lock:
+        if _dispatcher is None:
+            _dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="text-extract")
+
+    def _job():
+        with app.app_context():
+            try:
+                run(db.session, ids)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Extraction du texte impossible pour %s", ids)
+            finally:
+                db.session.remove()
+
+    _dispatcher.submit(_job)
+
+
+def register_cli(app) -> None:
+    @app.cli.command("documents-extract")
+    @click.option("--force", is_flag=True, help="Ré-extraire même les fichiers inchangés.")
+    def documents_extract_cmd(force):
+        """Extrait le texte des fichiers des documents (incrémental)."""
+        stats = run(db.session, force=force)
+        click.echo("✔ extraction : " + (", ".join(f"{k}={v}" for k, v in sorted(stats.items())) or "rien à faire"))
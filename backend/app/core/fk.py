@@ -0,0 +1,99 @@
+# app/core/fk.py
+"""
+Validation groupée des clés étrangères.
+
+Au lieu d'un `SELECT 1 ... LIMIT 1` par FK, toutes les références d'un payload
+sont vérifiées en une seule requête UNION ALL, et toutes les FK invalides sont
+renvoyées d'un coup :
+
+    missing = missing_fks(db.session, [
+        FkRef("activite", "idactivite", body.get("idactivite"), "activite inexistante."),
+        FkRef("projet",   "idprojet",   body.get("idprojet"),   "projet inexistant."),
+    ])
+    if missing:
+        return jsonify({"detail": fk_detail(missing)}), 400
+
+Les références à None sont ignorées (FK facultatives). Les ids dont
+l'existence a déjà été vérifiée pendant la requête HTTP courante sont
+mémorisés dans `g` (utile aux créations en lot).
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from flask import g, has_request_context
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+
+class FkRef(NamedTuple):
+    table: str
+    column: str
+    value: Any
+    message: Optional[str] = None   # message d'erreur propre à l'endpoint
+
+    @property
+    def detail(self) -> str:
+        return self.message or f"{self.column}={self.value} inexistant dans {self.table}."
+
+
+def _known() -> Optional[Set[Tuple[str, str, str]]]:
+    if not has_request_context():
+        return None
+    if "_fk_known" not in g:
+        g._fk_known = set()
+    return g._fk_known
+
+
+def missing_fks(session: Session, refs: Iterable[FkRef], *, use_cache: bool = True) -> List[FkRef]:
+    """Retourne les références inexistantes (liste vide si tout est valide)."""
+    known = _known() if use_cache else None
+    todo = [r for r in refs if r.value is not None
+            and (known is None or (r.table, r.column, str(r.value)) not in known)]
+    if not todo:
+        return []
+
+    # tables/colonnes : constantes du code appelant, jamais issues du client
+    parts, params = [], {}
+    for i, r in enumerate(todo):
+        parts.append(f"SELECT {i} AS i FROM {r.table} WHERE {r.column} = :v{i}")
+        params[f"v{i}"] = r.value
+    found = {row[0] for row in session.execute(text(" UNION ALL ".join(parts)), params)}
+
+    if known is not None:
+        known.update((r.table, r.column, str(r.value)) for i, r in enumerate(todo) if i in found)
+    return [r for i, r in enumerate(todo) if i not in found]
+
+
+def fk_detail(missing: Iterable[FkRef]) -> str:
+    return " ".join(r.detail for r in missing)
+
+
+def missing_fk_values(session: Session, refs: Iterable[FkRef]) -> Set[Tuple[str, str, str]]:
+    """
+    Variante « lot » : les valeurs sont regroupées par (table, colonne) et
+    testées avec IN, toujours en une requête. Retourne les (table, colonne,
+    str(valeur)) inexistants.
+    """
+    known = _known()
+    groups: Dict[Tuple[str, str], Set[Any]] = {}
+    for r in refs:
+        if r.value is None or (known is not None and (r.table, r.column, str(r.value)) in known):
+            continue
+        groups.setdefault((r.table, r.column), set()).add(r.value)
+    if not groups:
+        return set()
+
+    keys = list(groups)
+    parts, binds, params = [], [], {}
+    for n, (table, column) in enumerate(keys):
+        parts.append(f"SELECT {n} AS g, {column} AS v FROM {table} WHERE {column} IN :g{n}")
+        binds.append(bindparam(f"g{n}", expanding=True))
+        params[f"g{n}"] = list(groups[(table, column)])
+    sql = text(" UNION ALL ".join(parts)).bindparams(*binds)
+    found = {(keys[n][0], keys[n][1], str(v)) for n, v in session.execute(sql, params)}
+
+    if known is not None:
+        known.update(found)
+    wanted = {(t, c, str(v)) for (t, c), values in groups.items() for v in values}
+    return wanted - found
@@ -0,0 +1,170 @@
+# app/core/metrics.py
+"""
+Métriques Prometheus exposées sur GET /metrics.
+
+- requêtes HTTP : histogrammes de latence et de taille de réponse, compteur
+  d'erreurs (statut >= 400), étiquetés par blueprint / endpoint Flask (jamais
+  par chemin brut : nombre de séries borné) ;
+- pool SQLAlchemy : connexions empruntées et en débordement (jauges),
+  connexions ouvertes (recyclage pool_recycle, remplacement après un
+  pool_pre_ping échoué, croissance), invalidations, et durées des pings et
+  des connexions, c'est-à-dire l'attente ajoutée par ces réglages ;
+- stockage : octets envoyés par les routes de fichiers (/media, open,
+  download, ZIP), par endpoint et mode de livraison (FILE_DELIVERY).
+
+Plusieurs workers gunicorn : avec PROMETHEUS_MULTIPROC_DIR (voir
+gunicorn.conf.py), chaque processus écrit ses valeurs dans des fichiers
+mmap de ce répertoire et /metrics les agrège, quel que soit le worker qui
+répond. Sans prometheus_client installé, /metrics répond 501 et les
+mesures sont ignorées.
+"""
+from __future__ import annotations
+
+import os
+import time
+
+from flask import Response, current_app, g, jsonify, request
+from sqlalchemy import event
+
+try:  # dépendance optionnelle
+    from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                                   Histogram, generate_latest, multiprocess)
+except ImportError:  # pragma: no cover
+    Counter = None
+
+if Counter is not None:
+    REQUEST_SECONDS = Histogram(
+        "http_request_duration_seconds", "Durée de traitement des requêtes HTTP",
+        ["blueprint", "endpoint", "method"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+    RESPONSE_BYTES = Histogram(
+        "http_response_size_bytes", "Taille des réponses HTTP (Content-Length connu)",
+        ["blueprint", "endpoint"],
+        buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864),
+    )
+    REQUEST_ERRORS = Counter(
+        "http_request_errors_total", "Réponses HTTP en erreur (statut >= 400)",
+        ["blueprint", "endpoint", "status"],
+    )
+    POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connexions empruntées au pool",
+                             multiprocess_mode="livesum")
+    POOL_OVERFLOW = Gauge("db_pool_overflow", "Connexions au-delà de pool_size",
+                          multiprocess_mode="livesum")
+    POOL_CONNECTS = Counter("db_pool_connections_created_total",
+                            "Connexions ouvertes (démarrage, pool_recycle, remplacement après pre_ping)")
+    POOL_INVALIDATED = Counter("db_pool_invalidated_total",
+                               "Connexions invalidées (pre_ping en échec, erreur de connexion)")
+    POOL_CONNECT_SECONDS = Histogram("db_pool_connect_seconds", "Durée d'ouverture d'une connexion",
+                                     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5))
+    POOL_PING_SECONDS = Histogram("db_pool_ping_seconds", "Durée du pool_pre_ping à l'emprunt",
+                                  buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5))
+    STORAGE_BYTES = Counter("storage_bytes_sent_total", "Octets de fichiers stockés envoyés",
+                            ["endpoint", "mode"])
+
+
+def enabled() -> bool:
+    return Counter is not None
+
+
+def storage_sent(nbytes, mode: str) -> None:
+    """Compte des octets de fichiers envoyés par l'endpoint courant."""
+    if Counter is not None and nbytes:
+        STORAGE_BYTES.labels(request.endpoint or "", mode).inc(nbytes)
+
+
+def instrument_engine(engine) -> None:
+    """Jauges et compteurs du pool de `engine`."""
+    if Counter is None:
+        return
+    pool = engine.pool
+
+    def _gauges(*_):
+        if hasattr(pool, "checkedout"):
+            POOL_CHECKED_OUT.set(pool.checkedout())
+            POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    event.listen(pool, "checkout", _gauges)
+    event.listen(pool, "checkin", _gauges)
+    event.listen(pool, "invalidate", lambda *_: POOL_INVALIDATED.inc())
+    event.listen(pool, "soft_invalidate", lambda *_: POOL_INVALIDATED.inc())
+
+    @event.listens_for(engine, "do_connect")
+    def _connect_start(dialect, conn_rec, cargs, cparams):
+        conn_rec.info["_connect_t0"] = time.perf_counter()
+
+    @event.listens_for(pool, "connect")
+    def _connect_done(dbapi_conn, conn_rec):
+        POOL_CONNECTS.inc()
+        t0 = conn_rec.info.pop("_connect_t0", None)
+        if t0 is not None:
+            POOL_CONNECT_SECONDS.observe(time.perf_counter() - t0)
+
+    # le ping de pool_pre_ping ne passe pas par les événements d'exécution
+    ping = engine.dialect.do_ping
+
+    def _timed_ping(dbapi_connection):
+        t0 = time.perf_counter()
+        try:
+            return ping(dbapi_connection)
+        finally:
+            POOL_PING_SECONDS.observe(time.perf_counter() - t0)
+
+    engine.dialect.do_ping = _timed_ping
+
+
+def _registry():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def register_metrics(app) -> None:
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    @app.get("/metrics")
+    def metrics():
+        """
+        Métriques Prometheus (format texte).
+        ---
+        tags:
+          - Health
+        responses:
+          200:
+            description: Exposition Prometheus
+          401:
+            description: METRICS_TOKEN configuré et jeton absent
+          501:
+            description: prometheus_client non installé
+        """
+        token = current_app.config.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return jsonify({"detail": "Jeton requis."}), 401
+        if Counter is None:
+            return jsonify({"detail": "prometheus_client n'est pas installé."}), 501
+        return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+    if Counter is None:
+        app.logger.warning("prometheus_client absent : métriques désactivées")
+        return
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_t0 = time.perf_counter()
+
+    @app.after_request
+    def _metrics_observe(resp):
+        t0 = g.pop("_metrics_t0", None)
+        if t0 is None:
+            return resp
+        bp = request.blueprint or ""
+        ep = request.endpoint or "<unmatched>"
+        REQUEST_SECONDS.labels(bp, ep, request.method).observe(time.perf_counter() - t0)
+        if resp.content_length is not None:
+            RESPONSE_BYTES.labels(bp, ep).observe(resp.content_length)
+        if resp.status_code >= 400:
+            REQUEST_ERRORS.labels(bp, ep, str(resp.status_code)).inc()
+        return resp
@@ -0,0 +1,145 @@
+# app/core/pagination.py
+"""
+Pagination « keyset » (curseur) pour les listes en SQL brut.
+
+Les listes historiques font `ORDER BY id DESC LIMIT :limit OFFSET :skip` : plus
+la page est profonde, plus MySQL parcourt de lignes pour rien. En mode curseur
+on repart de la dernière clé vue (`WHERE id < :dernier_id`), ce qui reste
+constant quelle que soit la profondeur.
+
+Usage dans un endpoint (sql se termine par la clause WHERE) :
+
+    sql, params, page = keyset_sql(sql, params, request.args,
+                                   id_col="t.idtransaction", group_by=None)
+    rows = [... dicts ...]
+    return jsonify(page_payload(rows, page))
+
+- sans `cursor` dans la query string : comportement historique (skip/limit,
+  réponse = tableau JSON) ;
+- avec `cursor` (vide pour la première page) : réponse
+  `{"items": [...], "next_cursor": "..." | null}`.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from werkzeug.exceptions import BadRequest
+
+
+class Page(NamedTuple):
+    limit: int
+    keyset: bool          # True si le client a demandé le mode curseur
+    id_key: str           # clé de l'id dans les lignes retournées (ex: "idtransaction")
+    sort_key: Optional[str]
+
+
+def _key_of(col: str) -> str:
+    """'t.idtransaction' -> 'idtransaction'."""
+    return col.rsplit(".", 1)[-1]
+
+
+def _jsonable(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return v.date().isoformat()
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return v
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps([_jsonable(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    try:
+        pad = "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(token + pad).decode())
+    except Exception:
+        raise BadRequest(description="cursor invalide.")
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequest(description="cursor invalide.")
+    return values
+
+
+def keyset_sql(
+    sql: str,
+    params: Dict[str, Any],
+    args,
+    *,
+    id_col: str,
+    sort_col: Optional[str] = None,
+    group_by: Optional[str] = None,
+    default_limit: int = 100,
+    max_limit: int = 500,
+) -> Tuple[str, Dict[str, Any], Page]:
+    """
+    Complète `sql` (qui doit se terminer par sa clause WHERE) avec le filtre
+    de curseur, le GROUP BY éventuel, l'ORDER BY (DESC) et LIMIT/OFFSET.
+
+    `sort_col` (optionnel, NOT NULL) précède l'id dans la clé de tri :
+    ORDER BY sort_col DESC, id_col DESC.
+    """
+    limit = min(args.get("limit", default=default_limit, type=int), max_limit)
+    cursor = args.get("cursor")
+    keyset = cursor is not None
+    params = dict(params)
+
+    if keyset:
+        limit = max(limit, 1)
+        if cursor:
+            if sort_col:
+                k_sort, k_id = decode_cursor(cursor, 2)
+                sql += f" AND ({sort_col} < :_ks_sort OR ({sort_col} = :_ks_sort AND {id_col} < :_ks_id))"
+                params["_ks_sort"] = k_sort
+            else:
+                (k_id,) = decode_cursor(cursor, 1)
+                sql += f" AND {id_col} < :_ks_id"
+            params["_ks_id"] = k_id
+
+    if group_by:
+        sql += f" GROUP BY {group_by}"
+
+    order = f"{sort_col} DESC, {id_col} DESC" if sort_col else f"{id_col} DESC"
+    sql += f" ORDER BY {order} LIMIT :limit OFFSET :skip"
+
+    if keyset:
+        # une ligne de plus pour savoir s'il existe une page suivante
+        params.update({"limit": limit + 1, "skip": 0})
+    else:
+        params.update({"limit": limit, "skip": args.get("skip", default=0, type=int)})
+
+    page = Page(limit, keyset, _key_of(id_col), _key_of(sort_col) if sort_col else None)
+    return sql, params, page
+
+
+def page_payload(rows: List[Dict[str, Any]], page: Page):
+    """Tableau (mode historique) ou {"items", "next_cursor"} (mode curseur)."""
+    if not page.keyset:
+        return rows
+
+    items = rows[: page.limit]
+    next_cursor = None
+    if len(rows) > page.limit and items:
+        last = items[-1]
+        keys = [page.sort_key, page.id_key] if page.sort_key else [page.id_key]
+        next_cursor = encode_cursor([last[k] for k in keys])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def offset_args(args, *, default_limit: Optional[int] = None, max_limit: int = 500) -> Tuple[int, Optional[int]]:
+    """
+    (skip, limit) pour les listes ORM. `limit` vaut None si le client n'en
+    donne pas et qu'il n'y a pas de défaut (liste complète, comportement historique).
+    """
+    skip = max(0, args.get("skip", default=0, type=int))
+    limit = args.get("limit", default=default_limit, type=int)
+    if limit is not None:
+        limit = min(max(limit, 0), max_limit)
+    return skip, limit
@@ -0,0 +1,303 @@
+# app/core/previews.py
+"""
+Aperçus (première page) et vignettes des fichiers de document.chemin.
+
+- générés à la demande, dans un pool de processus borné (PREVIEW_WORKERS) ;
+  au-delà de PREVIEW_WORKERS * 4 rendus en attente, on répond 503 plutôt que
+  d'empiler les requêtes ;
+- mis en cache sous STORAGE_ROOT/.cache/previews/<sha[0:2]>/<sha>-<taille>.<ext> :
+  la clé est le SHA-256 du contenu, un même fichier référencé par plusieurs
+  documents n'est rendu qu'une fois, et l'URL d'un aperçu ne change que si
+  le contenu change (servi avec `Cache-Control: immutable`) ;
+- LRU dans un budget disque (PREVIEW_CACHE_MAX_BYTES) : chaque accès
+  rafraîchit la date du fichier, les plus anciens sont supprimés au-delà.
+
+Le SHA-256 est pris du nom du blob (stockage adressé par contenu), sinon de
+document_text (extraction) si le fichier n'a pas bougé, sinon calculé dans
+le worker puis mémorisé.
+
+Rendu (dépendances optionnelles) :
+- PDF : pypdfium2 + Pillow, sinon `pdftoppm` (poppler-utils) s'il est installé ;
+- images : Pillow ;
+- bureautique : vignette embarquée par l'éditeur (docProps/thumbnail.*,
+  Thumbnails/thumbnail.png), redimensionnée si Pillow est là.
+Sans moteur adapté, l'aperçu est « indisponible » (404) et l'interface garde
+son icône de type de fichier.
+"""
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.extract import file_sha256
+
+try:  # dépendances optionnelles
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover
+    Image = ImageOps = None
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover
+    pdfium = None
+
+SIZES = {"thumb": 256, "page": 1024}           # plus grand côté, en pixels
+NAME_RE = re.compile(r"^[0-9a-f]{64}-(thumb|page)\.(jpg|png)$")
+
+_IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tif", ".tiff"}
+_EMBEDDED = {
+    ".docx": ("docProps/thumbnail.jpeg", "docProps/thumbnail.jpg", "docProps/thumbnail.png"),
+    ".xlsx": ("docProps/thumbnail.jpeg", "docProps/thumbnail.jpg", "docProps/thumbnail.png"),
+    ".pptx": ("docProps/thumbnail.jpeg", "docProps/thumbnail.jpg", "docProps/thumbnail.png"),
+    ".odt": ("Thumbnails/thumbnail.png",),
+    ".ods": ("Thumbnails/thumbnail.png",),
+    ".odp": ("Thumbnails/thumbnail.png",),
+}
+_BLOB_NAME_RE = re.compile(r"^[0-9a-f]{64}$")
+_TOUCH_EVERY = 3600                            # secondes entre deux rafraîchissements LRU
+
+
+class PreviewError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def cache_dir() -> Path:
+    # sous STORAGE_ROOT : même volume (renommage atomique), servi aussi par X-Accel
+    return Path(current_app.config["STORAGE_ROOT"]).resolve() / ".cache" / "previews"
+
+
+def cached_path(name: str) -> Optional[Path]:
+    """Fichier d'aperçu `name` (<sha>-<taille>.<ext>) s'il est en cache ; rafraîchit son rang LRU."""
+    if not NAME_RE.match(name):
+        return None
+    p = cache_dir() / name[:2] / name
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return None
+    if st.st_mtime < time.time() - _TOUCH_EVERY:
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+    return p
+
+
+# ---------- rendu (exécuté dans les processus du pool) ----------
+def _to_jpeg(data: bytes, box: int) -> Tuple[bytes, str]:
+    with Image.open(io.BytesIO(data)) as im:
+        im = ImageOps.exif_transpose(im)
+        im.thumbnail((box, box))
+        if im.mode != "RGB":
+            # transparence -> fond blanc
+            bg = Image.new("RGB", im.size, "white")
+            bg.paste(im, mask=im.convert("RGBA").split()[-1])
+            im = bg
+        out = io.BytesIO()
+        im.save(out, "JPEG", quality=80, optimize=True)
+        return out.getvalue(), ".jpg"
+
+
+def _render_pdf(path: Path, box: int) -> Optional[Tuple[bytes, str]]:
+    if pdfium is not None and Image is not None:
+        pdf = pdfium.PdfDocument(str(path))
+        try:
+            page = pdf[0]
+            scale = box / max(page.get_size())
+            im = page.render(scale=scale).to_pil()
+            out = io.BytesIO()
+            im.convert("RGB").save(out, "JPEG", quality=80, optimize=True)
+            return out.getvalue(), ".jpg"
+        finally:
+            pdf.close()
+    exe = shutil.which("pdftoppm")
+    if exe is None:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "p")
+        subprocess.run(
+            [exe, "-f", "1", "-l", "1", "-singlefile", "-scale-to", str(box),
+             "-jpeg", "-jpegopt", "quality=80", str(path), base],
+            check=True, capture_output=True, timeout=60,
+        )
+        return Path(base + ".jpg").read_bytes(), ".jpg"
+
+
+def render(path: Path, box: int) -> Optional[Tuple[bytes, str]]:
+    """(octets, extension) de l'aperçu de `path` tenant dans `box` pixels ; None si non pris en charge."""
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        return _render_pdf(path, box)
+    if suffix in _IMAGE_SUFFIXES:
+        return _to_jpeg(path.read_bytes(), box) if Image is not None else None
+    if suffix in _EMBEDDED:
+        with zipfile.ZipFile(path) as z:
+            names = set(z.namelist())
+            for name in _EMBEDDED[suffix]:
+                if name in names:
+                    data = z.read(name)
+                    if Image is not None:
+                        return _to_jpeg(data, box)
+                    return data, ".png" if name.endswith(".png") else ".jpg"
+    return None
+
+
+def _find(root: Path, sha: str, size: str) -> Optional[str]:
+    for ext in (".jpg", ".png"):
+        name = f"{sha}-{size}{ext}"
+        if (root / sha[:2] / name).exists():
+            return name
+    return None
+
+
+def _preview_job(path: str, sha: Optional[str], size: str, root: str) -> Tuple[str, Optional[str], int]:
+    """(sha256, nom du fichier d'aperçu ou None, octets écrits)."""
+    p, cache = Path(path), Path(root)
+    sha = sha or file_sha256(p)
+    found = _find(cache, sha, size)
+    if found:
+        return sha, found, 0
+    out = render(p, SIZES[size])
+    if out is None:
+        return sha, None, 0
+    data, ext = out
+    name = f"{sha}-{size}{ext}"
+    dest = cache / sha[:2] / name
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f"{name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, dest)
+    return sha, name, len(data)
+
+
+# ---------- pool, mémo et budget (processus Flask) ----------
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_inflight: Dict[tuple, Future] = {}
+_known: Dict[tuple, str] = {}                 # (chemin, mtime_ns, taille) -> sha256
+_unsupported: set = set()                      # (sha256, taille d'aperçu)
+_written = 0                                   # octets écrits depuis le dernier contrôle du budget
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def _known_sha(session: Session, iddocument: int, path: Path, st: os.stat_result) -> Optional[str]:
+    if _BLOB_NAME_RE.match(path.name.split(".", 1)[0]) and path.parent.parent.parent.name == "blobs":
+        return path.name.split(".", 1)[0]
+    sha = _known.get((str(path), st.st_mtime_ns, st.st_size))
+    if sha:
+        return sha
+    row = session.execute(
+        text("SELECT sha256, mtime, size FROM document_text WHERE iddocument = :id"), {"id": iddocument}
+    ).first()
+    if row and row.sha256 and row.size == st.st_size and row.mtime == st.st_mtime:
+        return row.sha256
+    return None
+
+
+def evict(root: Path, budget: int) -> int:
+    """Supprime les aperçus les moins récemment utilisés jusqu'à 90 % du budget ; renvoie les octets restants."""
+    files = []
+    for sub in os.scandir(root) if root.exists() else ():
+        if not sub.is_dir():
+            continue
+        for f in os.scandir(sub.path):
+            st = f.stat()
+            if f.name.endswith(".tmp") and st.st_mtime < time.time() - 3600:
+                os.unlink(f.path)               # rendu interrompu
+                continue
+            files.append((st.st_mtime, st.st_size, f.path))
+    total = sum(s for _, s, _ in files)
+    if total <= budget:
+        return total
+    files.sort()
+    for _, s, fpath in files:
+        if total <= budget * 0.9:
+            break
+        try:
+            os.unlink(fpath)
+        except FileNotFoundError:
+            pass
+        total -= s
+    return total
+
+
+def _account(written: int) -> None:
+    """Contrôle le budget disque quand les écritures cumulées en dépassent 1/10."""
+    global _written
+    budget = int(current_app.config.get("PREVIEW_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+    with _lock:
+        _written += written
+        if _written < budget // 10:
+            return
+        _written = 0
+    evict(cache_dir(), budget)
+
+
+def get(session: Session, iddocument: int, path: Path, size: str) -> str:
+    """Nom du fichier d'aperçu de `path` (généré si besoin). Lève PreviewError."""
+    if size not in SIZES:
+        raise PreviewError(400, f"size doit valoir {' ou '.join(SIZES)}.")
+    cfg = current_app.config
+    st = path.stat()
+    sha = _known_sha(session, iddocument, path, st)
+    root = cache_dir()
+    if sha:
+        if (sha, size) in _unsupported:
+            raise PreviewError(404, "Aperçu indisponible pour ce type de fichier.")
+        found = _find(root, sha, size)
+        if found:
+            cached_path(found)
+            return found
+
+    workers = int(cfg.get("PREVIEW_WORKERS", 2))
+    key = (str(path), st.st_mtime_ns, st.st_size, size)
+    with _lock:
+        fut = _inflight.get(key)
+        if fut is None:
+            if len(_inflight) >= workers * 4:
+                raise PreviewError(503, "Trop d'aperçus en cours de génération, réessayez.")
+            fut = _process_pool(workers).submit(_preview_job, str(path), sha, size, str(root))
+            _inflight[key] = fut
+            fut.add_done_callback(lambda _f, k=key: _inflight.pop(k, None))
+    try:
+        sha, name, written = fut.result(timeout=float(cfg.get("PREVIEW_TIMEOUT", 20)))
+    except FutureTimeout:
+        raise PreviewError(503, "Aperçu en cours de génération, réessayez.")
+    except Exception as e:  # fichier corrompu, chiffré, moteur en erreur, ...
+        current_app.logger.warning("Aperçu impossible pour %s : %s", path, e)
+        raise PreviewError(404, "Aperçu indisponible pour ce fichier.")
+    if len(_known) > 50_000:
+        _known.clear()
+    _known[key[:3]] = sha
+    if name is None:
+        _unsupported.add((sha, size))
+        raise PreviewError(404, "Aperçu indisponible pour ce type de fichier.")
+    if written:
+        _account(written)
+    return name
@@ -0,0 +1,237 @@
+# app/core/profiler.py
+"""
+Profil d'une requête à la demande, par échantillonnage.
+
+Un administrateur (jeton JWT role=admin, en-tête Authorization seulement)
+ajoute l'en-tête `X-Profile: 1` à n'importe quelle requête : un thread
+relève la pile du thread qui la traite toutes les PROFILE_INTERVAL_MS
+(sys._current_frames), du before_request à l'after_request. Le profil est
+enregistré sous <instance_path>/profiles/<id>.json, hors de STORAGE_ROOT
+pour que /media ne puisse jamais le servir (partagé par les workers, les
+PROFILE_KEEP plus récents sont gardés) et la réponse porte :
+
+    X-Profile-Id: 3f2a…
+    X-Profile-Url: /api/v1/admin/profiles/3f2a…
+
+Téléchargement (app/routes/admin.py) au format speedscope (ouvrir sur
+https://www.speedscope.app) ou en piles repliées (flamegraph.pl, inferno) :
+
+    GET /api/v1/admin/profiles/<id>?format=speedscope|collapsed
+
+Sans en-tête, sans rôle admin ou avec un jeton passé en ?token=, rien
+n'est fait (l'en-tête est ignoré). Pour une réponse en streaming, seul le
+handler est profilé, pas l'envoi du corps. Pas de dépendance :
+l'échantillonneur prend le GIL comme les autres threads, le coût ne porte
+que sur la requête profilée.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from flask import current_app, g, request
+
+from app.core.security import request_claims
+
+PROFILE_DIR = "profiles"      # sous app.instance_path
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+Frame = Tuple[str, str, int]        # (nom qualifié, fichier, ligne de définition)
+
+
+class Sampler(threading.Thread):
+    """Relève périodiquement la pile du thread `target`."""
+
+    def __init__(self, target: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.target = target
+        self.interval = interval
+        self.stacks: Counter = Counter()      # tuple de Frame (racine d'abord) -> secondes attribuées
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._stop_evt = threading.Event()
+
+    def run(self) -> None:
+        last = self.started
+        while not self._stop_evt.wait(self.interval):
+            # poids = temps réel écoulé depuis le relevé précédent (le réveil
+            # peut être retardé par le GIL)
+            now = time.perf_counter()
+            dt, last = now - last, now
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                continue
+            stack: List[Frame] = []
+            while frame is not None:
+                co = frame.f_code
+                stack.append((co.co_qualname, co.co_filename, co.co_firstlineno))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += dt
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_evt.set()
+        self.join()
+        self.elapsed = time.perf_counter() - self.started
+
+
+def _short(path: str) -> str:
+    """Chemin lisible : relatif à site-packages ou au dossier backend."""
+    for marker in ("site-packages/", "/backend/"):
+        i = path.rfind(marker)
+        if i >= 0:
+            return path[i + len(marker):]
+    return path
+
+
+def speedscope(name: str, sampler: Sampler) -> Dict[str, Any]:
+    """Profil au format speedscope « sampled » (poids en millisecondes)."""
+    frames: List[Dict[str, Any]] = []
+    index: Dict[Frame, int] = {}
+    samples, weights = [], []
+    for stack, seconds in sampler.stacks.most_common():
+        ids = []
+        for fr in stack:
+            if fr not in index:
+                index[fr] = len(frames)
+                frames.append({"name": fr[0], "file": _short(fr[1]), "line": fr[2]})
+            ids.append(index[fr])
+        samples.append(ids)
+        weights.append(round(seconds * 1000, 3))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "app.core.profiler",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled", "name": name, "unit": "milliseconds",
+            "startValue": 0, "endValue": round(sum(weights), 3),
+            "samples": samples, "weights": weights,
+        }],
+    }
+
+
+def collapsed(profile: Dict[str, Any]) -> str:
+    """Piles repliées (`a;b;c 12`, en nombre d'intervalles) depuis un profil speedscope."""
+    frames = profile["shared"]["frames"]
+    prof = profile["profiles"][0]
+    unit = profile.get("meta", {}).get("interval_ms") or 1
+    lines = []
+    for ids, w in zip(prof["samples"], prof["weights"]):
+        names = ";".join(f"{frames[i]['name']} ({frames[i]['file']}:{frames[i]['line']})".replace(";", ",")
+                         for i in ids)
+        lines.append(f"{names} {max(1, round(w / unit))}")
+    return "\n".join(lines) + "\n"
+
+
+def profile_dir() -> Path:
+    return Path(current_app.instance_path) / PROFILE_DIR
+
+
+def load(profile_id: str) -> Optional[Dict[str, Any]]:
+    if not _ID_RE.match(profile_id):
+        return None
+    try:
+        with open(profile_dir() / f"{profile_id}.json", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def listing() -> List[Dict[str, Any]]:
+    """Profils enregistrés, du plus récent au plus ancien (métadonnées seulement)."""
+    out = []
+    d = profile_dir()
+    if not d.is_dir():
+        return out
+    for e in os.scandir(d):
+        if e.name.endswith(".json") and _ID_RE.match(e.name[:-5]):
+            out.append((e.stat().st_mtime, e.name[:-5]))
+    items = []
+    for _, pid in sorted(out, reverse=True):
+        prof = load(pid)
+        if prof is not None:
+            items.append({"id": pid, **prof.get("meta", {})})
+    return items
+
+
+def _save(profile: Dict[str, Any], keep: int) -> None:
+    d = profile_dir()
+    d.mkdir(parents=True, exist_ok=True)
+    path = d / f"{profile['meta']['id']}.json"
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    files = sorted((e for e in os.scandir(d) if e.name.endswith(".json")),
+                   key=lambda e: e.stat().st_mtime, reverse=True)
+    for e in files[keep:]:
+        try:
+            os.unlink(e.path)
+        except FileNotFoundError:
+            pass
+
+
+def register_profiler(app) -> None:
+    if not app.config.get("PROFILER_ENABLED", True):
+        return
+    interval = max(float(app.config.get("PROFILE_INTERVAL_MS", 5)), 1.0) / 1000
+    keep = max(1, int(app.config.get("PROFILE_KEEP", 50)))
+
+    @app.before_request
+    def _profile_start():
+        flag = request.headers.get("X-Profile", "")
+        if not flag or flag.lower() in ("0", "false", "no"):
+            return
+        claims = request_claims(request, allow_query=False)
+        if not claims or claims.get("role") != "admin":
+            return
+        sampler = Sampler(threading.get_ident(), interval)
+        sampler.start()
+        g._profile = (sampler, claims.get("sub"))
+
+    @app.after_request
+    def _profile_stop(resp):
+        state = g.pop("_profile", None)
+        if state is None:
+            return resp
+        sampler, user = state
+        sampler.stop()
+        pid = uuid.uuid4().hex
+        query = urlencode([(k, v) for k, v in request.args.items(multi=True) if k != "token"])
+        path = request.path + ("?" + query if query else "")
+        name = f"{request.method} {path}"
+        profile = speedscope(name, sampler)
+        profile["meta"] = {
+            "id": pid, "at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "user": user,
+            "method": request.method, "path": path,
+            "endpoint": request.endpoint, "status": resp.status_code,
+            "duration_ms": round(sampler.elapsed * 1000, 1), "samples": sampler.samples,
+            "interval_ms": interval * 1000, "pid": os.getpid(),
+        }
+        try:
+            _save(profile, keep)
+        except OSError as e:
+            current_app.logger.warning("Profil non enregistré : %s", e)
+            return resp
+        resp.headers["X-Profile-Id"] = pid
+        resp.headers["X-Profile-Url"] = f"/api/v1/admin/profiles/{pid}"
+        return resp
+
+    @app.teardown_request
+    def _profile_abort(exc=None):
+        # exception non gérée : after_request n'a pas tourné
+        state = g.pop("_profile", None)
+        if state is not None:
+            state[0].stop()
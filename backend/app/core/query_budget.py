@@ -0,0 +1,93 @@
+# app/core/query_budget.py
+"""
+Budget de requêtes SQL par endpoint (détection des N+1 en CI / préproduction).
+
+Chaque route peut déclarer le nombre maximal de requêtes qu'elle émet :
+
+    @bp.get("/<int:project_id>/dossier")
+    @query_budget(12)
+    def get_projet_dossier(project_id): ...
+
+Les autres routes ont QUERY_BUDGET_DEFAULT. Indépendamment du total, une
+même forme de requête (valeurs retirées, voir timing.statement_shape)
+exécutée plus de QUERY_BUDGET_MAX_REPEAT fois signale une boucle ORM :
+relation paresseuse parcourue ligne à ligne, backref `lazy="dynamic"`
+interrogé dans une boucle, etc.
+
+QUERY_BUDGET_MODE :
+- "off"   (production) : rien n'est compté en plus des mesures de timing ;
+- "warn"  (préproduction) : avertissement dans le log ;
+- "raise" (tests, CI) : QueryBudgetExceeded, la requête échoue en 500 et
+  le client de test Flask propage l'exception.
+
+S'appuie sur les mesures de app/core/timing.py (REQUEST_TIMING_ENABLED).
+"""
+from __future__ import annotations
+
+from typing import Callable, List, Optional
+
+from flask import current_app, request
+
+from app.core import timing
+
+MODES = ("off", "warn", "raise")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries: Optional[int], *, max_repeat: Optional[int] = None) -> Callable:
+    """Budget de la vue décorée ; `None` = pas de limite sur le total."""
+    def deco(view):
+        view._query_budget = (max_queries, max_repeat)
+        return view
+    return deco
+
+
+def _budget_of_endpoint():
+    cfg = current_app.config
+    view = current_app.view_functions.get(request.endpoint)
+    max_queries, max_repeat = getattr(view, "_query_budget", (cfg.get("QUERY_BUDGET_DEFAULT", 30), None))
+    return max_queries, max_repeat if max_repeat is not None else cfg.get("QUERY_BUDGET_MAX_REPEAT", 8)
+
+
+def violations(st: "timing.RequestStats") -> List[str]:
+    max_queries, max_repeat = _budget_of_endpoint()
+    out = []
+    if max_queries is not None and st.queries > max_queries:
+        out.append(f"{st.queries} requêtes SQL (budget {max_queries})")
+    for shape, n in sorted((st.shapes or {}).items(), key=lambda kv: -kv[1]):
+        if n <= max_repeat:
+            break
+        out.append(f"même requête exécutée {n} fois (N+1 ?) : {shape[:300]}")
+    return out
+
+
+def register_query_budget(app) -> None:
+    mode = app.config.get("QUERY_BUDGET_MODE", "off")
+    if mode == "off":
+        return
+    if not app.config.get("REQUEST_TIMING_ENABLED", True):
+        app.logger.warning("QUERY_BUDGET_MODE=%s ignoré : REQUEST_TIMING_ENABLED est désactivé", mode)
+        return
+
+    # enregistré après register_request_timing : les mesures existent déjà
+    @app.before_request
+    def _budget_start():
+        st = timing.current()
+        if st is not None:
+            st.shapes = {}
+
+    @app.after_request
+    def _budget_check(resp):
+        st = timing.current()
+        if st is None or request.endpoint is None:
+            return resp
+        found = violations(st)
+        if found:
+            msg = f"{request.method} {request.endpoint} : " + " ; ".join(found)
+            if mode == "raise":
+                raise QueryBudgetExceeded(msg)
+            current_app.logger.warning("Budget de requêtes dépassé — %s", msg)
+        return resp
@@ -0,0 +1,133 @@
+# app/core/rollup.py
+"""
+Exécution budgétaire : agrégats des transactions dans `transaction_rollup`.
+
+Chaque INSERT / UPDATE / DELETE de transaction (routes/transactions_1.py)
+ajuste la ligne (idprojet, idactivite, mois, devise) correspondante dans la
+même transaction SQL ; le tableau de bord lit ces quelques lignes au lieu de
+re-sommer toute la table `transaction`.
+
+`flask rollup-rebuild` reconstruit la table depuis `transaction`.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+import click
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.transaction_rollup import TransactionRollup  # noqa: F401 (table connue de Flask-Migrate)
+
+
+def _month(v: Any) -> Optional[str]:
+    if v is None or v == "":
+        return None
+    if isinstance(v, date):
+        return v.strftime("%Y-%m")
+    return str(v)[:7]
+
+
+def _key(session: Session, row: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """Clé de rollup d'une transaction (None si elle n'est rattachée à aucun projet)."""
+    idprojet = row.get("idprojet")
+    idactivite = row.get("idactivite")
+    if idprojet is None and idactivite is not None:
+        idprojet = session.execute(
+            text("SELECT idprojet FROM activite WHERE idactivite = :id"),
+            {"id": idactivite},
+        ).scalar()
+    mois = _month(row.get("date_transaction"))
+    if idprojet is None or mois is None:
+        return None
+    return {
+        "idprojet": int(idprojet),
+        "idactivite": int(idactivite or 0),
+        "mois": mois,
+        "devise": row.get("devise") or "",
+    }
+
+
+_UPSERT = text("""
+    INSERT INTO transaction_rollup (idprojet, idactivite, mois, devise, total, nb)
+    VALUES (:idprojet, :idactivite, :mois, :devise, :total, :nb)
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total), nb = nb + VALUES(nb)
+""")
+
+
+def apply(session: Session, row: Optional[Mapping[str, Any]], sign: int) -> None:
+    """Ajoute (sign=+1) ou retire (sign=-1) une transaction des agrégats. Pas de commit."""
+    if not row:
+        return
+    key = _key(session, row)
+    if key is None:
+        return
+    params = dict(key, total=Decimal(str(row.get("montant_transaction") or 0)) * sign, nb=sign)
+    session.execute(_UPSERT, params)
+    if sign < 0:
+        session.execute(text("""
+            DELETE FROM transaction_rollup
+             WHERE idprojet = :idprojet AND idactivite = :idactivite
+               AND mois = :mois AND devise = :devise AND nb <= 0
+        """), key)
+
+
+def apply_many(session: Session, rows: Iterable[Mapping[str, Any]]) -> None:
+    """Ajoute un lot de nouvelles transactions : un upsert par clé distincte."""
+    rows = list(rows)
+    # projet des transactions rattachées seulement à une activité : une requête pour tout le lot
+    act_ids = {r["idactivite"] for r in rows if r.get("idprojet") is None and r.get("idactivite") is not None}
+    projet_of: Dict[Any, Any] = {}
+    if act_ids:
+        projet_of = dict(session.execute(
+            text("SELECT idactivite, idprojet FROM activite WHERE idactivite IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(act_ids)},
+        ).all())
+
+    acc: Dict[tuple, Dict[str, Any]] = {}
+    for r in rows:
+        idprojet = r.get("idprojet")
+        if idprojet is None and r.get("idactivite") is not None:
+            idprojet = projet_of.get(r["idactivite"])
+        mois = _month(r.get("date_transaction"))
+        if idprojet is None or mois is None:
+            continue
+        key = (int(idprojet), int(r.get("idactivite") or 0), mois, r.get("devise") or "")
+        cur = acc.setdefault(key, {"idprojet": key[0], "idactivite": key[1], "mois": key[2],
+                                   "devise": key[3], "total": Decimal("0"), "nb": 0})
+        cur["total"] += Decimal(str(r.get("montant_transaction") or 0))
+        cur["nb"] += 1
+    if acc:
+        session.execute(_UPSERT, list(acc.values()))
+
+
+def rebuild(session: Session) -> None:
+    """Reconstruit toute la table (pas de commit)."""
+    session.execute(text("DELETE FROM transaction_rollup"))
+    session.execute(text("""
+        INSERT INTO transaction_rollup (idprojet, idactivite, mois, devise, total, nb)
+        SELECT COALESCE(t.idprojet, a.idprojet),
+               COALESCE(t.idactivite, 0),
+               LEFT(t.date_transaction, 7),
+               t.devise,
+               SUM(t.montant_transaction),
+               COUNT(*)
+          FROM transaction t
+          LEFT JOIN activite a ON a.idactivite = t.idactivite
+         WHERE COALESCE(t.idprojet, a.idprojet) IS NOT NULL
+         GROUP BY COALESCE(t.idprojet, a.idprojet), COALESCE(t.idactivite, 0),
+                  LEFT(t.date_transaction, 7), t.devise
+    """))
+
+
+def register_cli(app) -> None:
+    @app.cli.command("rollup-rebuild")
+    def rollup_rebuild_cmd():
+        """Recalcule transaction_rollup depuis la table transaction."""
+        rebuild(db.session)
+        db.session.commit()
+        click.echo("✔ transaction_rollup reconstruite")
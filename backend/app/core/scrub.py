@@ -0,0 +1,230 @@
+# app/core/scrub.py
+"""
+Rapprochement de STORAGE_ROOT avec la table document.
+
+- l'arborescence est parcourue avec os.scandir dans un thread, pendant que
+  les valeurs de document.chemin sont lues par paquets (keyset sur
+  iddocument) : aucune des deux listes complètes n'attend l'autre ;
+- orphelins : fichiers qu'aucun document.chemin ne référence (téléversements
+  jamais rattachés, documents supprimés : delete_document laisse le fichier,
+  un blob pouvant être partagé) ; seuls ceux plus vieux que `min_age` sont
+  retenus, et un chemin téléversé depuis moins de `min_age` (stored_file.
+  created_at, y compris un téléversement dédupliqué vers un vieux blob)
+  compte comme référencé : on ne touche pas un téléversement en cours de
+  rattachement ;
+- manquants : documents dont le fichier n'existe pas ;
+- sommes de contrôle (option `verify`) : un blob doit avoir le SHA-256 de son
+  nom ; un fichier dont taille et mtime n'ont pas bougé depuis l'extraction
+  doit garder le sha256 de document_text. Hachage dans un pool de threads.
+
+Les répertoires techniques (.tmp, .cache, .quarantine) sont ignorés.
+
+    flask storage-scrub                       # rapport
+    flask storage-scrub --verify --report scrub.json
+    flask storage-scrub --action quarantine   # déplace sous .quarantine/<date>/
+    flask storage-scrub --action delete --min-age 72
+
+Planification : une ligne cron (ex. `30 3 * * * cd /srv/app && flask storage-scrub --action quarantine`).
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import click
+from flask import current_app
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from app.core.extract import file_sha256
+from app.core.storage import _normalize
+from app.extensions import db
+
+SKIP_DIRS = {".tmp", ".cache", ".quarantine"}
+QUARANTINE_DIR = ".quarantine"
+BATCH_SIZE = 1000
+
+
+def walk(root: Path) -> Dict[str, Tuple[int, float]]:
+    """{chemin relatif ('a/b.pdf'): (taille, mtime)} de tous les fichiers sous `root`."""
+    out: Dict[str, Tuple[int, float]] = {}
+    stack = [("", str(root))]
+    while stack:
+        prefix, path = stack.pop()
+        try:
+            it = os.scandir(path)
+        except FileNotFoundError:
+            continue
+        with it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if not (prefix == "" and e.name in SKIP_DIRS):
+                        stack.append((prefix + e.name + "/", e.path))
+                elif e.is_file(follow_symlinks=False):
+                    st = e.stat(follow_symlinks=False)
+                    out[prefix + e.name] = (st.st_size, st.st_mtime)
+    return out
+
+
+def references(session: Session, batch_size: int = BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Paquets de {iddocument, rel, sha256, size, mtime} (rel normalisé comme fs_path)."""
+    last = 0
+    while True:
+        rows = session.execute(text("""
+            SELECT d.iddocument, d.chemin, t.sha256, t.size, t.mtime
+              FROM document d
+              LEFT JOIN document_text t ON t.iddocument = d.iddocument
+             WHERE d.iddocument > :last
+             ORDER BY d.iddocument
+             LIMIT :n
+        """), {"last": last, "n": batch_size}).mappings().all()
+        if not rows:
+            return
+        last = rows[-1]["iddocument"]
+        batch = []
+        for r in rows:
+            ch = (r["chemin"] or "").strip()
+            if ch.startswith(("http://", "https://")):
+                continue      # URL externe : rien à vérifier sur le disque
+            batch.append({"iddocument": r["iddocument"], "chemin": r["chemin"], "rel": _normalize(ch),
+                          "sha256": r["sha256"], "size": r["size"], "mtime": r["mtime"]})
+        yield batch
+
+
+def recent_uploads(session: Session, min_age: float) -> Set[str]:
+    """Chemins relatifs téléversés (stored_file) depuis moins de `min_age` secondes."""
+    since = datetime.utcnow() - timedelta(seconds=min_age)
+    return {_normalize(ch) for (ch,) in session.execute(
+        text("SELECT DISTINCT chemin FROM stored_file WHERE created_at >= :since"), {"since": since})}
+
+
+def _expected_sha(rel: str, ref: Optional[Dict[str, Any]], size: int, mtime: float) -> Optional[str]:
+    stem = rel.rsplit("/", 1)[-1].split(".", 1)[0]
+    if rel.startswith("blobs/") and len(stem) == 64:
+        return stem
+    if ref and ref["sha256"] and ref["size"] == size and ref["mtime"] == mtime:
+        return ref["sha256"]
+    return None
+
+
+def scan(session: Session, *, verify: bool = False, min_age: float = 24 * 3600,
+         workers: int = 4) -> Dict[str, Any]:
+    """Rapport {orphans, missing, mismatched, stats} ; ne modifie rien."""
+    root = Path(current_app.config["STORAGE_ROOT"]).resolve()
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        files_f = pool.submit(walk, root)
+        refs: Dict[str, Dict[str, Any]] = {}
+        all_refs: List[Dict[str, Any]] = []
+        nb_docs = 0
+        for batch in references(session):
+            nb_docs += len(batch)
+            for ref in batch:
+                refs.setdefault(ref["rel"], ref)
+                all_refs.append(ref)
+        recent = recent_uploads(session, min_age)
+        files = files_f.result()
+
+        missing = [{"iddocument": r["iddocument"], "chemin": r["chemin"]}
+                   for r in all_refs if r["rel"] not in files]
+        now = time.time()
+        orphans = [{"rel": rel, "size": size, "mtime": mtime}
+                   for rel, (size, mtime) in files.items()
+                   if rel not in refs and rel not in recent and now - mtime >= min_age]
+        mismatched = []
+        if verify:
+            checks = [(rel, exp) for rel, (size, mtime) in files.items()
+                      if (exp := _expected_sha(rel, refs.get(rel), size, mtime))]
+            digests = pool.map(lambda c: file_sha256(root / c[0]), checks)
+            mismatched = [{"rel": rel, "expected": exp, "actual": got}
+                          for (rel, exp), got in zip(checks, digests) if got != exp]
+
+    return {
+        "orphans": sorted(orphans, key=lambda o: o["rel"]),
+        "missing": sorted(missing, key=lambda m: m["iddocument"]),
+        "mismatched": mismatched,
+        "stats": {
+            "files": len(files), "bytes": sum(s for s, _ in files.values()),
+            "documents": nb_docs, "orphans": len(orphans),
+            "orphan_bytes": sum(o["size"] for o in orphans),
+            "missing": len(missing), "mismatched": len(mismatched),
+            "verified": verify, "seconds": round(time.time() - started, 2),
+        },
+    }
+
+
+def dispose(session: Session, orphans: List[Dict[str, Any]], action: str,
+            min_age: float = 24 * 3600) -> int:
+    """
+    Met en quarantaine (STORAGE_ROOT/.quarantine/<date>/<rel>) ou supprime les
+    orphelins ; une suppression retire aussi leurs lignes stored_file. Renvoie
+    le nombre de fichiers traités.
+    """
+    root = Path(current_app.config["STORAGE_ROOT"]).resolve()
+    dest_root = root / QUARANTINE_DIR / datetime.now().strftime("%Y%m%d-%H%M%S")
+    done, deleted = 0, []
+    rels = [o["rel"] for o in orphans]
+    # un document a pu être rattaché, ou le fichier re-téléversé, entre le scan et l'action
+    taken = recent_uploads(session, min_age)
+    for i in range(0, len(rels), BATCH_SIZE):
+        variants = {v: rel for rel in rels[i:i + BATCH_SIZE]
+                    for v in (rel, "/" + rel, "storage/" + rel, "/storage/" + rel)}
+        taken.update(variants[ch] for (ch,) in session.execute(
+            text("SELECT chemin FROM document WHERE chemin IN :v").bindparams(bindparam("v", expanding=True)),
+            {"v": list(variants)},
+        ))
+    for o in orphans:
+        if o["rel"] in taken:
+            continue
+        src = root / o["rel"]
+        try:
+            if action == "delete":
+                os.unlink(src)
+                deleted.append("/storage/" + o["rel"])
+            else:
+                dest = dest_root / o["rel"]
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(src, dest)
+        except FileNotFoundError:
+            continue      # déjà retiré par un autre passage
+        done += 1
+    for i in range(0, len(deleted), BATCH_SIZE):
+        session.execute(
+            text("DELETE FROM stored_file WHERE chemin IN :chemins").bindparams(bindparam("chemins", expanding=True)),
+            {"chemins": deleted[i:i + BATCH_SIZE]},
+        )
+    session.commit()
+    return done
+
+
+def register_cli(app) -> None:
+    @app.cli.command("storage-scrub")
+    @click.option("--verify", is_flag=True, help="Recalculer les SHA-256 (blobs, fichiers extraits).")
+    @click.option("--action", type=click.Choice(["report", "quarantine", "delete"]), default="report",
+                  show_default=True, help="Que faire des fichiers orphelins.")
+    @click.option("--min-age", type=float, default=24.0, show_default=True,
+                  help="Âge minimal (heures) d'un orphelin pour être retenu.")
+    @click.option("--workers", type=int, default=4, show_default=True)
+    @click.option("--report", "report_path", type=click.Path(dir_okay=False), default=None,
+                  help="Écrire le rapport complet (JSON) dans ce fichier.")
+    def storage_scrub_cmd(verify, action, min_age, workers, report_path):
+        """Compare STORAGE_ROOT et document.chemin : orphelins, manquants, sommes de contrôle."""
+        report = scan(db.session, verify=verify, min_age=min_age * 3600, workers=workers)
+        if report_path:
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        for o in report["orphans"][:20]:
+            click.echo(f"orphelin   {o['rel']} ({o['size']} o)")
+        for m in report["missing"][:20]:
+            click.echo(f"manquant   document {m['iddocument']} : {m['chemin']}")
+        for m in report["mismatched"][:20]:
+            click.echo(f"altéré     {m['rel']} (attendu {m['expected'][:12]}…, lu {m['actual'][:12]}…)")
+        click.echo("✔ scrub : " + ", ".join(f"{k}={v}" for k, v in report["stats"].items()))
+        if action != "report" and report["orphans"]:
+            n = dispose(db.session, report["orphans"], action, min_age=min_age * 3600)
+            click.echo(f"✔ {n} orphelin(s) " + ("supprimé(s)" if action == "delete" else "mis en quarantaine"))
@@ -0,0 +1,274 @@
+# app/core/search.py
+"""
+Recherche plein texte sur un index inversé (table `search_index`).
+
+Les textes indexés sont découpés en termes normalisés comme les noms de
+fichiers (files_.fold_ascii : sans accents, minuscules) ; chaque terme est
+pondéré selon le champ d'origine (titre > nom de fichier > description).
+La requête `q` est découpée de la même façon : tous les termes doivent
+correspondre (par préfixe), le score est la somme des poids, doublée pour
+un terme exact. Aucune clause `LIKE '%q%'` : uniquement des préfixes sur
+la clé primaire (entity, term, ...), sur MySQL comme sur SQLite.
+
+Les routes appellent reindex() / unindex() dans la transaction de
+l'écriture ; `flask search-rebuild` reconstruit tout l'index.
+"""
+from __future__ import annotations
+
+import re
+from pathlib import PurePosixPath
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import click
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from app.core.files_ import fold_ascii
+from app.extensions import db
+from app.models.search_term import SearchTerm  # noqa: F401 (table connue de Flask-Migrate)
+
+_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+_MIN_LEN = 2
+_MAX_LEN = 64
+_MAX_QUERY_TERMS = 8
+
+
+class Source(NamedTuple):
+    """Comment lire une entité : table, clé primaire, colonnes lues et champs pondérés."""
+    table: str
+    id_col: str
+    columns: List[str]
+    fields: List[Tuple[str, int]]     # (clé de la ligne, poids)
+    label: str                        # libellé affiché dans /api/v1/search
+    detail: Optional[str] = None      # complément affiché sous le libellé
+    prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+    @property
+    def sql(self) -> str:
+        cols = ", ".join(self.columns)
+        return f"SELECT {self.id_col} AS id, {cols} FROM {self.table} WHERE {self.id_col} IN :ids"
+
+
+def _file_name(row: Dict[str, Any]) -> Dict[str, Any]:
+    chemin = row.get("chemin") or ""
+    row["nom_fichier"] = PurePosixPath(chemin.replace("\\", "/")).stem
+    return row
+
+
+SOURCES: Dict[str, Source] = {
+    "projet": Source(
+        "projet", "idprojet",
+        ["code_projet", "initule_projet", "description_projet"],
+        [("code_projet", 4), ("initule_projet", 3), ("description_projet", 1)],
+        "initule_projet", "code_projet",
+    ),
+    "activite": Source(
+        "activite", "idactivite",
+        ["titre_act", "description_act", "idprojet"],
+        [("titre_act", 3), ("description_act", 1)],
+        "titre_act", "description_act",
+    ),
+    "personnel": Source(
+        "personnel", "idpersonnel",
+        ["nom_personnel", "fonction_personnel", "email_personnel", "type_personnel"],
+        [("nom_personnel", 3), ("fonction_personnel", 1), ("email_personnel", 1), ("type_personnel", 1)],
+        "nom_personnel", "fonction_personnel",
+    ),
+    "soumissionnaire": Source(
+        "soumissionnaire", "idsoumissionnaire",
+        ["nom_Soum AS nom_soum", "nif_soum", "adresse_soum", "email_soum"],
+        [("nom_soum", 3), ("nif_soum", 2), ("email_soum", 1), ("adresse_soum", 1)],
+        "nom_soum", "nif_soum",
+    ),
+    "commande": Source(
+        "commande", "idcommande",
+        ["libelle_commande", "nature_commande", "type_commande", "idprojet"],
+        [("libelle_commande", 3), ("nature_commande", 1), ("type_commande", 1)],
+        "libelle_commande", "type_commande",
+    ),
+    "evenement": Source(
+        "evenement", "idevenement",
+        ["type_evenement", "description_evenement", "statut_evenement", "idprojet"],
+        [("type_evenement", 2), ("description_evenement", 2), ("statut_evenement", 1)],
+        "type_evenement", "description_evenement",
+    ),
+    "document": Source(
+        "document", "iddocument",
+        ["titre_document", "description_document", "chemin"],
+        [("titre_document", 3), ("nom_fichier", 2), ("description_document", 1)],
+        "titre_document", "chemin",
+        _file_name,
+    ),
+}
+
+
+def tokens(value: Any) -> List[str]:
+    """Termes normalisés d'un texte (ordre conservé, doublons compris)."""
+    if value is None:
+        return []
+    return [t[:_MAX_LEN] for t in _SPLIT_RE.split(fold_ascii(str(value))) if len(t) >= _MIN_LEN]
+
+
+def _terms(row: Dict[str, Any], fields: List[Tuple[str, int]]) -> Dict[str, int]:
+    weights: Dict[str, int] = {}
+    for key, weight in fields:
+        for t in tokens(row.get(key)):
+            weights[t] = weights.get(t, 0) + weight
+    return weights
+
+
+def text_weights(value: str, cap: int = 10) -> Dict[str, int]:
+    """Termes d'un texte long, pondérés par leur fréquence (plafonnée à `cap`)."""
+    weights: Dict[str, int] = {}
+    for t in tokens(value):
+        if weights.get(t, 0) < cap:
+            weights[t] = weights.get(t, 0) + 1
+    return weights
+
+
+# ---------- maintenance ----------
+_INSERT = text("INSERT INTO search_index (entity, term, entity_id, weight) VALUES (:e, :t, :i, :w)")
+
+
+def unindex(session: Session, entity: str, ids: Iterable[int]) -> None:
+    ids = list(ids)
+    if ids:
+        session.execute(
+            text("DELETE FROM search_index WHERE entity = :e AND entity_id IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"e": entity, "ids": ids},
+        )
+
+
+def index_weights(session: Session, entity: str, entity_id: int, weights: Dict[str, int],
+                  batch_size: int = 1000) -> None:
+    """Remplace les termes de (entity, entity_id) par `weights`. Pas de commit."""
+    unindex(session, entity, [entity_id])
+    params = [{"e": entity, "t": t, "i": entity_id, "w": w} for t, w in weights.items()]
+    for start in range(0, len(params), batch_size):
+        session.execute(_INSERT, params[start:start + batch_size])
+
+
+def reindex(session: Session, entity: str, ids: Iterable[int]) -> None:
+    """(Ré)indexe les lignes `ids` de `entity` depuis la base. Pas de commit."""
+    ids = list(ids)
+    if not ids:
+        return
+    src = SOURCES[entity]
+    unindex(session, entity, ids)
+    rows = session.execute(
+        text(src.sql).bindparams(bindparam("ids", expanding=True)), {"ids": ids}
+    ).mappings().all()
+
+    params = []
+    for r in rows:
+        r = dict(r)
+        if src.prepare is not None:
+            r = src.prepare(r)
+        for term, weight in _terms(r, src.fields).items():
+            params.append({"e": entity, "t": term, "i": r["id"], "w": weight})
+    if params:
+        session.execute(_INSERT, params)
+
+
+def rebuild(session: Session, entity: Optional[str] = None, batch_size: int = 500) -> None:
+    for name in ([entity] if entity else list(SOURCES)):
+        src = SOURCES[name]
+        session.execute(text("DELETE FROM search_index WHERE entity = :e"), {"e": name})
+        all_ids = session.execute(text(f"SELECT {src.id_col} FROM {src.table}")).scalars().all()
+        for start in range(0, len(all_ids), batch_size):
+            reindex(session, name, all_ids[start:start + batch_size])
+
+
+# ---------- recherche ----------
+def match_sql(entity: Union[str, Sequence[str]], q: str, alias: str = "_s") -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Table dérivée `(entity_id, score)` des lignes de `entity` correspondant à
+    tous les termes de `q`, à joindre dans la requête de liste :
+
+        JOIN ({sql}) s ON s.entity_id = d.iddocument
+
+    `entity` peut être une liste d'entités partageant le même id (ex : les
+    métadonnées et le contenu d'un document) ; les termes peuvent alors être
+    trouvés dans l'une ou l'autre.
+
+    None si `q` ne contient aucun terme exploitable.
+    """
+    entities = [entity] if isinstance(entity, str) else list(entity)
+    built = _term_union(entities, q, alias)
+    if built is None:
+        return None
+    union, n_terms, params = built
+    sql = (
+        f"SELECT m.entity_id, CAST(SUM(m.w) AS SIGNED) AS score FROM ({union}) m "
+        f"GROUP BY m.entity_id HAVING COUNT(DISTINCT m.tok) = {n_terms}"
+    )
+    return sql, params
+
+
+def _term_union(entities: List[str], q: str, alias: str) -> Optional[Tuple[str, int, Dict[str, Any]]]:
+    """UNION ALL (une branche par terme de `q`) des lignes (entity, entity_id, w, tok)."""
+    terms = list(dict.fromkeys(tokens(q)))[:_MAX_QUERY_TERMS]
+    if not terms or not entities:
+        return None
+    params: Dict[str, Any] = {f"{alias}e{n}": e for n, e in enumerate(entities)}
+    in_entities = ", ".join(f":{alias}e{n}" for n in range(len(entities)))
+    parts = []
+    for i, t in enumerate(terms):
+        parts.append(
+            f"SELECT entity, entity_id, weight * (CASE WHEN term = :{alias}x{i} THEN 2 ELSE 1 END) AS w, {i} AS tok "
+            f"FROM search_index WHERE entity IN ({in_entities}) AND term LIKE :{alias}p{i}"
+        )
+        params[f"{alias}x{i}"] = t
+        params[f"{alias}p{i}"] = t + "%"   # termes en [a-z0-9] : pas de joker à échapper
+    return " UNION ALL ".join(parts), len(terms), params
+
+
+def search_all(session: Session, q: str, types: Optional[Sequence[str]] = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Recherche multi-entités : [{type, id, label, detail, score}] triés par
+    score. Les libellés sont relus par type (une requête IN par type présent).
+    """
+    entities = [t for t in (types or SOURCES) if t in SOURCES]
+    built = _term_union(entities, q, "_g")
+    if built is None:
+        return []
+    union, n_terms, params = built
+    hits = session.execute(text(
+        f"SELECT m.entity, m.entity_id, CAST(SUM(m.w) AS SIGNED) AS score FROM ({union}) m "
+        f"GROUP BY m.entity, m.entity_id HAVING COUNT(DISTINCT m.tok) = {n_terms} "
+        "ORDER BY score DESC, m.entity, m.entity_id DESC LIMIT :_glimit"
+    ), dict(params, _glimit=limit)).all()
+
+    by_type: Dict[str, List[int]] = {}
+    for entity, entity_id, _ in hits:
+        by_type.setdefault(entity, []).append(entity_id)
+    rows: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for entity, ids in by_type.items():
+        src = SOURCES[entity]
+        for r in session.execute(text(src.sql).bindparams(bindparam("ids", expanding=True)), {"ids": ids}).mappings():
+            rows[(entity, r["id"])] = dict(r)
+
+    out = []
+    for entity, entity_id, score in hits:
+        r = rows.get((entity, entity_id))
+        if r is None:  # ligne supprimée par cascade, pas encore retirée de l'index
+            continue
+        src = SOURCES[entity]
+        item = {"type": entity, "id": entity_id, "label": r.get(src.label), "score": int(score),
+                "detail": r.get(src.detail) if src.detail else None}
+        if "idprojet" in r:
+            item["idprojet"] = r["idprojet"]
+        out.append(item)
+    return out
+
+
+def register_cli(app) -> None:
+    @app.cli.command("search-rebuild")
+    @click.option("--entity", default=None, help="Limiter à une entité (ex: document).")
+    def search_rebuild_cmd(entity):
+        """Reconstruit l'index de recherche (search_index)."""
+        rebuild(db.session, entity)
+        db.session.commit()
+        click.echo("✔ search_index reconstruit")
@@ -29,3 +29,24 @@ def create_access_token(subject: str, role: str, expires_minutes: int | None = N
     )
     payload: dict[str, Any] = {"sub": subject, "role": role, "exp": expire}
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALG)
+
+def decode_access_token(token: str) -> Optional[dict[str, Any]]:
+    """Claims du jeton s'il est valide (signature + expiration), sinon None."""
+    try:
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
+    except Exception:
+        return None
+
+def request_claims(request, *, allow_query: bool = True) -> Optional[dict[str, Any]]:
+    """
+    Claims du jeton de la requête : en-tête `Authorization: Bearer …`, ou
+    `?token=…` (un lecteur PDF / une balise <img> ne sait pas poser d'en-tête).
+    allow_query=False : en-tête seulement (routes d'administration, le jeton
+    ne doit pas finir dans les journaux d'accès ou l'historique).
+    """
+    auth = request.headers.get("Authorization", "")
+    if auth[:7].lower() == "bearer ":
+        token = auth[7:].strip()
+    else:
+        token = request.args.get("token") if allow_query else None
+    return decode_access_token(token) if token else None
@@ -0,0 +1,140 @@
+# app/core/slow_queries.py
+"""
+Journal des requêtes SQL lentes, avec plan d'exécution.
+
+Toute requête dont la durée dépasse SLOW_QUERY_MS est gardée dans un
+tampon circulaire (SLOW_QUERY_BUFFER entrées, par processus) : forme SQL
+sans littéraux, paramètres (tronqués), durée, endpoint appelant (ou le
+thread hors requête HTTP).
+
+Pour un SELECT, le plan (`EXPLAIN` ; `EXPLAIN QUERY PLAN` sous SQLite) est
+demandé en arrière-plan, sur une autre connexion du pool et avec les mêmes
+paramètres : on obtient le plan de la variante réellement exécutée (clauses
+WHERE construites dynamiquement) sans retarder la réponse. Une même forme
+n'est ré-expliquée qu'après EXPLAIN_EVERY secondes.
+
+Consultation : GET /api/v1/admin/slow-queries (administrateurs, voir
+app/routes/admin.py). Chaque worker gunicorn a son propre tampon.
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.timing import statement_shape
+
+EXPLAIN_EVERY = 600          # secondes entre deux EXPLAIN d'une même forme
+_MAX_PENDING = 20            # EXPLAIN en attente au-delà : ignoré
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+_lock = threading.Lock()
+_buffer: Deque[Dict[str, Any]] = deque(maxlen=200)
+_explained: Dict[str, float] = {}
+_explainer: Optional[ThreadPoolExecutor] = None
+_pending = 0
+_threshold: Optional[float] = None       # secondes ; None = désactivé
+_explain = True
+
+
+def shape(statement: str) -> str:
+    """Forme de la requête : littéraux chaîne et nombres retirés."""
+    return statement_shape(_STRING_RE.sub("?", statement))
+
+
+def _params_repr(parameters: Any) -> str:
+    text = repr(parameters)
+    return text if len(text) <= 500 else text[:500] + "…"
+
+
+def _explain_sql(dialect_name: str) -> str:
+    return "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+
+
+def _run_explain(entry: Dict[str, Any], engine, statement: str, parameters: Any) -> None:
+    global _pending
+    try:
+        with engine.connect() as conn:
+            res = conn.exec_driver_sql(_explain_sql(engine.dialect.name) + statement, parameters)
+            entry["explain"] = [dict(r._mapping) for r in res]
+    except Exception as e:  # paramètres non rejouables, droits, ...
+        entry["explain"] = {"error": f"{type(e).__name__}: {e}"[:300]}
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _slow_start(conn, cursor, statement, parameters, context, executemany):
+    if _threshold is not None:
+        conn.info.setdefault("_slow_t0", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _slow_check(conn, cursor, statement, parameters, context, executemany):
+    global _explainer, _pending
+    stack = conn.info.get("_slow_t0")
+    if _threshold is None or not stack:
+        return
+    dt = time.perf_counter() - stack.pop()
+    if dt < _threshold or statement.lstrip()[:7].upper() == "EXPLAIN":
+        return
+    sh = shape(statement)
+    entry: Dict[str, Any] = {
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "duration_ms": round(dt * 1000, 1),
+        "endpoint": request.endpoint if has_request_context() else f"<{threading.current_thread().name}>",
+        "shape": sh,
+        "params": _params_repr(parameters),
+        "pid": os.getpid(),
+        "explain": None,
+    }
+    is_select = statement.lstrip()[:6].upper() == "SELECT" or statement.lstrip()[:5].upper() == "WITH "
+    with _lock:
+        _buffer.append(entry)
+        now = time.time()
+        if (_explain and is_select and not executemany and _pending < _MAX_PENDING
+                and now - _explained.get(sh, 0) >= EXPLAIN_EVERY):
+            if len(_explained) > 1000:
+                _explained.clear()
+            _explained[sh] = now
+            _pending += 1
+            if _explainer is None:
+                _explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-explain")
+            entry["explain"] = "pending"
+            _explainer.submit(_run_explain, entry, conn.engine, statement, parameters)
+
+
+def entries(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Requêtes lentes, la plus récente d'abord."""
+    with _lock:
+        items = [dict(e) for e in reversed(_buffer)]
+    return items[:limit] if limit else items
+
+
+def capacity() -> int:
+    return _buffer.maxlen or 0
+
+
+def clear() -> None:
+    with _lock:
+        _buffer.clear()
+        _explained.clear()
+
+
+def configure(app) -> None:
+    global _buffer, _threshold, _explain
+    ms = float(app.config.get("SLOW_QUERY_MS", 200))
+    _threshold = ms / 1000 if ms > 0 else None
+    _explain = bool(app.config.get("SLOW_QUERY_EXPLAIN", True))
+    with _lock:
+        _buffer = deque(_buffer, maxlen=max(1, int(app.config.get("SLOW_QUERY_BUFFER", 200))))
@@ -0,0 +1,36 @@
+# app/core/streaming.py
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import Select
+
+from app.extensions import db
+
+STREAM_BATCH_SIZE = 500
+
+
+def wants_stream(args) -> bool:
+    """`?stream=1` (ou true/yes) active l'écriture incrémentale du tableau JSON."""
+    return (args.get("stream") or "").strip().lower() in ("1", "true", "yes")
+
+
+def stream_json_array(stmt: Select, serialize: Callable[[Any], dict], *,
+                      batch_size: int = STREAM_BATCH_SIZE) -> Response:
+    """
+    Exécute `stmt` (select d'une entité ORM) avec yield_per et écrit le tableau
+    JSON élément par élément : la mémoire reste bornée à `batch_size` objets,
+    quelle que soit la taille de la table.
+    """
+    def generate():
+        result = db.session.execute(stmt.execution_options(yield_per=batch_size)).scalars()
+        dumps = current_app.json.dumps
+        yield "["
+        sep = ""
+        for obj in result:
+            yield sep + dumps(serialize(obj))
+            sep = ","
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
@@ -0,0 +1,136 @@
+# app/core/suggest.py
+"""
+Autocomplétion (« typeahead ») des sélecteurs de clés étrangères.
+
+Chaque entité garde en mémoire un index trié des libellés normalisés
+(files_.fold_ascii : sans accents, minuscules), avec une entrée par début de
+mot : « Forage puits école » répond à « for », « pui » et « eco ». Une
+frappe = une recherche dichotomique (bisect), aucune requête SQL.
+
+L'index est reconstruit à la demande quand la version de la table (celle
+du cache des réponses, incrémentée à chaque écriture) a changé, ou au plus
+tard après RESPONSE_CACHE_TTL secondes (écritures faites par un autre
+worker sans cache partagé).
+
+    projets_suggest = PrefixIndex("projet", "idprojet", "code_projet", extra=["initule_projet"])
+
+    @bp.get("/suggest")
+    def suggest_projets():
+        return suggest_response(projets_suggest)
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from flask import jsonify, request
+from sqlalchemy import text
+
+from app.core.cache import response_cache
+from app.core.files_ import fold_ascii
+from app.extensions import db
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def normalize(value: Any) -> str:
+    return " ".join(_WORD_RE.findall(fold_ascii(str(value or ""))))
+
+
+class _Snapshot(NamedTuple):
+    keys: List[str]                     # suffixes normalisés, triés
+    ids: List[int]                      # id de la ligne de chaque clé
+    items: Dict[int, Dict[str, Any]]    # id -> élément renvoyé au client
+    version: int
+    built_at: float
+
+
+class PrefixIndex:
+    def __init__(self, table: str, id_col: str, label_col: str, extra: Sequence[str] = ()):
+        self.table = table
+        self.id_col = id_col
+        self.label_col = label_col
+        self.extra = list(extra)
+        self._snap: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+
+    def _version(self) -> int:
+        return response_cache.versions([self.table])[self.table]
+
+    def _build(self, version: int) -> _Snapshot:
+        cols = ", ".join([f"{self.id_col} AS id", f"{self.label_col} AS label"] + self.extra)
+        rows = db.session.execute(text(
+            f"SELECT {cols} FROM {self.table} WHERE {self.label_col} IS NOT NULL"
+        )).mappings().all()
+
+        entries: List[Tuple[str, int]] = []
+        items: Dict[int, Dict[str, Any]] = {}
+        for r in rows:
+            words = normalize(r["label"]).split(" ")
+            if not words[0]:
+                continue
+            items[r["id"]] = {self.id_col: r["id"], self.label_col: r["label"],
+                              **{c: r[c] for c in self.extra}}
+            for i in range(len(words)):
+                entries.append((" ".join(words[i:]), r["id"]))
+        entries.sort()
+        return _Snapshot([k for k, _ in entries], [i for _, i in entries], items, version, time.time())
+
+    def snapshot(self) -> _Snapshot:
+        version = self._version()
+        snap = self._snap
+        if snap is None or snap.version != version or time.time() - snap.built_at > response_cache.ttl:
+            with self._lock:
+                snap = self._snap
+                if snap is None or snap.version != version or time.time() - snap.built_at > response_cache.ttl:
+                    snap = self._snap = self._build(version)
+        return snap
+
+    def suggest(self, prefix: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        words = normalize(prefix).split(" ")
+        if not words[0]:
+            return []
+        # dichotomie sur le 1er mot ; les suivants doivent commencer les mots suivants
+        # (« for pu » -> « forage puits ... »)
+        first, rest = words[0], words[1:]
+        snap = self.snapshot()
+        out: List[Dict[str, Any]] = []
+        seen = set()
+        i = bisect_left(snap.keys, first)
+        while i < len(snap.keys) and snap.keys[i].startswith(first) and len(out) < limit:
+            rid = snap.ids[i]
+            if rid not in seen and (not rest or self._follows(snap.keys[i], rest)):
+                seen.add(rid)
+                out.append(snap.items[rid])
+            i += 1
+        return out
+
+    @staticmethod
+    def _follows(key: str, rest: List[str]) -> bool:
+        key_words = key.split(" ")[1:]
+        return len(key_words) >= len(rest) and all(k.startswith(w) for k, w in zip(key_words, rest))
+
+
+def suggest_response(index: PrefixIndex):
+    """Réponse standard de GET .../suggest?prefix=...&limit=..."""
+    limit = min(max(request.args.get("limit", default=DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+    return jsonify(index.suggest(request.args.get("prefix", ""), limit))
+
+
+def suggest_spec(tag: str, example: Dict[str, Any]) -> Dict[str, Any]:
+    """Spécification Swagger commune aux endpoints /suggest."""
+    return {
+        "tags": [tag],
+        "summary": "Autocomplétion (préfixe d'un mot du libellé, sans accents)",
+        "parameters": [
+            {"in": "query", "name": "prefix", "required": True, "type": "string"},
+            {"in": "query", "name": "limit", "type": "integer", "default": DEFAULT_LIMIT, "maximum": MAX_LIMIT},
+        ],
+        "responses": {"200": {"description": "Éléments dont un mot du libellé commence par prefix",
+                              "examples": {"application/json": [example]}}},
+    }
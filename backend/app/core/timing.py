@@ -0,0 +1,153 @@
+# app/core/timing.py
+"""
+Mesures par requête : nombre de requêtes SQL, temps base de données,
+requête la plus lente, temps de sérialisation JSON, temps total.
+
+- SQL : écouteurs before/after_cursor_execute sur tous les Engine ; ils ne
+  font rien hors requête HTTP (CLI, threads d'arrière-plan) ;
+- sérialisation : fournisseur JSON de l'app (jsonify, streaming) chronométré ;
+- restitution : en-tête `Server-Timing` (visible dans l'onglet Réseau des
+  navigateurs) et une ligne JSON sur le logger `<app>.timing`, avec le
+  blueprint et l'endpoint Flask, pour agréger par route.
+
+    Server-Timing: db;dur=12.4;desc="7 q", db-max;dur=6.1, ser;dur=0.8, total;dur=18.2
+
+Le texte SQL n'apparaît que dans le log (jamais dans l'en-tête).
+Coût : deux perf_counter() par requête SQL et un par appel JSON.
+REQUEST_TIMING_LOG_MIN_MS ne journalise que les requêtes plus lentes.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current: ContextVar[Optional["RequestStats"]] = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("start", "queries", "db", "slowest", "slowest_sql", "serialize", "shapes", "_token")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0              # secondes
+        self.slowest = 0.0
+        self.slowest_sql: Optional[str] = None
+        self.serialize = 0.0
+        self.shapes: Optional[Dict[str, int]] = None   # forme SQL -> nb d'exécutions (app/core/query_budget.py)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+
+def current() -> Optional[RequestStats]:
+    """Mesures de la requête HTTP en cours (None hors requête ou si désactivé)."""
+    return _current.get()
+
+
+# ---------- SQL ----------
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("_timing", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    st = _current.get()
+    stack = conn.info.get("_timing")
+    if st is None or not stack:
+        return
+    dt = time.perf_counter() - stack.pop()
+    st.queries += 1
+    st.db += dt
+    if dt > st.slowest:
+        st.slowest = dt
+        st.slowest_sql = statement
+    if st.shapes is not None:
+        shape = statement_shape(statement)
+        st.shapes[shape] = st.shapes.get(shape, 0) + 1
+
+
+_IN_LIST_RE = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+def statement_shape(statement: str) -> str:
+    """Requête sans ses valeurs : listes IN (?, ?, …) réduites, nombres remplacés, espaces compactés."""
+    s = _IN_LIST_RE.sub("(…)", statement)
+    s = _NUMBER_RE.sub("N", s)
+    return " ".join(s.split())
+
+
+# ---------- JSON ----------
+class TimedJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider qui cumule son temps dans les mesures de la requête."""
+
+    def dumps(self, obj, **kwargs):
+        st = _current.get()
+        if st is None:
+            return super().dumps(obj, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            st.serialize += time.perf_counter() - t0
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def register_request_timing(app) -> None:
+    if not app.config.get("REQUEST_TIMING_ENABLED", True):
+        return
+    app.json = TimedJSONProvider(app)
+    log = app.logger.getChild("timing")
+    log.setLevel(logging.INFO)
+    min_ms = float(app.config.get("REQUEST_TIMING_LOG_MIN_MS", 0))
+
+    @app.before_request
+    def _timing_start():
+        st = RequestStats()
+        st._token = _current.set(st)
+
+    @app.after_request
+    def _timing_header(resp):
+        st = _current.get()
+        if st is None:
+            return resp
+        total = st.elapsed()
+        resp.headers["Server-Timing"] = (
+            f'db;dur={_ms(st.db)};desc="{st.queries} q", db-max;dur={_ms(st.slowest)}, '
+            f"ser;dur={_ms(st.serialize)}, total;dur={_ms(total)}"
+        )
+        if _ms(total) >= min_ms:
+            log.info(json.dumps({
+                "blueprint": request.blueprint,
+                "endpoint": request.endpoint,
+                "method": request.method,
+                "status": resp.status_code,
+                "total_ms": _ms(total),
+                "db_ms": _ms(st.db),
+                "queries": st.queries,
+                "slowest_ms": _ms(st.slowest),
+                "slowest_sql": " ".join(st.slowest_sql.split())[:500] if st.slowest_sql else None,
+                "serialize_ms": _ms(st.serialize),
+            }, ensure_ascii=False))
+        return resp
+
+    @app.teardown_request
+    def _timing_stop(exc=None):
+        st = _current.get()
+        if st is not None:
+            _current.reset(st._token)
@@ -0,0 +1,231 @@
+# app/core/uploads.py
+"""
+Téléversements reprenables, par morceaux.
+
+    POST   /api/v1/storage/uploads                 {filename, size, sha256?}  -> session
+    PUT    /api/v1/storage/uploads/<id>?offset=N   corps brut = un morceau (X-Chunk-Sha256 optionnel)
+    GET    /api/v1/storage/uploads/<id>            état : morceaux reçus / manquants
+    POST   /api/v1/storage/uploads/<id>/complete   assemble -> blob (app.core.blobs)
+    DELETE /api/v1/storage/uploads/<id>            abandon
+
+Tout l'état est sur disque, sous STORAGE_ROOT/.tmp/uploads/<id>/ (n'importe
+quel worker peut recevoir n'importe quel morceau) :
+- meta.json : nom, taille, taille de morceau, sha256 attendu, expiration ;
+- <index>.part + <index>.sha256 : un morceau et sa somme de contrôle.
+
+Les morceaux sont découpés à chunk_size (offset multiple de chunk_size ;
+le dernier est plus court). Chaque morceau est écrit dans un temporaire,
+vérifié, puis renommé : un morceau présent est toujours complet. Un
+client coupé relit l'état (GET) et renvoie seulement les morceaux manquants.
+
+À la fin, les morceaux sont concaténés (en les revérifiant) dans un
+temporaire haché au passage, puis renommés atomiquement en blob. Les
+sessions inactives depuis UPLOAD_SESSION_TTL sont purgées à la création
+d'une session et par `flask uploads-purge`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+import click
+from flask import current_app
+
+from app.core import blobs
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_SHA_RE = re.compile(r"^[0-9a-f]{64}$")
+_BLOCK = 1024 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _cfg(key: str, default: int) -> int:
+    return int(current_app.config.get(key, default))
+
+
+def _root() -> Path:
+    return blobs.tmp_dir("uploads")
+
+
+def _dir(upload_id: str) -> Path:
+    if not _ID_RE.match(upload_id or ""):
+        raise UploadError(404, "Session de téléversement introuvable.")
+    d = _root() / upload_id
+    if not (d / "meta.json").is_file():
+        raise UploadError(404, "Session de téléversement introuvable ou expirée.")
+    return d
+
+
+def _read_meta(d: Path) -> Dict[str, Any]:
+    return json.loads((d / "meta.json").read_text())
+
+
+def _touch(d: Path) -> None:
+    # l'expiration part de la dernière activité (mtime du répertoire)
+    os.utime(d, None)
+
+
+def _nb_chunks(meta: Dict[str, Any]) -> int:
+    return max(1, -(-meta["size"] // meta["chunk_size"]))
+
+
+def _received(d: Path) -> List[int]:
+    return sorted(int(e.name[:-5]) for e in os.scandir(d) if e.name.endswith(".part") and e.name[:-5].isdigit())
+
+
+def status(upload_id: str) -> Dict[str, Any]:
+    d = _dir(upload_id)
+    meta = _read_meta(d)
+    received = _received(d)
+    have = set(received)
+    ttl = _cfg("UPLOAD_SESSION_TTL", 86400)
+    return {
+        "id": upload_id,
+        "filename": meta["filename"],
+        "size": meta["size"],
+        "chunk_size": meta["chunk_size"],
+        "nb_chunks": _nb_chunks(meta),
+        "received": received,
+        "missing": [i for i in range(_nb_chunks(meta)) if i not in have],
+        "expires_at": int(d.stat().st_mtime + ttl),
+    }
+
+
+def create(filename: str, size: Any, sha256: Optional[str] = None, chunk_size: Any = None) -> Dict[str, Any]:
+    if not filename:
+        raise UploadError(400, "filename est obligatoire.")
+    if not isinstance(size, int) or size < 0:
+        raise UploadError(400, "size doit être un entier >= 0.")
+    if size > _cfg("UPLOAD_MAX_SIZE", 2 * 1024 ** 3):
+        raise UploadError(413, "Fichier trop volumineux.")
+    if sha256 is not None and not _SHA_RE.match(str(sha256).lower()):
+        raise UploadError(400, "sha256 invalide (64 caractères hexadécimaux).")
+    default_chunk = _cfg("UPLOAD_CHUNK_SIZE", 8 * 1024 ** 2)
+    chunk_size = default_chunk if chunk_size is None else chunk_size
+    if not isinstance(chunk_size, int) or not (256 * 1024 <= chunk_size <= 64 * 1024 ** 2):
+        raise UploadError(400, "chunk_size doit être compris entre 256 Kio et 64 Mio.")
+
+    purge_expired()
+    upload_id = secrets.token_hex(16)
+    d = _root() / upload_id
+    d.mkdir()
+    meta = {"filename": str(filename)[:255], "size": size, "chunk_size": chunk_size,
+            "sha256": sha256.lower() if sha256 else None, "created": time.time()}
+    tmp = d / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, d / "meta.json")
+    return status(upload_id)
+
+
+def put_chunk(upload_id: str, offset: Any, stream: BinaryIO, chunk_sha256: Optional[str]) -> Dict[str, Any]:
+    d = _dir(upload_id)
+    meta = _read_meta(d)
+    cs = meta["chunk_size"]
+    if not isinstance(offset, int) or offset < 0 or offset % cs or (offset >= meta["size"] and meta["size"] > 0):
+        raise UploadError(400, f"offset doit être un multiple de {cs} inférieur à {meta['size']}.")
+    index = offset // cs
+    expected_len = min(cs, meta["size"] - offset)
+
+    h = hashlib.sha256()
+    n = 0
+    fd, tmp_name = tempfile.mkstemp(dir=d, prefix=f"{index:06d}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                block = stream.read(min(_BLOCK, expected_len - n + 1))
+                if not block:
+                    break
+                n += len(block)
+                if n > expected_len:
+                    raise UploadError(400, f"Morceau trop long : {expected_len} octets attendus.")
+                h.update(block)
+                out.write(block)
+        if n != expected_len:
+            raise UploadError(400, f"Morceau incomplet : {n} octets reçus sur {expected_len}.")
+        digest = h.hexdigest()
+        if chunk_sha256 and chunk_sha256.lower() != digest:
+            raise UploadError(422, "Somme de contrôle du morceau incorrecte.")
+        (d / f"{index:06d}.sha256").write_text(digest)
+        os.replace(tmp_name, d / f"{index:06d}.part")
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+    _touch(d)
+    return {"id": upload_id, "index": index, "offset": offset, "size": n, "sha256": digest}
+
+
+def complete(upload_id: str) -> blobs.Blob:
+    d = _dir(upload_id)
+    meta = _read_meta(d)
+    missing = status(upload_id)["missing"]
+    if missing and meta["size"] > 0:
+        raise UploadError(409, f"Morceaux manquants : {missing[:20]}")
+
+    total = hashlib.sha256()
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(dir=blobs.tmp_dir(), prefix="up-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for index in range(_nb_chunks(meta) if meta["size"] > 0 else 0):
+                part = d / f"{index:06d}.part"
+                h = hashlib.sha256()
+                with open(part, "rb") as f:
+                    for block in iter(lambda: f.read(_BLOCK), b""):
+                        h.update(block)
+                        total.update(block)
+                        out.write(block)
+                        size += len(block)
+                if h.hexdigest() != (d / f"{index:06d}.sha256").read_text().strip():
+                    raise UploadError(409, f"Morceau {index} altéré sur disque : à renvoyer.")
+            out.flush()
+            os.fsync(out.fileno())
+        sha = total.hexdigest()
+        if meta["sha256"] and meta["sha256"] != sha:
+            raise UploadError(422, "sha256 du fichier assemblé différent de celui annoncé.")
+        blob = blobs.finalize(tmp_name, sha, size, meta["filename"])
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    shutil.rmtree(d, ignore_errors=True)
+    return blob
+
+
+def filename_of(upload_id: str) -> str:
+    return _read_meta(_dir(upload_id))["filename"]
+
+
+def abort(upload_id: str) -> None:
+    shutil.rmtree(_dir(upload_id), ignore_errors=True)
+
+
+def purge_expired() -> int:
+    """Supprime les sessions sans activité depuis UPLOAD_SESSION_TTL secondes."""
+    limit = time.time() - _cfg("UPLOAD_SESSION_TTL", 86400)
+    n = 0
+    for e in os.scandir(_root()):
+        if e.is_dir() and _ID_RE.match(e.name) and e.stat().st_mtime < limit:
+            shutil.rmtree(e.path, ignore_errors=True)
+            n += 1
+    return n
+
+
+def register_cli(app) -> None:
+    @app.cli.command("uploads-purge")
+    def uploads_purge_cmd():
+        """Supprime les téléversements par morceaux abandonnés."""
+        click.echo(f"✔ {purge_expired()} session(s) expirée(s) supprimée(s)")
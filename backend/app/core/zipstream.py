@@ -0,0 +1,144 @@
+# app/core/zipstream.py
+"""
+Archive ZIP produite à la volée, sans fichier temporaire.
+
+Toutes les entrées sont « stored » (non compressées) : les documents sont
+presque tous des PDF, images ou fichiers bureautiques déjà compressés, et
+une entrée stored a une taille connue d'avance. La longueur exacte de
+l'archive se calcule donc avant d'envoyer le premier octet (Content-Length,
+HEAD, barre de progression du navigateur).
+
+Le CRC32 n'est connu qu'après lecture : il est écrit dans un « data
+descriptor » après chaque fichier (bit 3) ; les tailles figurent déjà dans
+l'en-tête local. Mémoire constante : un tampon de CHUNK_SIZE par lecture.
+ZIP64 est utilisé seulement quand une taille ou un offset dépasse 4 Gio.
+
+    entries = [Entry("rapport.pdf", path, size, mtime), ...]
+    return Response(stream(entries), headers={"Content-Length": str(archive_size(entries))})
+"""
+from __future__ import annotations
+
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Set
+
+CHUNK_SIZE = 256 * 1024
+
+_LIMIT = 0xFFFFFFFF
+_FLAGS = 0x0808                       # data descriptor + noms en UTF-8
+
+
+class Entry(NamedTuple):
+    name: str                         # chemin dans l'archive ("dossier/fichier.pdf")
+    path: Path
+    size: int
+    mtime: float
+
+
+def _dos_time(mtime: float) -> tuple:
+    t = time.localtime(max(mtime, 315532800))        # le format DOS commence en 1980
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+
+def _local_header(e: Entry) -> bytes:
+    name = e.name.encode("utf-8")
+    zip64 = e.size >= _LIMIT
+    extra = struct.pack("<HHQQ", 0x0001, 16, e.size, e.size) if zip64 else b""
+    size = _LIMIT if zip64 else e.size
+    tm, dt = _dos_time(e.mtime)
+    return struct.pack(
+        "<IHHHHHIIIHH", 0x04034B50, 45 if zip64 else 20, _FLAGS, 0, tm, dt,
+        0, size, size, len(name), len(extra),
+    ) + name + extra
+
+
+def _descriptor(e: Entry, crc: int) -> bytes:
+    if e.size >= _LIMIT:
+        return struct.pack("<IIQQ", 0x08074B50, crc, e.size, e.size)
+    return struct.pack("<IIII", 0x08074B50, crc, e.size, e.size)
+
+
+def _central_header(e: Entry, crc: int, offset: int) -> bytes:
+    name = e.name.encode("utf-8")
+    fields = []
+    if e.size >= _LIMIT:
+        fields += [e.size, e.size]
+    if offset >= _LIMIT:
+        fields.append(offset)
+    extra = struct.pack(f"<HH{len(fields)}Q", 0x0001, 8 * len(fields), *fields) if fields else b""
+    size = _LIMIT if e.size >= _LIMIT else e.size
+    tm, dt = _dos_time(e.mtime)
+    return struct.pack(
+        "<IHHHHHHIIIHHHHHII", 0x02014B50, (3 << 8) | (45 if extra else 20), 45 if extra else 20, _FLAGS, 0,
+        tm, dt, crc, size, size, len(name), len(extra), 0, 0, 0,
+        0o100644 << 16, min(offset, _LIMIT),
+    ) + name + extra
+
+
+def _end(count: int, cd_offset: int, cd_size: int) -> bytes:
+    out = b""
+    if count > 0xFFFF or cd_offset >= _LIMIT or cd_size >= _LIMIT:
+        zip64_end = cd_offset + cd_size
+        out += struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0,
+                           count, count, cd_size, cd_offset)
+        out += struct.pack("<IIQI", 0x07064B50, 0, zip64_end, 1)
+    return out + struct.pack(
+        "<IHHHHIIH", 0x06054B50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+        min(cd_size, _LIMIT), min(cd_offset, _LIMIT), 0,
+    )
+
+
+def archive_size(entries: List[Entry]) -> int:
+    """Longueur exacte de l'archive produite par `stream` (le CRC n'influe pas sur la taille)."""
+    offset = cd_size = 0
+    for e in entries:
+        cd_size += len(_central_header(e, 0, offset))
+        offset += len(_local_header(e)) + e.size + len(_descriptor(e, 0))
+    return offset + cd_size + len(_end(len(entries), offset, cd_size))
+
+
+def stream(entries: List[Entry]) -> Iterator[bytes]:
+    """Octets de l'archive, fichier par fichier, par morceaux de CHUNK_SIZE."""
+    central = []
+    offset = 0
+    for e in entries:
+        header = _local_header(e)
+        yield header
+        crc, left = 0, e.size
+        with open(e.path, "rb") as f:
+            while left:
+                buf = f.read(min(CHUNK_SIZE, left))
+                if not buf:
+                    # fichier tronqué depuis le stat : l'archive annoncée ne peut plus être tenue
+                    raise IOError(f"{e.path} : taille modifiée pendant l'envoi")
+                crc = zlib.crc32(buf, crc)
+                left -= len(buf)
+                yield buf
+        tail = _descriptor(e, crc)
+        yield tail
+        central.append(_central_header(e, crc, offset))
+        offset += len(header) + e.size + len(tail)
+    cd = b"".join(central)
+    yield cd + _end(len(entries), offset, len(cd))
+
+
+def unique_name(name: str, taken: Set[str]) -> str:
+    """`name`, ou `name (2)`, `name (3)`… s'il est déjà pris (comparaison sans casse)."""
+    stem, dot, ext = name.rpartition(".")
+    if not dot or not stem:
+        stem, ext = name, ""
+    candidate, n = name, 1
+    while candidate.lower() in taken:
+        n += 1
+        candidate = f"{stem} ({n}).{ext}" if ext else f"{stem} ({n})"
+    taken.add(candidate.lower())
+    return candidate
+
+
+def safe_part(value: str) -> str:
+    """Segment de chemin d'archive : pas de séparateur ni de caractère de contrôle."""
+    s = "".join("_" if ch in '/\\:*?"<>|' or ord(ch) < 32 else ch for ch in value).strip(" .")
+    return s or "document"
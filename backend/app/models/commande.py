@@ -13,3 +13,4 @@ class Commande(db.Model):
     libelle_commande = Column(String(150), nullable=True)
     nature_commande  = Column(String(150), nullable=True)
     type_commande    = Column(String(150), nullable=True)
+    nb_soumissions   = Column(Integer, nullable=False, default=0, server_default="0")  # maintenu par app.core.counters
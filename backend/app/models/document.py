@@ -9,3 +9,4 @@ class Document(db.Model):
     date_ajout = Column(Date, nullable=False)
     titre_document = Column(String(150), nullable=False)
     description_document = Column(String(150), nullable=True)
+    nb_archives = Column(Integer, nullable=False, default=0, server_default="0")     # maintenu par app.core.counters
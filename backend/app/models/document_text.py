@@ -0,0 +1,22 @@
+# app/models/document_text.py
+from sqlalchemy import Column, Integer, BigInteger, Float, String, CHAR, DateTime, ForeignKey
+from ..extensions import db
+
+class DocumentText(db.Model):
+    """
+    État de l'extraction du texte du fichier d'un document.
+    Le texte lui-même est indexé dans search_index (entity = 'document_text').
+    Maintenu par app.core.extract ; (mtime, size, sha256) évitent de relire
+    un fichier inchangé.
+    """
+    __tablename__ = "document_text"
+
+    iddocument = Column(Integer, ForeignKey("document.iddocument", ondelete="CASCADE"), primary_key=True)
+    chemin     = Column(String(150), nullable=False)
+    mtime      = Column(Float(precision=53), nullable=True)   # DOUBLE : FLOAT (simple) arrondit un timestamp à ~2 min
+    size       = Column(BigInteger, nullable=True)
+    sha256     = Column(CHAR(64), nullable=True)
+    status     = Column(String(16), nullable=False)   # ok | empty | error | missing | unsupported
+    nb_chars   = Column(Integer, nullable=False, default=0, server_default="0")
+    error      = Column(String(255), nullable=True)
+    extracted_at = Column(DateTime, nullable=True)
@@ -21,3 +21,4 @@ class Evenement(db.Model):
     description_evenement = Column(String(150), nullable=True)
     statut_evenement      = Column(String(150), nullable=True)
     date_realisee         = Column(Date, nullable=True)
+    nb_documents          = Column(Integer, nullable=False, default=0, server_default="0")  # maintenu par app.core.counters
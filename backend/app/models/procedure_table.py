@@ -7,3 +7,4 @@ class ProcedureTable(db.Model):
 
     idprocedure   = Column(Integer, primary_key=True, index=True, autoincrement=True)
     type_procedure = Column(String(150), nullable=True, index=True)
+    nb_commandes   = Column(Integer, nullable=False, default=0, server_default="0")  # maintenu par app.core.counters
@@ -0,0 +1,19 @@
+# app/models/search_term.py
+from sqlalchemy import Column, Integer, String, Index
+from ..extensions import db
+
+class SearchTerm(db.Model):
+    """
+    Index inversé : un terme normalisé (ASCII, minuscules) par (entité, ligne).
+    Maintenu par app.core.search à chaque écriture des entités indexées.
+    """
+    __tablename__ = "search_index"
+
+    entity    = Column(String(32), primary_key=True)   # 'document', ...
+    term      = Column(String(64), primary_key=True)   # recherche par préfixe : term LIKE 'abc%'
+    entity_id = Column(Integer, primary_key=True)
+    weight    = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        Index("ix_search_index_entity_id", "entity", "entity_id"),
+    )
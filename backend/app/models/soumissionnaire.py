@@ -12,3 +12,4 @@ class Soumissionnaire(db.Model):
     telephone_soum    = Column(String(150), nullable=True)
     statut_soum       = Column(String(150), nullable=True)
     email_soum        = Column(String(150), nullable=True)
+    nb_soumissions    = Column(Integer, nullable=False, default=0, server_default="0")  # maintenu par app.core.counters
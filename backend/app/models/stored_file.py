@@ -0,0 +1,21 @@
+# app/models/stored_file.py
+from sqlalchemy import Column, Integer, BigInteger, String, CHAR, DateTime
+from ..extensions import db
+
+class StoredFile(db.Model):
+    """
+    Référence d'un fichier téléversé vers son blob (stockage adressé par contenu).
+    Plusieurs références (noms logiques différents, téléversements répétés)
+    peuvent pointer vers le même blob : `chemin` est la valeur à mettre dans
+    document.chemin (ex: "/storage/blobs/ab/cd/abcd…ef.pdf").
+    """
+    __tablename__ = "stored_file"
+
+    idfile       = Column(Integer, primary_key=True, autoincrement=True)
+    sha256       = Column(CHAR(64), nullable=False, index=True)
+    size         = Column(BigInteger, nullable=False)
+    chemin       = Column(String(150), nullable=False, index=True)
+    nom_original = Column(String(255), nullable=True)
+    nom_logique  = Column(String(150), nullable=True, index=True)   # nom normalisé (_slugify_base)
+    mime_type    = Column(String(100), nullable=True)
+    created_at   = Column(DateTime, nullable=False)
@@ -0,0 +1,18 @@
+# app/models/transaction_rollup.py
+from sqlalchemy import Column, Integer, String, CHAR, DECIMAL, ForeignKey
+from ..extensions import db
+
+class TransactionRollup(db.Model):
+    """
+    Agrégats des transactions par (projet, activité, mois, devise).
+    Maintenu par app.core.rollup à chaque écriture de transaction.
+    """
+    __tablename__ = "transaction_rollup"
+
+    idprojet   = Column(Integer, ForeignKey("projet.idprojet", ondelete="CASCADE"), primary_key=True)
+    idactivite = Column(Integer, primary_key=True, default=0)   # 0 = sans activité
+    mois       = Column(CHAR(7), primary_key=True)              # 'YYYY-MM'
+    devise     = Column(String(45), primary_key=True)
+
+    total = Column(DECIMAL(20, 2), nullable=False, default=0, server_default="0")
+    nb    = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,9 +1,16 @@
 from flask import Blueprint, request, jsonify
 from ..extensions import db
+from ..core.cache import response_cache
+from ..core import search
+from ..core.suggest import PrefixIndex, suggest_response
 from ..models.activite import Activite
 
 router = Blueprint("activites", __name__, url_prefix="/api/v1/activites")
 
+response_cache.writes(router, "activite")
+
+_suggest = PrefixIndex("activite", "idactivite", "titre_act", extra=["idprojet"])
+
 @router.get("/")
 def list_activites():
     """
@@ -77,10 +84,38 @@ def create_activite():
         dateFinPrevue_act=data.get("dateFinPrevue_act"),
     )
     db.session.add(a)
+    db.session.flush()
+    search.reindex(db.session, "activite", [a.idactivite])
     db.session.commit()
     return jsonify(a.to_dict()), 201
 
 
+@router.get("/suggest")
+def suggest_activites():
+    """
+    Suggest (autocomplétion)
+    ---
+    tags: [activites]
+    parameters:
+      - in: query
+        name: prefix
+        required: true
+        type: string
+        description: Préfixe d'un mot du libellé (sans accents ni casse)
+      - in: query
+        name: limit
+        type: integer
+        default: 10
+        maximum: 50
+    responses:
+      200:
+        description: Éléments correspondants (id + libellé)
+        examples:
+          application/json: [{"idactivite": 3, "titre_act": "Forage puits", "idprojet": 1}]
+    """
+    return suggest_response(_suggest)
+
+
 @router.get("/<int:idactivite>")
 def get_activite(idactivite: int):
     """
@@ -140,6 +175,8 @@ def update_activite(idactivite: int):
     a.description_act = data.get("description_act", a.description_act)
     a.dateDemarragePrevue_act = data.get("dateDemarragePrevue_act", a.dateDemarragePrevue_act)
     a.dateFinPrevue_act = data.get("dateFinPrevue_act", a.dateFinPrevue_act)
+    db.session.flush()
+    search.reindex(db.session, "activite", [idactivite])
     db.session.commit()
     return jsonify(a.to_dict())
 
@@ -169,5 +206,6 @@ def delete_activite(idactivite: int):
     """
     a = Activite.query.get_or_404(idactivite)
     db.session.delete(a)
+    search.unindex(db.session, "activite", [idactivite])
     db.session.commit()
     return jsonify({"deleted": True, "idactivite": idactivite, "reason": "deleted"})
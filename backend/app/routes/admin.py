@@ -0,0 +1,140 @@
+# app/routes/admin.py
+from __future__ import annotations
+
+import os
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flasgger import swag_from
+
+from app.core import profiler, slow_queries
+from app.core.security import request_claims
+
+bp_admin = Blueprint("admin", __name__, url_prefix="/api/v1/admin")
+
+
+@bp_admin.before_request
+def _require_admin():
+    if request.method == "OPTIONS":
+        return None
+    claims = request_claims(request, allow_query=False)
+    if claims is None:
+        return jsonify({"detail": "Authentification requise."}), 401
+    if claims.get("role") != "admin":
+        return jsonify({"detail": "Réservé aux administrateurs."}), 403
+    return None
+
+
+@bp_admin.get("/slow-queries")
+@swag_from({
+    "tags": ["admin"],
+    "summary": "Requêtes SQL lentes récentes (worker courant), avec plan d'exécution",
+    "parameters": [
+        {"in": "query", "name": "limit", "type": "integer", "default": 50, "maximum": 1000},
+        {"in": "query", "name": "endpoint", "type": "string",
+         "description": "Filtrer sur l'endpoint Flask appelant", "example": "projets.get_projet_dossier"},
+    ],
+    "responses": {
+        "200": {
+            "description": "Plus récentes d'abord ; explain = 'pending' tant que le plan n'est pas obtenu",
+            "examples": {"application/json": {
+                "threshold_ms": 200, "capacity": 200, "pid": 4121,
+                "items": [{
+                    "at": "2026-10-17T09:12:03+00:00", "duration_ms": 842.3,
+                    "endpoint": "projets.get_projet_dossier",
+                    "shape": "SELECT ... FROM activite WHERE idprojet = %s AND libelle LIKE ?",
+                    "params": "(3,)", "pid": 4121,
+                    "explain": [{"id": 1, "select_type": "SIMPLE", "table": "activite", "type": "ALL",
+                                 "key": None, "rows": 120000}],
+                }],
+            }},
+        },
+        "400": {"description": "Paramètre invalide"},
+        "401": {"description": "Jeton absent ou invalide"},
+        "403": {"description": "Rôle admin requis"},
+    },
+})
+def list_slow_queries():
+    try:
+        limit = int(request.args.get("limit", 50))
+    except ValueError:
+        return jsonify({"detail": "limit doit être un entier."}), 400
+    if not 1 <= limit <= 1000:
+        return jsonify({"detail": "limit doit être entre 1 et 1000."}), 400
+    endpoint = request.args.get("endpoint")
+    items = slow_queries.entries()
+    if endpoint:
+        items = [e for e in items if e["endpoint"] == endpoint]
+    return jsonify({
+        "threshold_ms": current_app.config.get("SLOW_QUERY_MS"),
+        "capacity": slow_queries.capacity(),
+        "pid": os.getpid(),
+        "items": items[:limit],
+    })
+
+
+@bp_admin.delete("/slow-queries")
+@swag_from({
+    "tags": ["admin"],
+    "summary": "Vider le journal des requêtes lentes (worker courant)",
+    "responses": {"204": {"description": "Vidé"}, "401": {"description": "Jeton absent ou invalide"},
+                  "403": {"description": "Rôle admin requis"}},
+})
+def clear_slow_queries():
+    slow_queries.clear()
+    return "", 204
+
+
+@bp_admin.get("/profiles")
+@swag_from({
+    "tags": ["admin"],
+    "summary": "Profils enregistrés (requêtes envoyées avec l'en-tête X-Profile)",
+    "responses": {
+        "200": {
+            "description": "Du plus récent au plus ancien",
+            "examples": {"application/json": {"items": [{
+                "id": "3f2a9c0e5b7d4e1f8a6b2c3d4e5f6a7b", "at": "2026-10-17T09:12:03+0000", "user": "admin_user",
+                "method": "GET", "path": "/api/v1/projets/activites/3/responsables",
+                "endpoint": "projets_v1.project_activite_responsables", "status": 200,
+                "duration_ms": 412.7, "samples": 80, "interval_ms": 5.0, "pid": 4121,
+            }]}},
+        },
+        "401": {"description": "Jeton absent ou invalide"},
+        "403": {"description": "Rôle admin requis"},
+    },
+})
+def list_profiles():
+    return jsonify({"items": profiler.listing()})
+
+
+@bp_admin.get("/profiles/<profile_id>")
+@swag_from({
+    "tags": ["admin"],
+    "summary": "Télécharger un profil (speedscope JSON ou piles repliées)",
+    "parameters": [
+        {"in": "path", "name": "profile_id", "required": True, "type": "string"},
+        {"in": "query", "name": "format", "type": "string", "enum": ["speedscope", "collapsed"],
+         "default": "speedscope"},
+    ],
+    "responses": {
+        "200": {"description": "Profil (https://www.speedscope.app, flamegraph.pl, inferno)"},
+        "400": {"description": "Format inconnu"},
+        "401": {"description": "Jeton absent ou invalide"},
+        "403": {"description": "Rôle admin requis"},
+        "404": {"description": "Profil introuvable (expiré : PROFILE_KEEP)"},
+    },
+})
+def download_profile(profile_id: str):
+    fmt = request.args.get("format", "speedscope")
+    if fmt not in ("speedscope", "collapsed"):
+        return jsonify({"detail": "format doit être speedscope ou collapsed."}), 400
+    prof = profiler.load(profile_id)
+    if prof is None:
+        return jsonify({"detail": "Profil introuvable."}), 404
+    if fmt == "collapsed":
+        resp = Response(profiler.collapsed(prof), mimetype="text/plain")
+        ext = "txt"
+    else:
+        resp = jsonify(prof)
+        ext = "speedscope.json"
+    resp.headers["Content-Disposition"] = f'attachment; filename="profile-{profile_id}.{ext}"'
+    return resp
@@ -2,12 +2,17 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Any, Dict, Optional, Iterable
+from typing import Any, Dict, List, Optional, Iterable
 
 from flask import Blueprint, jsonify, request
 from sqlalchemy import text
+from werkzeug.exceptions import BadRequest
 
 from app.extensions import db
+from app.core.cache import response_cache
+from app.core.pagination import keyset_sql, page_payload
+from app.core import bulk, counters, search
+from app.core.fk import FkRef, fk_detail, missing_fks
 from flasgger import swag_from
 
 bp_commandes = Blueprint(
@@ -16,6 +21,9 @@ bp_commandes = Blueprint(
     url_prefix="/api/v1/commandes",
 )
 
+response_cache.reads(bp_commandes, "commande", "procedure_table", "projet")
+response_cache.writes(bp_commandes, "commande", "procedure_table")
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────────────────────
@@ -32,11 +40,10 @@ SELECT
   pr.type_procedure,
   pj.code_projet,
   pj.initule_projet,
-  COALESCE(COUNT(s.idsoumission), 0) AS nb_soumissions
+  co.nb_soumissions
 FROM commande co
 LEFT JOIN procedure_table pr ON pr.idprocedure = co.idprocedure
 LEFT JOIN projet pj          ON pj.idprojet     = co.idprojet
-LEFT JOIN soumission s       ON s.idcommande    = co.idcommande
 """
 
 def _to_dict(row: Any) -> Dict[str, Any]:
@@ -49,26 +56,21 @@ def _to_dict(row: Any) -> Dict[str, Any]:
 
 def _one(cid: int) -> Optional[Dict[str, Any]]:
     row = db.session.execute(
-        text(_SQL_SELECT_JOIN + " WHERE co.idcommande = :id GROUP BY co.idcommande"),
+        text(_SQL_SELECT_JOIN + " WHERE co.idcommande = :id"),
         {"id": cid},
     ).mappings().fetchone()
     return _to_dict(row) if row else None
 
-def _exists_procedure(idprocedure: int) -> bool:
-    return bool(
-        db.session.execute(
-            text("SELECT 1 FROM procedure_table WHERE idprocedure = :id LIMIT 1"),
-            {"id": idprocedure},
-        ).first()
-    )
+def _fk_refs(body: Dict[str, Any]) -> List[FkRef]:
+    return [
+        FkRef("procedure_table", "idprocedure", body.get("idprocedure"), "idprocedure inexistant."),
+        FkRef("projet", "idprojet", body.get("idprojet"), "idprojet inexistant."),
+    ]
 
-def _exists_projet(idprojet: int) -> bool:
-    return bool(
-        db.session.execute(
-            text("SELECT 1 FROM projet WHERE idprojet = :id LIMIT 1"),
-            {"id": idprojet},
-        ).first()
-    )
+def _fk_error(body: Dict[str, Any]) -> Optional[str]:
+    """FK optionnelles : une seule requête, toutes les erreurs d'un coup."""
+    missing = missing_fks(db.session, _fk_refs(body))
+    return fk_detail(missing) if missing else None
 
 def _ensure_non_negative(name: str, value: Any) -> Optional[str]:
     """Retourne un message d'erreur si la valeur numérique est négative."""
@@ -81,6 +83,36 @@ def _ensure_non_negative(name: str, value: Any) -> Optional[str]:
         return f"{name} invalide."
     return None
 
+_COLUMNS = ("idprocedure", "idprojet", "montant_commande",
+            "libelle_commande", "nature_commande", "type_commande")
+
+_INSERT = text("""
+    INSERT INTO commande (
+        idprocedure,
+        idprojet,
+        montant_commande,
+        libelle_commande,
+        nature_commande,
+        type_commande
+    ) VALUES (
+        :idprocedure,
+        :idprojet,
+        :montant_commande,
+        :libelle_commande,
+        :nature_commande,
+        :type_commande
+    )
+""")
+
+def _prepare_bulk_row(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Validation d'une ligne de /bulk (hors FK, vérifiées pour tout le lot)."""
+    err = _ensure_non_negative("montant_commande", body.get("montant_commande"))
+    if err is None and body.get("montant_commande") is None:
+        err = "montant_commande est obligatoire."
+    if err:
+        raise BadRequest(description=err)
+    return {k: body.get(k) for k in _COLUMNS}
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Schémas Swagger (réutilisés)
 # ──────────────────────────────────────────────────────────────────────────────
@@ -144,6 +176,7 @@ CommandeCreateExample = {
         {"in": "query", "name": "max_montant", "schema": {"type": "number"}, "description": "montant_commande <= max"},
         {"in": "query", "name": "skip", "schema": {"type": "integer"}, "default": 0},
         {"in": "query", "name": "limit", "schema": {"type": "integer", "maximum": 500}, "default": 100},
+        {"in": "query", "name": "cursor", "schema": {"type": "string"}, "description": "Pagination par curseur (vide pour la 1re page) ; renvoie {items, next_cursor}"},
     ],
     "responses": {
         "200": {
@@ -160,8 +193,6 @@ def list_commandes():
     q = request.args.get("q")
     min_montant = request.args.get("min_montant", type=float)
     max_montant = request.args.get("max_montant", type=float)
-    skip = request.args.get("skip", default=0, type=int)
-    limit = min(request.args.get("limit", default=100, type=int), 500)
 
     sql = _SQL_SELECT_JOIN + " WHERE 1=1"
     params: Dict[str, Any] = {}
@@ -188,11 +219,10 @@ def list_commandes():
         sql += " AND co.montant_commande <= :max_montant"
         params["max_montant"] = max_montant
 
-    sql += " GROUP BY co.idcommande ORDER BY co.idcommande DESC LIMIT :limit OFFSET :skip"
-    params.update({"limit": limit, "skip": skip})
+    sql, params, page = keyset_sql(sql, params, request.args, id_col="co.idcommande")
 
     rows: Iterable[Any] = db.session.execute(text(sql), params).mappings().all()
-    return jsonify([_to_dict(r) for r in rows])
+    return jsonify(page_payload([_to_dict(r) for r in rows], page))
 
 
 @bp_commandes.get("/<int:idcommande>")
@@ -237,48 +267,49 @@ def create_commande():
     if err:
         return jsonify({"detail": err}), 400
 
-    if body.get("idprocedure") is not None and not _exists_procedure(int(body["idprocedure"])):
-        return jsonify({"detail": "idprocedure inexistant."}), 400
-    if body.get("idprojet") is not None and not _exists_projet(int(body["idprojet"])):
-        return jsonify({"detail": "idprojet inexistant."}), 400
+    err = _fk_error(body)
+    if err:
+        return jsonify({"detail": err}), 400
 
     if body.get("montant_commande") is None:
         return jsonify({"detail": "montant_commande est obligatoire."}), 400
 
-    db.session.execute(
-        text("""
-            INSERT INTO commande (
-                idprocedure,
-                idprojet,
-                montant_commande,
-                libelle_commande,
-                nature_commande,
-                type_commande
-            ) VALUES (
-                :idprocedure,
-                :idprojet,
-                :montant_commande,
-                :libelle_commande,
-                :nature_commande,
-                :type_commande
-            )
-        """),
-        {
-            "idprocedure": body.get("idprocedure"),
-            "idprojet": body.get("idprojet"),
-            "montant_commande": body.get("montant_commande"),
-            "libelle_commande": body.get("libelle_commande"),
-            "nature_commande": body.get("nature_commande"),
-            "type_commande": body.get("type_commande"),
-        },
-    )
-    db.session.commit()
+    res = db.session.execute(_INSERT, {k: body.get(k) for k in _COLUMNS})
+    counters.bump("commande", body, +1)
 
-    new_id = db.session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
+    new_id = res.lastrowid
+    search.reindex(db.session, "commande", [int(new_id)])
     out = _one(int(new_id))
+    db.session.commit()
     return jsonify(out), 201
 
 
+@bp_commandes.post("/bulk")
+@swag_from({
+    "tags": ["commandes"],
+    "summary": "Create Commandes (bulk)",
+    "consumes": ["application/json"],
+    "produces": ["application/json"],
+    "parameters": [
+        {"in": "query", "name": "mode", "schema": {"type": "string", "enum": ["atomic", "partial"]}, "default": "atomic",
+         "description": "atomic : tout ou rien ; partial : insère les lignes valides"},
+        {"in": "body", "name": "body", "required": True,
+         "schema": {"type": "array", "maxItems": 1000, "items": CommandeInSchema},
+         "example": [CommandeCreateExample]},
+    ],
+    "responses": {
+        "201": {"description": "Résultat par ligne : {mode, created, failed, results: [{index, id, error}]}"},
+        "400": {"description": "Lot invalide (mode atomic : rien n'est inséré)"},
+    }
+})
+def create_commandes_bulk():
+    def after_insert(rows, ids):
+        counters.bump_many("commande", rows, +1)
+        search.reindex(db.session, "commande", [i for i in ids if i is not None])
+
+    return bulk.run_bulk(db.session, _INSERT, _prepare_bulk_row, _fk_refs, after_insert=after_insert)
+
+
 @bp_commandes.put("/<int:idcommande>")
 @swag_from({
     "tags": ["commandes"],
@@ -296,7 +327,8 @@ def create_commande():
     }
 })
 def update_commande(idcommande: int):
-    if not _one(idcommande):
+    old = _one(idcommande)
+    if not old:
         return jsonify({"detail": "Commande introuvable."}), 404
 
     body = request.get_json(silent=True) or {}
@@ -305,10 +337,9 @@ def update_commande(idcommande: int):
     if err:
         return jsonify({"detail": err}), 400
 
-    if body.get("idprocedure") is not None and not _exists_procedure(int(body["idprocedure"])):
-        return jsonify({"detail": "idprocedure inexistant."}), 400
-    if body.get("idprojet") is not None and not _exists_projet(int(body["idprojet"])):
-        return jsonify({"detail": "idprojet inexistant."}), 400
+    err = _fk_error(body)
+    if err:
+        return jsonify({"detail": err}), 400
 
     db.session.execute(
         text("""
@@ -331,8 +362,11 @@ def update_commande(idcommande: int):
             "type_commande": body.get("type_commande"),
         },
     )
+    counters.move("commande", old, {"idprocedure": body.get("idprocedure")})
+    search.reindex(db.session, "commande", [idcommande])
+    out = _one(idcommande)
     db.session.commit()
-    return jsonify(_one(idcommande))
+    return jsonify(out)
 
 
 @bp_commandes.delete("/<int:idcommande>")
@@ -358,7 +392,14 @@ def delete_commande(idcommande: int):
             "Impossible de supprimer : des soumissions sont associées à cette commande."
         ), 200
 
+    row = db.session.execute(
+        text("SELECT idprocedure FROM commande WHERE idcommande = :id"),
+        {"id": idcommande},
+    ).mappings().fetchone()
     res = db.session.execute(text("DELETE FROM commande WHERE idcommande = :id"), {"id": idcommande})
+    if row and res.rowcount == 1:      # DELETE concurrent : un seul décrémente
+        counters.bump("commande", row, -1)
+    search.unindex(db.session, "commande", [idcommande])
     db.session.commit()
     if res.rowcount == 0:
         return jsonify("Aucune ligne supprimée."), 200
@@ -6,6 +6,9 @@ from datetime import date, datetime
 from flask import Blueprint, request, jsonify
 from sqlalchemy import text
 from app.extensions import db
+from app.core.cache import response_cache
+from app.core.pagination import keyset_sql, page_payload
+from app.core.fk import FkRef, fk_detail, missing_fks
 from flasgger import swag_from
 
 bp_contrats = Blueprint(
@@ -14,6 +17,8 @@ bp_contrats = Blueprint(
     url_prefix="/api/v1/contrats",
 )
 
+response_cache.writes(bp_contrats, "contrat")
+
 # ───────────────────────── Helpers (dates ISO) ─────────────────────────
 
 def _to_iso_date(v) -> Optional[str]:
@@ -61,13 +66,11 @@ def _one(cid: int) -> Optional[Dict[str, Any]]:
     ).mappings().fetchone()
     return _iso_row(dict(row), ["date_signature", "date_debut_contrat", "date_fin_contrat"]) if row else None
 
-def _exists_personnel(idpersonnel: int) -> bool:
-    return bool(
-        db.session.execute(
-            text("SELECT 1 FROM personnel WHERE idpersonnel = :id LIMIT 1"),
-            {"id": idpersonnel},
-        ).first()
-    )
+def _fk_error(body: Dict[str, Any]) -> Optional[str]:
+    missing = missing_fks(db.session, [
+        FkRef("personnel", "idpersonnel", body.get("idpersonnel"), "idpersonnel inexistant."),
+    ])
+    return fk_detail(missing) if missing else None
 
 # ───────────────────────── Schemas Swagger (dict) ─────────────────────────
 
@@ -123,6 +126,7 @@ ContratExample = {
         {"in": "query", "name": "max_montant", "schema": {"type": "number"}, "description": "montant_contrat <= max_montant"},
         {"in": "query", "name": "skip", "schema": {"type": "integer"}, "default": 0},
         {"in": "query", "name": "limit", "schema": {"type": "integer", "maximum": 500}, "default": 100},
+        {"in": "query", "name": "cursor", "schema": {"type": "string"}, "description": "Pagination par curseur (vide pour la 1re page) ; renvoie {items, next_cursor}"},
     ],
     "responses": {
         "200": {
@@ -137,8 +141,6 @@ def list_contrats():
     end_to = request.args.get("end_to")
     min_montant = request.args.get("min_montant")
     max_montant = request.args.get("max_montant")
-    skip = request.args.get("skip", default=0, type=int)
-    limit = min(request.args.get("limit", default=100, type=int), 500)
 
     sql = _SQL_JOIN + " WHERE 1=1"
     params: Dict[str, Any] = {}
@@ -159,15 +161,14 @@ def list_contrats():
         sql += " AND (c.montant_contrat IS NULL OR c.montant_contrat <= :max_montant)"
         params["max_montant"] = max_montant
 
-    sql += " ORDER BY c.idcontrat DESC LIMIT :limit OFFSET :skip"
-    params.update({"limit": limit, "skip": skip})
+    sql, params, page = keyset_sql(sql, params, request.args, id_col="c.idcontrat")
 
     rows = db.session.execute(text(sql), params).mappings().all()
     data = [
         _iso_row(dict(r), ["date_signature", "date_debut_contrat", "date_fin_contrat"])
         for r in rows
     ]
-    return jsonify(data)
+    return jsonify(page_payload(data, page))
 
 
 @bp_contrats.get("/<int:idcontrat>")
@@ -208,10 +209,11 @@ def create_contrat():
     body = request.get_json(silent=True) or {}
 
     # FK optionnelle (si fournie, doit exister)
-    if body.get("idpersonnel") is not None and not _exists_personnel(body["idpersonnel"]):
-        return jsonify({"detail": "idpersonnel inexistant."}), 400
+    err = _fk_error(body)
+    if err:
+        return jsonify({"detail": err}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             INSERT INTO contrat (
                 idpersonnel,
@@ -238,10 +240,10 @@ def create_contrat():
             "montant_contrat": body.get("montant_contrat"),
         },
     )
-    db.session.commit()
 
-    new_id = db.session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
+    new_id = res.lastrowid
     out = _one(int(new_id))
+    db.session.commit()
     return jsonify(out), 201
 
 
@@ -262,15 +264,13 @@ def create_contrat():
     }
 })
 def update_contrat(idcontrat: int):
-    if not _one(idcontrat):
-        return jsonify({"detail": "Contrat introuvable."}), 404
-
     body = request.get_json(silent=True) or {}
 
-    if body.get("idpersonnel") is not None and not _exists_personnel(body["idpersonnel"]):
-        return jsonify({"detail": "idpersonnel inexistant."}), 400
+    err = _fk_error(body)
+    if err:
+        return jsonify({"detail": err}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             UPDATE contrat
                SET idpersonnel        = :idpersonnel,
@@ -291,8 +291,12 @@ def update_contrat(idcontrat: int):
             "montant_contrat": body.get("montant_contrat"),
         },
     )
+    if res.rowcount == 0:
+        db.session.rollback()
+        return jsonify({"detail": "Contrat introuvable."}), 404
+    out = _one(idcontrat)
     db.session.commit()
-    return jsonify(_one(idcontrat))
+    return jsonify(out)
 
 
 @bp_contrats.delete("/<int:idcontrat>")
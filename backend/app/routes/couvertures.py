@@ -1,12 +1,18 @@
 # Flask + SQLAlchemy only (no Marshmallow)
 from __future__ import annotations
 from flask import Blueprint, request, jsonify
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from ..extensions import db
+from ..core.cache import response_cache
+from ..core.pagination import offset_args
+from ..core.streaming import stream_json_array, wants_stream
 from ..models.couverture import Couverture
 
 blp = Blueprint("couvertures", __name__, url_prefix="/api/v1/couvertures")
 
+response_cache.writes(blp, "couverture")
+
 # ---------- helpers ----------
 def _parse_idcouverture(raw: str) -> tuple[int, int]:
     """
@@ -33,9 +39,16 @@ def _not_found():
 def list_couvertures():
     """
     Retourne la liste des (idprojet, iddepartement).
+    Query : skip, limit (max 500, liste complète si absent), stream=1.
     """
-    rows = Couverture.query.order_by(Couverture.idprojet.asc(),
-                                     Couverture.iddepartement.asc()).all()
+    skip, limit = offset_args(request.args)
+    stmt = (select(Couverture)
+            .order_by(Couverture.idprojet.asc(), Couverture.iddepartement.asc())
+            .offset(skip).limit(limit))
+    if wants_stream(request.args):
+        return stream_json_array(stmt, _row_to_dict)
+
+    rows = db.session.execute(stmt).scalars().all()
     return jsonify([_row_to_dict(r) for r in rows]), 200
 
 
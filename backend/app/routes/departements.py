@@ -2,12 +2,22 @@
 from flask import Blueprint, request, jsonify
 from sqlalchemy import select
 from ..extensions import db
+from ..core.cache import response_cache
+from ..core.pagination import offset_args
+from ..core.streaming import stream_json_array, wants_stream
 from ..models.departement import Departement
 
 bp = Blueprint("departements", __name__, url_prefix="/api/v1/departements")
 
+response_cache.reads(bp, "departement")
+response_cache.writes(bp, "departement")
+
+
+def _to_dict(d: Departement) -> dict:
+    return {"iddepartement": d.iddepartement, "departement": d.departement}
+
 # -------------------------------------------------------------------
-# GET /api/v1/departements/?q=&skip=&limit=
+# GET /api/v1/departements/?q=&skip=&limit=&stream=
 # -------------------------------------------------------------------
 @bp.get("/")
 def list_departements():
@@ -26,6 +36,10 @@ def list_departements():
       - in: query
         name: limit
         schema: { type: integer, default: 100, maximum: 500 }
+      - in: query
+        name: stream
+        schema: { type: integer }
+        description: 1 = tableau JSON écrit au fil de l'eau (lecture par lots)
     responses:
       200:
         description: Successful Response
@@ -35,9 +49,7 @@ def list_departements():
               - { "iddepartement": 1, "departement": "Ouest" }
     """
     q = request.args.get("q", type=str)
-    skip = request.args.get("skip", default=0, type=int)
-    limit = request.args.get("limit", default=100, type=int)
-    limit = min(max(limit, 0), 500)
+    skip, limit = offset_args(request.args, default_limit=100)
 
     stmt = select(Departement)
     if q:
@@ -45,9 +57,11 @@ def list_departements():
         stmt = stmt.filter(Departement.departement.ilike(like))
 
     stmt = stmt.order_by(Departement.departement).offset(skip).limit(limit)
+    if wants_stream(request.args):
+        return stream_json_array(stmt, _to_dict)
+
     rows = db.session.execute(stmt).scalars().all()
-    data = [{"iddepartement": d.iddepartement, "departement": d.departement} for d in rows]
-    return jsonify(data), 200
+    return jsonify([_to_dict(d) for d in rows]), 200
 
 
 # -------------------------------------------------------------------
@@ -1,11 +1,14 @@
 from flask import Blueprint, jsonify
 from flasgger import swag_from
 from ..extensions import db
+from ..core.cache import response_cache
 from ..models.document import Document
 from ..models.archive import Archive
 
 bp_document = Blueprint("document", __name__, url_prefix="/api/v1")
 
+response_cache.reads(bp_document, "document", "archive")
+
 @bp_document.get("/evenements/<int:idevenement>/documents")
 @swag_from({
     "tags": ["Document"],
@@ -3,10 +3,9 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 from datetime import date, datetime
-from pathlib import Path
 import mimetypes
 
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, Response, jsonify, redirect, request, url_for
 from flasgger import swag_from
 from sqlalchemy import text
 from sqlalchemy.orm import Session
@@ -15,8 +14,13 @@ from sqlalchemy.orm import Session
 from ..extensions import db  # db.session -> Session
 
 # Tes helpers de stockage (déjà existants chez toi)
-from app.core.storage import fs_path, public_url
-from app.core.files_ import next_available_name
+from app.core.cache import response_cache
+from app.core.storage import public_url
+from app.core.delivery import check_access, send_stored, stored_path
+from app.core import blobs, uploads
+from app.core.pagination import keyset_sql, page_payload
+from app.core import extract, previews, search, zipstream
+from app.core import metrics
 
 # ───────────────────────────────────────── Helpers (dates ISO)
 def _to_iso_date(v) -> Optional[str]:
@@ -49,14 +53,27 @@ SELECT
   d.date_ajout,
   d.titre_document,
   d.description_document,
-  COALESCE(COUNT(a.idarchive), 0) AS nb_archives
+  d.nb_archives
 FROM document d
-LEFT JOIN archive a ON a.iddocument = d.iddocument
+"""
+
+# même projection + score de pertinence (app.core.search.match_sql)
+_SQL_SELECT_SEARCH = """
+SELECT
+  d.iddocument,
+  d.chemin,
+  d.date_ajout,
+  d.titre_document,
+  d.description_document,
+  d.nb_archives,
+  s.score
+FROM document d
+JOIN ({match}) s ON s.entity_id = d.iddocument
 """
 
 def _one(session: Session, did: int) -> Optional[Dict[str, Any]]:
     row = session.execute(
-        text(_SQL_SELECT + " WHERE d.iddocument = :id GROUP BY d.iddocument"),
+        text(_SQL_SELECT + " WHERE d.iddocument = :id"),
         {"id": did},
     ).mappings().fetchone()
     return dict(row) if row else None
@@ -66,6 +83,11 @@ bp_doc_crud = Blueprint("document_crud", __name__, url_prefix="/api/v1/Document"
 bp_doc_utils = Blueprint("document_utils", __name__, url_prefix="/api/v1/document")
 bp_doc_events = Blueprint("document_events", __name__, url_prefix="/api/v1/evenements")
 bp_storage    = Blueprint("storage", __name__, url_prefix="/api/v1/storage")
+bp_doc_projects = Blueprint("document_projects", __name__, url_prefix="/api/v1/projets")
+
+response_cache.reads(bp_doc_crud, "document", "archive")
+response_cache.writes(bp_doc_crud, "document")
+response_cache.reads(bp_doc_events, "document", "archive")
 
 # ========== 1) GET /api/v1/evenements/{id}/documents
 @bp_doc_events.get("/<int:idevenement>/documents")
@@ -97,11 +119,13 @@ def list_docs_for_event(idevenement: int):
     "tags": ["Document"],
     "summary": "List Documents",
     "parameters": [
-        {"in": "query", "name": "q", "description": "Recherche plein texte sur titre_document / chemin", "schema": {"type": "string", "nullable": True}},
+        {"in": "query", "name": "q", "description": "Recherche plein texte (titre, description, nom de fichier ; sans accents, par préfixe) ; résultats triés par pertinence (champ score)", "schema": {"type": "string", "nullable": True}},
+        {"in": "query", "name": "contenu", "description": "Avec q : chercher aussi dans le texte des fichiers (PDF, bureautique)", "schema": {"type": "boolean", "default": False}},
         {"in": "query", "name": "start_from", "description": "date_ajout >= start_from (YYYY-MM-DD)", "schema": {"type": "string", "format": "date", "nullable": True}},
         {"in": "query", "name": "end_to", "description": "date_ajout <= end_to (YYYY-MM-DD)", "schema": {"type": "string", "format": "date", "nullable": True}},
         {"in": "query", "name": "skip",  "schema": {"type": "integer", "default": 0}},
         {"in": "query", "name": "limit", "schema": {"type": "integer", "default": 100, "maximum": 500}},
+        {"in": "query", "name": "cursor", "description": "Pagination par curseur (vide pour la 1re page) ; renvoie {items, next_cursor}", "schema": {"type": "string", "nullable": True}},
     ],
     "responses": {
         200: {"description": "Successful Response", "content": {"application/json": {"schema": {"type": "array", "items": {"type": "object"}}}}},
@@ -113,10 +137,20 @@ def list_documents():
     where = ["1=1"]
     params: Dict[str, Any] = {}
 
+    select = _SQL_SELECT
+    sort_col = None
     q = args.get("q")
     if q:
-        where.append("(d.titre_document LIKE :q OR d.chemin LIKE :q)")
-        params["q"] = f"%{q}%"
+        in_content = args.get("contenu", "").lower() in ("1", "true", "yes")
+        match = search.match_sql(("document", extract.ENTITY) if in_content else "document", q)
+        if match is None:
+            where.append("1=0")
+        else:
+            # index inversé : pas de LIKE '%q%', tri par pertinence
+            match_sql, match_params = match
+            select = _SQL_SELECT_SEARCH.format(match=match_sql)
+            params.update(match_params)
+            sort_col = "s.score"
 
     start_from = args.get("start_from")
     end_to     = args.get("end_to")
@@ -127,21 +161,15 @@ def list_documents():
         where.append("d.date_ajout <= :dto")
         params["dto"] = end_to
 
-    limit = min(int(args.get("limit", 100)), 500)
-    skip  = int(args.get("skip", 0))
-
     sql = f"""
-        {_SQL_SELECT}
+        {select}
         WHERE {" AND ".join(where)}
-        GROUP BY d.iddocument
-        ORDER BY d.iddocument DESC
-        LIMIT :limit OFFSET :skip
     """
-    params.update({"limit": limit, "skip": skip})
+    sql, params, page = keyset_sql(sql, params, args, id_col="d.iddocument", sort_col=sort_col)
 
     session: Session = db.session
     rows = session.execute(text(sql), params).mappings().all()
-    return jsonify([_iso_row(dict(r), ["date_ajout"]) for r in rows])
+    return jsonify(page_payload([_iso_row(dict(r), ["date_ajout"]) for r in rows], page))
 
 # ========== 3) POST /api/v1/Document  (body JSON)
 @bp_doc_crud.post("/")
@@ -177,7 +205,7 @@ def create_document():
             return jsonify({"detail": f"{key} est obligatoire."}), 400
 
     session: Session = db.session
-    session.execute(text("""
+    res = session.execute(text("""
         INSERT INTO document (chemin, date_ajout, titre_document, description_document)
         VALUES (:chemin, :date_ajout, :titre_document, :description_document)
     """), {
@@ -186,10 +214,13 @@ def create_document():
         "titre_document": payload.get("titre_document"),
         "description_document": payload.get("description_document"),
     })
-    session.commit()
-    new_id = session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
+    new_id = res.lastrowid
+    search.reindex(session, "document", [int(new_id)])
     row = _one(session, int(new_id))
-    return jsonify(_iso_row(row, ["date_ajout"])), 201
+    out = _iso_row(row, ["date_ajout"])
+    session.commit()
+    extract.schedule([int(new_id)])
+    return jsonify(out), 201
 
 # ========== 4) GET /api/v1/Document/{id}
 @bp_doc_crud.get("/<int:iddocument>")
@@ -240,15 +271,12 @@ def get_document(iddocument: int):
 })
 def update_document(iddocument: int):
     session: Session = db.session
-    if not _one(session, iddocument):
-        return jsonify({"detail": "Document introuvable."}), 404
-
     payload: Dict[str, Any] = request.get_json(silent=True) or {}
     for key in ("chemin", "date_ajout", "titre_document"):
         if not payload.get(key):
             return jsonify({"detail": f"{key} est obligatoire."}), 400
 
-    session.execute(text("""
+    res = session.execute(text("""
         UPDATE document
            SET chemin = :chemin,
                date_ajout = :date_ajout,
@@ -262,8 +290,13 @@ def update_document(iddocument: int):
         "description_document": payload.get("description_document"),
         "id": iddocument,
     })
-    session.commit()
+    if res.rowcount == 0:
+        session.rollback()
+        return jsonify({"detail": "Document introuvable."}), 404
+    search.reindex(session, "document", [iddocument])
     row = _one(session, iddocument)
+    session.commit()
+    extract.schedule([iddocument])
     return jsonify(_iso_row(row, ["date_ajout"]))
 
 # ========== 6) DELETE /api/v1/Document/{id}
@@ -297,6 +330,8 @@ def delete_document(iddocument: int):
         })
 
     res = session.execute(text("DELETE FROM document WHERE iddocument = :id"), {"id": iddocument})
+    search.unindex(session, "document", [iddocument])
+    extract.forget(session, iddocument)
     session.commit()
     return jsonify({
         "deleted": res.rowcount > 0,
@@ -310,18 +345,18 @@ def delete_document(iddocument: int):
     "tags": ["Document"],
     "summary": "Open Document",
     "parameters": [{"in": "path", "name": "iddocument", "required": True, "schema": {"type": "integer"}}],
-    "responses": {200: {"description": "File stream"}, 404: {"description": "Not found"}}
+    "responses": {200: {"description": "File stream (Range/206 ; ou X-Accel-Redirect selon FILE_DELIVERY)"}, 404: {"description": "Not found"}}
 })
 def open_document(iddocument: int):
+    check_access()      # avant toute recherche : pas d'indice sur l'existence
     session: Session = db.session
     obj = _one(session, iddocument)
     if not obj:
         return jsonify({"detail": "Document introuvable."}), 404
-    p = fs_path(obj["chemin"])
-    if not p.exists():
+    p = stored_path(obj["chemin"])
+    if p is None:
         return jsonify({"detail": "Fichier non trouvé sur le disque."}), 404
-    media = mimetypes.guess_type(p.name)[0] or "application/octet-stream"
-    return send_file(p, mimetype=media, as_attachment=False)
+    return send_stored(p)
 
 # ========== 8) GET /api/v1/document/{id}/download
 @bp_doc_utils.get("/<int:iddocument>/download")
@@ -332,18 +367,77 @@ def open_document(iddocument: int):
     "responses": {200: {"description": "File download"}, 404: {"description": "Not found"}}
 })
 def download_document(iddocument: int):
+    check_access()      # avant toute recherche : pas d'indice sur l'existence
     session: Session = db.session
     obj = _one(session, iddocument)
     if not obj:
         return jsonify({"detail": "Document introuvable."}), 404
-    p: Path = fs_path(obj["chemin"])
-    if not p.exists():
+    p = stored_path(obj["chemin"])
+    if p is None:
         return jsonify({"detail": "Fichier non trouvé sur le disque."}), 404
 
+    filename = _download_name(obj.get("titre_document"), p)
+    return send_stored(p, mimetype="application/octet-stream", as_attachment=True, download_name=filename)
+
+# ========== 8b) GET /api/v1/document/{id}/preview  (aperçu / vignette, voir app/core/previews.py)
+@bp_doc_utils.get("/<int:iddocument>/preview")
+@swag_from({
+    "tags": ["Document"],
+    "summary": "Document Preview (première page)",
+    "parameters": [
+        {"in": "path", "name": "iddocument", "required": True, "schema": {"type": "integer"}},
+        {"in": "query", "name": "size", "schema": {"type": "string", "enum": ["thumb", "page"], "default": "thumb"},
+         "description": "thumb = 256 px, page = 1024 px (plus grand côté)"},
+    ],
+    "responses": {
+        302: {"description": "Redirection vers l'image en cache (URL par contenu, immuable)"},
+        404: {"description": "Document / fichier introuvable, ou aperçu indisponible pour ce type"},
+        503: {"description": "Rendu en cours ou file pleine : réessayer (Retry-After)"},
+    }
+})
+def preview_document(iddocument: int):
+    check_access()      # avant rendu : l'URL de redirection contient le SHA-256 du fichier
+    session: Session = db.session
+    obj = _one(session, iddocument)
+    if not obj:
+        return jsonify({"detail": "Document introuvable."}), 404
+    p = stored_path(obj["chemin"])
+    if p is None:
+        return jsonify({"detail": "Fichier non trouvé sur le disque."}), 404
+    try:
+        name = previews.get(session, iddocument, p, request.args.get("size", "thumb"))
+    except previews.PreviewError as e:
+        resp = jsonify({"detail": e.detail})
+        if e.status == 503:
+            resp.headers["Retry-After"] = "2"
+        return resp, e.status
+    # une balise <img> ne pose pas d'en-tête : le jeton passé en ?token= suit la redirection
+    token = request.args.get("token")
+    url = url_for("document_utils.serve_preview", name=name, **({"token": token} if token else {}))
+    resp = redirect(url, code=302)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+@bp_doc_utils.get("/previews/<name>")
+@swag_from({
+    "tags": ["Document"],
+    "summary": "Preview Image (cache par contenu)",
+    "parameters": [{"in": "path", "name": "name", "required": True, "schema": {"type": "string"}}],
+    "responses": {200: {"description": "Image (Cache-Control: immutable)"}, 404: {"description": "Absent du cache"}}
+})
+def serve_preview(name: str):
+    p = previews.cached_path(name)
+    if p is None:
+        return jsonify({"detail": "Aperçu absent du cache."}), 404
+    resp = send_stored(p, max_age=365 * 24 * 3600)
+    resp.cache_control.immutable = True
+    return resp
+
+def _download_name(titre: Optional[str], p) -> str:
+    """titre_document + extension du fichier réel (si le titre ne l'a pas déjà)."""
     ext = p.suffix
-    base = (obj.get("titre_document") or "document").strip() or "document"
-    filename = f"{base}{ext}" if ext and not base.lower().endswith(ext.lower()) else base
-    return send_file(p, mimetype="application/octet-stream", as_attachment=True, download_name=filename)
+    base = (titre or "document").strip() or "document"
+    return f"{base}{ext}" if ext and not base.lower().endswith(ext.lower()) else base
 
 # ========== 9) POST /api/v1/storage/upload (multipart)
 @bp_storage.post("/upload")
@@ -361,7 +455,8 @@ def download_document(iddocument: int):
         }
     },
     "responses": {
-        200: {"description": "Successful Response", "content": {"application/json": {"schema": {"type": "object"}}}},
+        200: {"description": "Successful Response (rel à copier dans document.chemin ; deduplicated = contenu déjà stocké)",
+              "content": {"application/json": {"schema": {"type": "object"}}}},
         422: {"description": "Validation Error"}
     }
 })
@@ -370,18 +465,134 @@ def upload_file():
     if not f or not f.filename:
         return jsonify({"detail": "Fichier manquant"}), 422
 
-    rel1, abs_path = next_available_name(f.filename)
-    rel = "/storage/" + rel1
-    abs_path.parent.mkdir(parents=True, exist_ok=True)
-    f.save(abs_path)
+    # stockage adressé par contenu : un fichier identique n'est écrit qu'une fois
+    blob = blobs.store_stream(f.stream, f.filename)
+    return jsonify(_stored(blob, f.filename))
 
-    return jsonify({
-        "rel": rel,                          # ex: "/storage/rapport-final.pdf"
-        "url": public_url(rel1),             # ex: "/media/storage/rapport-final.pdf"
-        "filename": f.filename,
-        "size": abs_path.stat().st_size,
-        "mime_type": mimetypes.guess_type(abs_path.name)[0] or "application/octet-stream",
-    })
+def _stored(blob: blobs.Blob, filename: str) -> Dict[str, Any]:
+    """Enregistre la référence du blob et construit la réponse d'un téléversement."""
+    mime_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    session: Session = db.session
+    rel = blobs.add_reference(session, blob, filename, mime_type)
+    session.commit()
+    return {
+        "rel": rel,                          # ex: "/storage/blobs/ab/cd/abcd…ef.pdf"
+        "url": public_url(blob.rel),         # ex: "/media/blobs/ab/cd/abcd…ef.pdf"
+        "filename": filename,
+        "size": blob.size,
+        "mime_type": mime_type,
+        "sha256": blob.sha256,
+        "deduplicated": not blob.created,
+    }
+
+def _upload_error(e: uploads.UploadError):
+    return jsonify({"detail": e.detail}), e.status
+
+# ========== 10) Téléversement reprenable par morceaux (voir app/core/uploads.py)
+@bp_storage.post("/uploads")
+@swag_from({
+    "tags": ["Document"],
+    "summary": "Create Upload Session (téléversement reprenable)",
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {
+            "type": "object",
+            "properties": {
+                "filename": {"type": "string"},
+                "size": {"type": "integer", "description": "Taille totale en octets"},
+                "sha256": {"type": "string", "nullable": True, "description": "Vérifié à la fin si fourni"},
+                "chunk_size": {"type": "integer", "nullable": True, "description": "Défaut : UPLOAD_CHUNK_SIZE"},
+            },
+            "required": ["filename", "size"],
+        }}},
+    },
+    "responses": {
+        201: {"description": "Session : {id, chunk_size, nb_chunks, received, missing, expires_at}"},
+        400: {"description": "Validation error"},
+        413: {"description": "Fichier trop volumineux"},
+    }
+})
+def create_upload():
+    payload: Dict[str, Any] = request.get_json(silent=True) or {}
+    try:
+        out = uploads.create(payload.get("filename"), payload.get("size"),
+                             payload.get("sha256"), payload.get("chunk_size"))
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    return jsonify(out), 201
+
+@bp_storage.get("/uploads/<upload_id>")
+@swag_from({
+    "tags": ["Document"],
+    "summary": "Get Upload Session (morceaux reçus / manquants)",
+    "parameters": [{"in": "path", "name": "upload_id", "required": True, "schema": {"type": "string"}}],
+    "responses": {200: {"description": "Successful Response"}, 404: {"description": "Session introuvable ou expirée"}}
+})
+def get_upload(upload_id: str):
+    try:
+        return jsonify(uploads.status(upload_id))
+    except uploads.UploadError as e:
+        return _upload_error(e)
+
+@bp_storage.put("/uploads/<upload_id>")
+@swag_from({
+    "tags": ["Document"],
+    "summary": "Put Upload Chunk",
+    "parameters": [
+        {"in": "path", "name": "upload_id", "required": True, "schema": {"type": "string"}},
+        {"in": "query", "name": "offset", "required": True, "schema": {"type": "integer"},
+         "description": "Multiple de chunk_size"},
+        {"in": "header", "name": "X-Chunk-Sha256", "required": False, "schema": {"type": "string"}},
+    ],
+    "requestBody": {"required": True, "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}}},
+    "responses": {
+        200: {"description": "Morceau enregistré : {index, offset, size, sha256}"},
+        400: {"description": "offset / taille invalides"},
+        404: {"description": "Session introuvable ou expirée"},
+        422: {"description": "Somme de contrôle incorrecte"},
+    }
+})
+def put_upload_chunk(upload_id: str):
+    try:
+        out = uploads.put_chunk(upload_id, request.args.get("offset", type=int), request.stream,
+                                request.headers.get("X-Chunk-Sha256"))
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    return jsonify(out)
+
+@bp_storage.post("/uploads/<upload_id>/complete")
+@swag_from({
+    "tags": ["Document"],
+    "summary": "Complete Upload (assemblage -> stockage)",
+    "parameters": [{"in": "path", "name": "upload_id", "required": True, "schema": {"type": "string"}}],
+    "responses": {
+        200: {"description": "Même réponse que /storage/upload (rel à copier dans document.chemin)"},
+        404: {"description": "Session introuvable ou expirée"},
+        409: {"description": "Morceaux manquants ou altérés"},
+        422: {"description": "sha256 différent de celui annoncé"},
+    }
+})
+def complete_upload(upload_id: str):
+    try:
+        filename = uploads.filename_of(upload_id)
+        blob = uploads.complete(upload_id)
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    return jsonify(_stored(blob, filename))
+
+@bp_storage.delete("/uploads/<upload_id>")
+@swag_from({
+    "tags": ["Document"],
+    "summary": "Abort Upload",
+    "parameters": [{"in": "path", "name": "upload_id", "required": True, "schema": {"type": "string"}}],
+    "responses": {200: {"description": "Session supprimée"}, 404: {"description": "Session introuvable"}}
+})
+def abort_upload(upload_id: str):
+    try:
+        uploads.abort(upload_id)
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    return jsonify({"deleted": True, "id": upload_id})
 
 # ───────────────────────────────────────── Register helper (si tu utilises app factory)
 # Dans ton create_app():
@@ -389,3 +600,95 @@ def upload_file():
 #   app.register_blueprint(bp_doc_crud)
 #   app.register_blueprint(bp_doc_utils)
 #   app.register_blueprint(bp_storage)
+
+# ========== 11) Archives ZIP des documents (voir app/core/zipstream.py)
+_ZIP_SPEC_RESPONSES = {
+    200: {"description": "Archive ZIP (entrées non compressées, Content-Length exact ; HEAD pour la taille seule). "
+                         "X-Missing-Files = documents absents du disque, ignorés.",
+          "content": {"application/zip": {"schema": {"type": "string", "format": "binary"}}}},
+    401: {"description": "PROTECT_MEDIA actif et jeton absent"},
+    404: {"description": "Not found"},
+}
+
+def _zip_response(rows, folder_of, download_name: str):
+    """
+    Réponse ZIP streamée pour des lignes (iddocument, chemin, titre_document, …) ;
+    `folder_of(row)` donne le dossier de l'entrée dans l'archive ("" = racine).
+    Un même document n'est ajouté qu'une fois par dossier. L'appelant fait
+    check_access() avant toute requête (pas d'indice sur l'existence).
+    """
+    entries: List[zipstream.Entry] = []
+    taken: Dict[str, set] = {}
+    seen = set()
+    missing = 0
+    for r in rows:
+        folder = folder_of(r)
+        if (folder, r["iddocument"]) in seen:
+            continue
+        seen.add((folder, r["iddocument"]))
+        p = stored_path(r["chemin"] or "")
+        if p is None:
+            missing += 1
+            continue
+        name = zipstream.unique_name(zipstream.safe_part(_download_name(r["titre_document"], p)),
+                                     taken.setdefault(folder, set()))
+        st = p.stat()
+        entries.append(zipstream.Entry(f"{folder}/{name}" if folder else name, p, st.st_size, st.st_mtime))
+
+    size = zipstream.archive_size(entries)
+    resp = Response(zipstream.stream(entries), mimetype="application/zip", direct_passthrough=True)
+    resp.headers["Content-Length"] = str(size)
+    if request.method != "HEAD":
+        metrics.storage_sent(size, "zip")
+    resp.headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+    resp.headers["X-Missing-Files"] = str(missing)
+    return resp
+
+@bp_doc_events.get("/<int:idevenement>/documents.zip")
+@swag_from({
+    "tags": ["Document"],
+    "summary": "Download Event Documents (ZIP)",
+    "parameters": [{"in": "path", "name": "idevenement", "required": True, "schema": {"type": "integer"}}],
+    "responses": _ZIP_SPEC_RESPONSES,
+})
+def zip_docs_for_event(idevenement: int):
+    check_access()
+    session: Session = db.session
+    if session.execute(text("SELECT 1 FROM evenement WHERE idevenement = :id"), {"id": idevenement}).first() is None:
+        return jsonify({"detail": "Évènement introuvable."}), 404
+    rows = session.execute(text("""
+        SELECT d.iddocument, d.chemin, d.titre_document
+          FROM archive a
+          JOIN document d ON d.iddocument = a.iddocument
+         WHERE a.idevenement = :id
+         ORDER BY d.date_ajout DESC, d.iddocument DESC
+    """), {"id": idevenement}).mappings().all()
+    return _zip_response(rows, lambda r: "", f"evenement-{idevenement}-documents.zip")
+
+@bp_doc_projects.get("/<int:idprojet>/documents.zip")
+@swag_from({
+    "tags": ["Document"],
+    "summary": "Download Project Documents (ZIP, un dossier par évènement)",
+    "parameters": [{"in": "path", "name": "idprojet", "required": True, "schema": {"type": "integer"}}],
+    "responses": _ZIP_SPEC_RESPONSES,
+})
+def zip_docs_for_project(idprojet: int):
+    check_access()
+    session: Session = db.session
+    if session.execute(text("SELECT 1 FROM projet WHERE idprojet = :id"), {"id": idprojet}).first() is None:
+        return jsonify({"detail": "Projet introuvable."}), 404
+    # évènements du projet, directement ou via ses activités
+    rows = session.execute(text("""
+        SELECT e.idevenement, e.type_evenement, d.iddocument, d.chemin, d.titre_document
+          FROM evenement e
+          JOIN archive a ON a.idevenement = e.idevenement
+          JOIN document d ON d.iddocument = a.iddocument
+         WHERE e.idprojet = :id
+            OR e.idactivite IN (SELECT idactivite FROM activite WHERE idprojet = :id)
+         ORDER BY e.idevenement, d.date_ajout DESC, d.iddocument DESC
+    """), {"id": idprojet}).mappings().all()
+    return _zip_response(
+        rows,
+        lambda r: zipstream.safe_part(f"{r['idevenement']} - {r['type_evenement']}"),
+        f"projet-{idprojet}-documents.zip",
+    )
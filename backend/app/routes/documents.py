@@ -1,12 +1,12 @@
 # app/routes/documents.py
 from __future__ import annotations
-from pathlib import Path
 
-from flask import Blueprint, abort, jsonify, redirect, send_file
+from flask import Blueprint, abort, jsonify, redirect
 from sqlalchemy import text
 
 from app.extensions import db
-from app.core.storage import fs_path, public_url  # <- déjà présents dans ton projet
+from app.core.storage import public_url  # <- déjà présents dans ton projet
+from app.core.delivery import check_access, send_stored, stored_path
 
 bp_documents = Blueprint("documents", __name__, url_prefix="/api/v1")
 
@@ -90,26 +90,24 @@ def download_document(iddocument: int):
       404:
         description: Document introuvable ou fichier manquant
     """
+    check_access()      # avant toute recherche : pas d'indice sur l'existence
     doc = _get_doc(iddocument)
 
     # Résout le chemin disque depuis le champ `chemin`
-    file_path: Path = fs_path(doc["chemin"])
-    if not file_path.exists():
+    file_path = stored_path(doc["chemin"])
+    if file_path is None:
         abort(404, description="Fichier manquant")
 
     # Nom de téléchargement : titre_document (si présent) sinon nom réel
     dl_name = (doc.get("titre_document") or file_path.name).strip() or file_path.name
 
-    # Envoi en tant que pièce jointe
-    return send_file(
+    # Envoi en tant que pièce jointe (direct avec Range/206, ou délégué au proxy)
+    return send_stored(
         file_path,
         as_attachment=True,
         download_name=dl_name,
         mimetype="application/octet-stream",
         max_age=0,
-        etag=True,
-        conditional=True,
-        last_modified=file_path.stat().st_mtime,
     )
 
 # (Optionnel) petit endpoint JSON si tu veux tester rapidement que le BP est chargé
@@ -10,9 +10,16 @@ from sqlalchemy.orm import Session
 
 # adapte si ton chemin diffère
 from ..extensions import db  # db.session : Session
+from ..core.cache import response_cache
+from app.core.pagination import keyset_sql, page_payload
+from app.core import bulk, search
+from app.core.fk import FkRef, fk_detail, missing_fks
 
 bp_evenement = Blueprint("evenement", __name__, url_prefix="/api/v1/evenement")
 
+response_cache.reads(bp_evenement, "evenement", "archive")
+response_cache.writes(bp_evenement, "evenement")
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers (dates → YYYY-MM-DD)
 # ──────────────────────────────────────────────────────────────────────────────
@@ -60,16 +67,15 @@ SELECT
   e.description_evenement,
   e.statut_evenement,
   e.date_realisee,
-  COALESCE(COUNT(a.idarchive), 0) AS nb_documents
+  e.nb_documents
 FROM evenement e
-LEFT JOIN archive a ON a.idevenement = e.idevenement
 """
 
 _DATE_FIELDS = ["date_evenement", "date_prevue", "date_realisee"]
 
 def _one(session: Session, eid: int) -> Optional[Dict[str, Any]]:
     row = session.execute(
-        text(_SQL_SELECT + " WHERE e.idevenement = :id GROUP BY e.idevenement"),
+        text(_SQL_SELECT + " WHERE e.idevenement = :id"),
         {"id": eid},
     ).mappings().fetchone()
     return _iso_row(dict(row), _DATE_FIELDS) if row else None
@@ -83,27 +89,62 @@ def _normalize_fk(v: Optional[int]) -> Optional[int]:
     except Exception:
         return None
 
-def _fk_exists(session: Session, table: str, idcol: str, v: Optional[int]) -> bool:
-    """Teste l'existence d'une valeur de FK si non NULL."""
-    if v is None:
-        return True
-    sql = f"SELECT 1 FROM {table} WHERE {idcol} = :v LIMIT 1"
-    return session.execute(text(sql), {"v": v}).first() is not None
+def _fk_refs(p: Dict[str, Any]) -> List[FkRef]:
+    return [
+        FkRef("activite", "idactivite", p.get("idactivite")),
+        FkRef("commande", "idcommande", p.get("idcommande")),
+        FkRef("soumissionnaire", "idsoumissionnaire", p.get("idsoumissionnaire")),
+        FkRef("personnel", "idpersonnel", p.get("idpersonnel")),
+        FkRef("transaction", "idtransaction", p.get("idtransaction")),
+        FkRef("projet", "idprojet", p.get("idprojet")),
+    ]
 
 def _validate_foreign_keys_or_400(session: Session, p: Dict[str, Any]):
     """Lève 400 si une FK renseignée n’existe pas (évite un 500 MySQL 1452)."""
     from werkzeug.exceptions import BadRequest
-    checks = [
-        ("activite", "idactivite", p.get("idactivite")),
-        ("commande", "idcommande", p.get("idcommande")),
-        ("soumissionnaire", "idsoumissionnaire", p.get("idsoumissionnaire")),
-        ("personnel", "idpersonnel", p.get("idpersonnel")),
-        ("transaction", "idtransaction", p.get("idtransaction")),
-        ("projet", "idprojet", p.get("idprojet")),
-    ]
-    for table, col, val in checks:
-        if val is not None and not _fk_exists(session, table, col, val):
-            raise BadRequest(f"{col}={val} inexistant dans {table}.")
+    missing = missing_fks(session, _fk_refs(p))
+    if missing:
+        raise BadRequest(fk_detail(missing))
+
+_FK_FIELDS = ("idactivite", "idcommande", "idsoumissionnaire",
+              "idpersonnel", "idtransaction", "idprojet")
+
+_COLUMNS = _FK_FIELDS + ("type_evenement", "date_evenement", "date_prevue",
+                         "description_evenement", "statut_evenement", "date_realisee")
+
+_INSERT = text("""
+    INSERT INTO evenement (
+      idactivite, idcommande, idsoumissionnaire, idpersonnel, idtransaction, idprojet,
+      type_evenement, date_evenement, date_prevue, description_evenement,
+      statut_evenement, date_realisee
+    ) VALUES (
+      :idactivite, :idcommande, :idsoumissionnaire, :idpersonnel, :idtransaction, :idprojet,
+      :type_evenement, :date_evenement, :date_prevue, :description_evenement,
+      :statut_evenement, :date_realisee
+    )
+""")
+
+def _prepare_evenement(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Valide et normalise un événement à créer (BadRequest si invalide)."""
+    from werkzeug.exceptions import BadRequest
+    if not payload.get("type_evenement"):
+        raise BadRequest("type_evenement est obligatoire.")
+
+    row = {k: payload.get(k) for k in _COLUMNS}
+    # Normaliser FKs facultatives
+    for k in _FK_FIELDS:
+        row[k] = _normalize_fk(row[k])
+    # Dates facultatives : '' -> NULL ; une date invalide ferait échouer tout un paquet d'INSERT (bulk)
+    for k in _DATE_FIELDS:
+        if row[k] is None or str(row[k]).strip() == "":
+            row[k] = None
+            continue
+        row[k] = _to_iso_date(row[k])
+        try:
+            date.fromisoformat(row[k])
+        except ValueError:
+            raise BadRequest(f"{k} doit être au format YYYY-MM-DD.")
+    return row
 
 # ──────────────────────────────────────────────────────────────────────────────
 # GET /  — liste avec filtres
@@ -143,6 +184,11 @@ def list_evenements():
         type: integer
         default: 100
         maximum: 500
+      - in: query
+        name: cursor
+        type: string
+        required: false
+        description: Pagination par curseur (vide pour la 1re page) ; renvoie {items, next_cursor}
     responses:
       200:
         description: Successful Response
@@ -169,22 +215,16 @@ def list_evenements():
         where.append("e.date_evenement <= :dto")
         params["dto"] = end_to
 
-    limit = min(int(args.get("limit", 100)), 500)
-    skip = int(args.get("skip", 0))
-
     sql = f"""
         {_SQL_SELECT}
         WHERE {" AND ".join(where)}
-        GROUP BY e.idevenement
-        ORDER BY e.idevenement DESC
-        LIMIT :limit OFFSET :skip
     """
-    params.update({"limit": limit, "skip": skip})
+    sql, params, page = keyset_sql(sql, params, args, id_col="e.idevenement")
 
     session: Session = db.session
     rows = session.execute(text(sql), params).mappings().all()
     out = [_iso_row(dict(r), _DATE_FIELDS) for r in rows]
-    return jsonify(out)
+    return jsonify(page_payload(out, page))
 
 # ──────────────────────────────────────────────────────────────────────────────
 # GET /{idevenement}
@@ -256,41 +296,72 @@ def create_evenement():
       400:
         description: Validation error
     """
-    from werkzeug.exceptions import BadRequest
-
-    payload: Dict[str, Any] = request.get_json(silent=True) or {}
-    if not payload.get("type_evenement"):
-        raise BadRequest("type_evenement est obligatoire.")
-
-    # Normaliser FKs facultatives
-    for k in ("idactivite", "idcommande", "idsoumissionnaire",
-              "idpersonnel", "idtransaction", "idprojet"):
-        payload[k] = _normalize_fk(payload.get(k))
+    payload = _prepare_evenement(request.get_json(silent=True) or {})
 
     session: Session = db.session
     _validate_foreign_keys_or_400(session, payload)
 
-    ins = text("""
-        INSERT INTO evenement (
-          idactivite, idcommande, idsoumissionnaire, idpersonnel, idtransaction, idprojet,
-          type_evenement, date_evenement, date_prevue, description_evenement,
-          statut_evenement, date_realisee
-        ) VALUES (
-          :idactivite, :idcommande, :idsoumissionnaire, :idpersonnel, :idtransaction, :idprojet,
-          :type_evenement, :date_evenement, :date_prevue, :description_evenement,
-          :statut_evenement, :date_realisee
-        )
-    """)
-
-    result = session.execute(ins, payload)
+    result = session.execute(_INSERT, payload)
     new_id = getattr(result, "lastrowid", None)
     if not new_id:
         new_id = session.execute(text("SELECT LAST_INSERT_ID()")).scalar()
-    session.commit()
 
+    search.reindex(session, "evenement", [int(new_id)])
     row = _one(session, int(new_id))
+    session.commit()
     return jsonify(row), 201
 
+# ──────────────────────────────────────────────────────────────────────────────
+# POST /bulk  — création en lot
+# ──────────────────────────────────────────────────────────────────────────────
+@bp_evenement.post("/bulk")
+def create_evenements_bulk():
+    """
+    Create Evenements (bulk)
+    ---
+    tags:
+      - evenement
+    consumes:
+      - application/json
+    parameters:
+      - in: query
+        name: mode
+        type: string
+        enum: [atomic, partial]
+        default: atomic
+        description: "atomic : tout ou rien ; partial : insère les lignes valides"
+      - in: body
+        name: payload
+        required: true
+        schema:
+          type: array
+          maxItems: 1000
+          items:
+            type: object
+            properties:
+              idactivite:         {type: integer}
+              idcommande:         {type: integer}
+              idsoumissionnaire:  {type: integer}
+              idpersonnel:        {type: integer}
+              idtransaction:      {type: integer}
+              idprojet:           {type: integer}
+              type_evenement:     {type: string}
+              date_evenement:     {type: string, format: date}
+              date_prevue:        {type: string, format: date}
+              description_evenement: {type: string}
+              statut_evenement:   {type: string}
+              date_realisee:      {type: string, format: date}
+    responses:
+      201:
+        description: "Résultat par ligne : {mode, created, failed, results: [{index, id, error}]}"
+      400:
+        description: "Lot invalide (mode atomic : rien n'est inséré)"
+    """
+    return bulk.run_bulk(
+        db.session, _INSERT, _prepare_evenement, _fk_refs,
+        after_insert=lambda rows, ids: search.reindex(db.session, "evenement", [i for i in ids if i is not None]),
+    )
+
 # ──────────────────────────────────────────────────────────────────────────────
 # PUT /{idevenement} — body JSON (Swagger 2.0: parameter in: body)
 # ──────────────────────────────────────────────────────────────────────────────
@@ -338,9 +409,6 @@ def update_evenement(idevenement: int):
         description: Validation error
     """
     session: Session = db.session
-    if not _one(session, idevenement):
-        return jsonify({"detail": "Événement introuvable."}), 404
-
     payload: Dict[str, Any] = request.get_json(silent=True) or {}
 
     for k in ("idactivite", "idcommande", "idsoumissionnaire",
@@ -366,10 +434,14 @@ def update_evenement(idevenement: int):
          WHERE idevenement = :id
     """)
     payload["id"] = idevenement
-    session.execute(upd, payload)
-    session.commit()
+    res = session.execute(upd, payload)
+    if res.rowcount == 0:
+        session.rollback()
+        return jsonify({"detail": "Événement introuvable."}), 404
 
+    search.reindex(session, "evenement", [idevenement])
     row = _one(session, idevenement)
+    session.commit()
     return jsonify(row)
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -420,6 +492,7 @@ def delete_evenement(idevenement: int):
         text("DELETE FROM evenement WHERE idevenement = :id"),
         {"id": idevenement},
     )
+    search.unindex(session, "evenement", [idevenement])
     session.commit()
     return jsonify({
         "deleted": res.rowcount > 0,
@@ -2,6 +2,7 @@
 from flask import Blueprint, jsonify, current_app
 from flasgger import swag_from
 from ..extensions import db
+from ..core.cache import response_cache
 from sqlalchemy import func, asc, text
 from ..models.personnel import Personnel
 from app.models.evenement import Evenement
@@ -9,6 +10,8 @@ from ..models.commande import Commande
 
 evenements = Blueprint("evenements", __name__, url_prefix="/api/v1")
 
+response_cache.reads(evenements, "evenement", "personnel", "soumissionnaire", "commande", "activite", "projet", "transaction")
+
 @evenements.get("/projets/<int:idprojet>/evenements")
 def list_evenements_by_project(idprojet: int):
     """
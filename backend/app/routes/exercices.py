@@ -5,10 +5,13 @@ from flasgger import swag_from
 from sqlalchemy import and_
 import re
 from ..extensions import db
+from ..core.cache import response_cache
 from ..models.exercice_budgetaire import ExerciceBudgetaire
 
 exercices_bp = Blueprint("exercices_v1", __name__, url_prefix="/api/v1/exercices")
 
+response_cache.writes(exercices_bp, "exercice_budgetaire")
+
 def _iso(d):
     return d.isoformat() if d else None
 
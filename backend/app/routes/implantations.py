@@ -1,13 +1,20 @@
 # app/routes/implantations.py
 from flask import Blueprint, request, jsonify
 from flasgger import swag_from
+from sqlalchemy import select
+from sqlalchemy.orm import lazyload
 from ..extensions import db
+from ..core.cache import response_cache
+from ..core.pagination import offset_args
+from ..core.streaming import stream_json_array, wants_stream
 from ..models.implantation import Implantation
 
 implantations_bp = Blueprint(
     "implantations", __name__, url_prefix="/api/v1/implantations"
 )
 
+response_cache.writes(implantations_bp, "implantation")
+
 def _to_dict(row: Implantation) -> dict:
     return {
         "idimplementation": row.idimplementation,
@@ -19,6 +26,11 @@ def _to_dict(row: Implantation) -> dict:
 @swag_from({
     "tags": ["implantations"],
     "summary": "List Implantations",
+    "parameters": [
+        {"in": "query", "name": "skip", "schema": {"type": "integer"}, "default": 0},
+        {"in": "query", "name": "limit", "schema": {"type": "integer", "maximum": 500}, "description": "Sans limit, la liste complète est renvoyée"},
+        {"in": "query", "name": "stream", "schema": {"type": "integer"}, "description": "1 = tableau JSON écrit au fil de l'eau (lecture par lots)"},
+    ],
     "responses": {
         200: {
             "description": "Successful Response",
@@ -38,7 +50,16 @@ def _to_dict(row: Implantation) -> dict:
     },
 })
 def list_implantations():
-    rows = Implantation.query.order_by(Implantation.idimplementation.asc()).all()
+    skip, limit = offset_args(request.args)
+    # site/activite sont en lazy="joined" : inutile de les charger pour 3 ids
+    stmt = (select(Implantation)
+            .options(lazyload("*"))
+            .order_by(Implantation.idimplementation.asc())
+            .offset(skip).limit(limit))
+    if wants_stream(request.args):
+        return stream_json_array(stmt, _to_dict)
+
+    rows = db.session.execute(stmt).scalars().all()
     return jsonify([_to_dict(r) for r in rows]), 200
 
 
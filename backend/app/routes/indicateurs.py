@@ -1,10 +1,13 @@
 # app/routes/indicateurs.py
 from flask import Blueprint, request, jsonify, abort
 from ..extensions import db
+from ..core.cache import response_cache
 from ..models.indicateur import Indicateur
 
 indicateurs_bp = Blueprint("indicateurs", __name__, url_prefix="/api/v1/indicateurs")
 
+response_cache.writes(indicateurs_bp, "indicateur")
+
 
 # --- utils
 def _ind_to_dict(obj: Indicateur) -> dict:
@@ -1,7 +1,7 @@
 # app/routes/media.py
-from pathlib import Path
-from flask import Blueprint, current_app, abort, send_from_directory
-from werkzeug.utils import safe_join
+from flask import Blueprint, abort
+
+from app.core.delivery import send_stored, stored_path
 
 media_bp = Blueprint("media", __name__)
 
@@ -10,17 +10,10 @@ def serve_media(relpath: str):
     """
     Sert un fichier situé sous STORAGE_ROOT. Protection path traversal.
     On attend relpath SANS 'storage/' (ex: 'fichier1.pdf' ou 'sous/rep/doc.pdf').
+    Envoi direct (Range/206) ou délégué au proxy selon FILE_DELIVERY.
     """
-    storage_root: Path = Path(current_app.config["STORAGE_ROOT"]).resolve()
-    # Nettoyage type FastAPI : on tolère que le client mette 'storage/...'
-    clean = relpath
-    if clean.startswith("storage/"):
-        clean = clean[len("storage/"):]
-
-    # Empêche toute évasion du répertoire
-    abs_path = (storage_root / clean).resolve()
-    if not abs_path.is_file() or storage_root not in abs_path.parents:
+    # Empêche toute évasion du répertoire ('storage/...' toléré comme côté FastAPI)
+    abs_path = stored_path(relpath)
+    if abs_path is None:
         abort(404)
-
-    # send_from_directory nécessite (directory, filename)
-    return send_from_directory(storage_root, clean, as_attachment=False)
+    return send_stored(abs_path)
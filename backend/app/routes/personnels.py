@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from sqlalchemy import text
 from app.extensions import db
+from app.core.cache import response_cache
+from app.core import search
+from app.core.suggest import PrefixIndex, suggest_response, suggest_spec
 import re
 from flasgger import swag_from
 
@@ -10,6 +13,8 @@ bp_personnels = Blueprint(
     url_prefix="/api/v1/personnels",
 )
 
+response_cache.writes(bp_personnels, "personnel")
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Swagger local à ce fichier
 # ──────────────────────────────────────────────────────────────────────────────
@@ -185,6 +190,15 @@ def list_personnels():
     return jsonify([dict(r) for r in rows])
 
 
+_suggest = PrefixIndex("personnel", "idpersonnel", "nom_personnel", extra=["fonction_personnel"])
+
+
+@bp_personnels.get("/suggest")
+@swag_from(suggest_spec("personnels", {"idpersonnel": 19, "nom_personnel": "Jean Forestier", "fonction_personnel": "Ingénieur"}))
+def suggest_personnels():
+    return suggest_response(_suggest)
+
+
 @bp_personnels.get("/<int:idpersonnel>")
 @swag_from({
     "tags": ["personnels"],
@@ -245,7 +259,7 @@ def create_personnel():
     if err:
         return jsonify({"detail": err}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             INSERT INTO personnel (
                 idsoumission,
@@ -272,10 +286,11 @@ def create_personnel():
             "type_personnel": body.get("type_personnel"),
         },
     )
-    db.session.commit()
 
-    new_id = db.session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
+    new_id = res.lastrowid
+    search.reindex(db.session, "personnel", [int(new_id)])
     out = _get_one(int(new_id))
+    db.session.commit()
     return jsonify(out), 201
 
 
@@ -302,7 +317,8 @@ def create_personnel():
     **SWAGGER_DEFS
 })
 def update_personnel(idpersonnel: int):
-    if not _get_one(idpersonnel):
+    current = _get_one(idpersonnel)
+    if not current:
         return jsonify({"detail": "Personnel introuvable."}), 404
 
     body = request.get_json(silent=True) or {}
@@ -310,7 +326,6 @@ def update_personnel(idpersonnel: int):
     if err:
         return jsonify({"detail": err}), 400
 
-    current = _get_one(idpersonnel)
     merged = {
         "idsoumission": body.get("idsoumission", current["idsoumission"]),
         "nom_personnel": body.get("nom_personnel", current["nom_personnel"]),
@@ -333,8 +348,10 @@ def update_personnel(idpersonnel: int):
         """),
         {"id": idpersonnel, **merged},
     )
+    search.reindex(db.session, "personnel", [idpersonnel])
+    out = _get_one(idpersonnel)
     db.session.commit()
-    return jsonify(_get_one(idpersonnel))
+    return jsonify(out)
 
 
 @bp_personnels.delete("/<int:idpersonnel>")
@@ -364,6 +381,7 @@ def delete_personnel(idpersonnel: int):
         text("DELETE FROM personnel WHERE idpersonnel = :id"),
         {"id": idpersonnel},
     )
+    search.unindex(db.session, "personnel", [idpersonnel])
     db.session.commit()
     return jsonify({
         "deleted": res.rowcount > 0,
@@ -5,6 +5,8 @@ from typing import Optional, Dict, Any
 from flask import Blueprint, request, jsonify
 from sqlalchemy import text
 from app.extensions import db
+from app.core.cache import response_cache
+from app.core.pagination import keyset_sql, page_payload
 from flasgger import swag_from
 
 bp_procedures = Blueprint(
@@ -13,20 +15,21 @@ bp_procedures = Blueprint(
     url_prefix="/api/v1/procedures",
 )
 
+response_cache.writes(bp_procedures, "procedure_table")
+
 # ───────────────────────── SQL helpers ─────────────────────────
 
 _SQL_SELECT = """
 SELECT
   p.idprocedure,
   p.type_procedure,
-  COALESCE(COUNT(c.idcommande), 0) AS nb_commandes
+  p.nb_commandes
 FROM procedure_table p
-LEFT JOIN commande c ON c.idprocedure = p.idprocedure
 """
 
 def _one(pid: int) -> Optional[Dict[str, Any]]:
     row = db.session.execute(
-        text(_SQL_SELECT + " WHERE p.idprocedure = :id GROUP BY p.idprocedure"),
+        text(_SQL_SELECT + " WHERE p.idprocedure = :id"),
         {"id": pid},
     ).mappings().fetchone()
     return dict(row) if row else None
@@ -65,6 +68,7 @@ ProcedureExample = {"type_procedure": "Appel d'offres ouvert"}
         {"in": "query", "name": "q", "schema": {"type": "string"}, "description": "Recherche partielle sur type_procedure"},
         {"in": "query", "name": "skip", "schema": {"type": "integer"}, "default": 0},
         {"in": "query", "name": "limit", "schema": {"type": "integer", "maximum": 500}, "default": 100},
+        {"in": "query", "name": "cursor", "schema": {"type": "string"}, "description": "Pagination par curseur (vide pour la 1re page) ; renvoie {items, next_cursor}"},
     ],
     "responses": {
         "200": {"description": "Successful Response",
@@ -73,8 +77,6 @@ ProcedureExample = {"type_procedure": "Appel d'offres ouvert"}
 })
 def list_procedures():
     q = request.args.get("q")
-    skip = request.args.get("skip", default=0, type=int)
-    limit = min(request.args.get("limit", default=100, type=int), 500)
 
     sql = _SQL_SELECT + " WHERE 1=1"
     params: Dict[str, Any] = {}
@@ -83,11 +85,10 @@ def list_procedures():
         sql += " AND p.type_procedure LIKE :q"
         params["q"] = f"%{q}%"
 
-    sql += " GROUP BY p.idprocedure ORDER BY p.idprocedure DESC LIMIT :limit OFFSET :skip"
-    params.update({"limit": limit, "skip": skip})
+    sql, params, page = keyset_sql(sql, params, request.args, id_col="p.idprocedure")
 
     rows = db.session.execute(text(sql), params).mappings().all()
-    return jsonify([dict(r) for r in rows])
+    return jsonify(page_payload([dict(r) for r in rows], page))
 
 
 @bp_procedures.get("/<int:idprocedure>")
@@ -132,14 +133,14 @@ def create_procedure():
     if not type_proc:
         return jsonify({"detail": "type_procedure est obligatoire."}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("INSERT INTO procedure_table (type_procedure) VALUES (:type_procedure)"),
         {"type_procedure": type_proc},
     )
-    db.session.commit()
 
-    new_id = db.session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
+    new_id = res.lastrowid
     out = _one(int(new_id))
+    db.session.commit()
     return jsonify(out), 201
 
 
@@ -161,15 +162,12 @@ def create_procedure():
     }
 })
 def update_procedure(idprocedure: int):
-    if not _one(idprocedure):
-        return jsonify({"detail": "Procédure introuvable."}), 404
-
     body = request.get_json(silent=True) or {}
     type_proc = (body.get("type_procedure") or "").strip()
     if not type_proc:
         return jsonify({"detail": "type_procedure est obligatoire."}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             UPDATE procedure_table
                SET type_procedure = :type_procedure
@@ -177,8 +175,12 @@ def update_procedure(idprocedure: int):
         """),
         {"type_procedure": type_proc, "id": idprocedure},
     )
+    if res.rowcount == 0:
+        db.session.rollback()
+        return jsonify({"detail": "Procédure introuvable."}), 404
+    out = _one(idprocedure)
     db.session.commit()
-    return jsonify(_one(idprocedure))
+    return jsonify(out)
 
 
 @bp_procedures.delete("/<int:idprocedure>")
@@ -2,11 +2,15 @@
 from flask import Blueprint, request, jsonify
 from sqlalchemy import text
 from ..extensions import db
+from ..core.cache import response_cache
+from ..core.fk import FkRef, fk_detail, missing_fks
 
 programmations_bp = Blueprint(
     "programmations", __name__, url_prefix="/api/v1/programmations"
 )
 
+response_cache.writes(programmations_bp, "programmation")
+
 # -------------------------
 # SQL commun (identique FastAPI)
 # -------------------------
@@ -30,23 +34,14 @@ def _one_join(idprog: int):
     return dict(row) if row else None
 
 def _validate_fk(idactivite, idexercice_budgetaire):
-    # Exercice obligatoire
-    ex_ok = db.session.execute(
-        text("SELECT 1 FROM exercice_budgetaire WHERE idexercice_budgetaire=:id LIMIT 1"),
-        {"id": idexercice_budgetaire},
-    ).first()
-    if not ex_ok:
-        return {"detail": "exercice_budgetaire inexistant."}, 400
-
-    # Activité optionnelle (LEFT JOIN côté SQL)
-    if idactivite is not None:
-        act_ok = db.session.execute(
-            text("SELECT 1 FROM activite WHERE idactivite=:id LIMIT 1"),
-            {"id": idactivite},
-        ).first()
-        if not act_ok:
-            return {"detail": "activite inexistante."}, 400
-
+    # Exercice obligatoire (entier vérifié par l'appelant), activité optionnelle
+    missing = missing_fks(db.session, [
+        FkRef("exercice_budgetaire", "idexercice_budgetaire", idexercice_budgetaire,
+              "exercice_budgetaire inexistant."),
+        FkRef("activite", "idactivite", idactivite, "activite inexistante."),
+    ])
+    if missing:
+        return {"detail": fk_detail(missing)}, 400
     return None, None
 
 def _require_json():
@@ -195,17 +190,17 @@ def create_programmation():
     if msg:
         return jsonify(msg), code
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             INSERT INTO programmation (idactivite, idexercice_budgetaire)
             VALUES (:idactivite, :idex)
         """),
         {"idactivite": idactivite, "idex": idex},
     )
-    db.session.commit()
-    new_id = db.session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
+    new_id = res.lastrowid
 
     row = _one_join(int(new_id))
+    db.session.commit()
     return jsonify(row), 201
 
 # -------------------------
@@ -243,14 +238,6 @@ def update_programmation(idprogrammation: int):
       422:
         description: Validation Error
     """
-    # existe ?
-    exists = db.session.execute(
-        text("SELECT 1 FROM programmation WHERE idprogrammation=:id LIMIT 1"),
-        {"id": idprogrammation},
-    ).first()
-    if not exists:
-        return jsonify({"detail": "Programmation introuvable."}), 404
-
     data, err = _require_json()
     if err:
         return err
@@ -264,7 +251,7 @@ def update_programmation(idprogrammation: int):
     if msg:
         return jsonify(msg), code
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             UPDATE programmation
                SET idactivite = :idactivite,
@@ -273,9 +260,13 @@ def update_programmation(idprogrammation: int):
         """),
         {"id": idprogrammation, "idactivite": idactivite, "idex": idex},
     )
-    db.session.commit()
+    # rowcount = lignes trouvées (le dialecte MySQL active FOUND_ROWS) : pas de SELECT préalable
+    if res.rowcount == 0:
+        db.session.rollback()
+        return jsonify({"detail": "Programmation introuvable."}), 404
 
     row = _one_join(idprogrammation)
+    db.session.commit()
     return jsonify(row), 200
 
 # -------------------------
@@ -3,6 +3,12 @@ from sqlalchemy import desc,select,text,asc,case,distinct,literal,desc,func
 from ..models import Projet
 from flasgger import Swagger,swag_from
 from ..extensions import db
+from ..core.cache import response_cache
+from ..core import search
+from ..core.suggest import PrefixIndex, suggest_response
+from ..core.pagination import offset_args
+from ..core.query_budget import query_budget
+from ..core.streaming import stream_json_array, wants_stream
 from sqlalchemy.orm import aliased
 from datetime import date
 from calendar import monthrange
@@ -32,6 +38,14 @@ from app.models.responsabilites import Responsabilites
 from app.models.contrat import Contrat
 bp = Blueprint("projets_v1", __name__, url_prefix="/api/v1/projets")
 
+response_cache.reads(bp, "projet", "activite", "implantation", "site", "departement", "couverture", "suivi",
+                     "indicateur", "responsabilites", "personnel", "programmation",
+                     "exercice_budgetaire", "commande", "procedure_table", "soumission",
+                     "soumissionnaire", "contrat")
+response_cache.writes(bp, "projet")
+
+_suggest = PrefixIndex("projet", "idprojet", "code_projet", extra=["initule_projet"])
+
 # Définitions Swagger pour cette entité
 SWAGGER_DEFINITIONS = {
     "Projet": {
@@ -74,6 +88,20 @@ def list_projets_v1():
     ---
     tags:
       - projets
+    parameters:
+      - in: query
+        name: skip
+        type: integer
+        default: 0
+      - in: query
+        name: limit
+        type: integer
+        maximum: 500
+        description: Sans limit, la liste complète est renvoyée
+      - in: query
+        name: stream
+        type: integer
+        description: 1 = tableau JSON écrit au fil de l'eau (lecture par lots)
     responses:
       200:
         description: Successful Response
@@ -82,10 +110,41 @@ def list_projets_v1():
           items:
             $ref: "#/definitions/Projet"
     """
-    rows = Projet.query.order_by(desc(Projet.idprojet)).all()
+    skip, limit = offset_args(request.args)
+    stmt = select(Projet).order_by(desc(Projet.idprojet)).offset(skip).limit(limit)
+    if wants_stream(request.args):
+        return stream_json_array(stmt, Projet.to_dict)
+
+    rows = db.session.execute(stmt).scalars().all()
     return jsonify([r.to_dict() for r in rows]), 200
 
 # ---------- GET /api/v1/projets/{project_id} ----------
+@bp.get("/suggest")
+def suggest_projets():
+    """
+    Suggest (autocomplétion)
+    ---
+    tags: [projets]
+    parameters:
+      - in: query
+        name: prefix
+        required: true
+        type: string
+        description: Préfixe d'un mot du libellé (sans accents ni casse)
+      - in: query
+        name: limit
+        type: integer
+        default: 10
+        maximum: 50
+    responses:
+      200:
+        description: Éléments correspondants (id + libellé)
+        examples:
+          application/json: [{"idprojet": 1, "code_projet": "PRJ-001", "initule_projet": "Forages Nord"}]
+    """
+    return suggest_response(_suggest)
+
+
 @bp.get("/<int:project_id>")
 def get_projet(project_id: int):
     """
@@ -114,6 +173,7 @@ def get_projet(project_id: int):
     return jsonify(projet.to_dict()), 200
 
 @bp.get("/<int:project_id>/activites")
+@query_budget(2)
 @swag_from({
     "tags": ["projets"],
     "summary": "Project Activities",
@@ -175,6 +235,7 @@ def project_activities(project_id: int):
 
 
 @bp.get("/activites/<int:activite_id>/implantations")
+@query_budget(2)
 @swag_from({
     "tags": ["projets"],
     "summary": "Project Activite Implantations",
@@ -226,6 +287,7 @@ def project_activite_implantations(activite_id: int):
 
 
 @bp.get("/activites/<int:activite_id>/suivi")
+@query_budget(2)
 def get_activite_suivi(activite_id: int):
     """
     Retourne, pour une activité donnée, la liste des indicateurs
@@ -313,7 +375,31 @@ def _diff_months_days(d1: date, d2: date) -> tuple[int, int]:
     days = (d2 - anchor_date).days
     return months, days
 
+def _responsable_to_dict(r, today: date) -> dict:
+    """Sérialise une ligne personnel/responsabilité avec le statut de durée calculé."""
+    debut = r.date_debut_act
+    fin = r.date_fin_act
+    if debut:
+        end_ref = fin or today
+        m, d = _diff_months_days(debut, end_ref)
+        prefix = "Complétée après " if fin else "En cours depuis "
+        statut = f"{prefix}{m} mois" + (f" et {d} jours" if d > 0 else "")
+    else:
+        statut = None
+
+    return {
+        "nom_personnel": r.nom_personnel,
+        "fonction": r.fonction,
+        "email": r.email,
+        "telephone": r.telephone,
+        "type": r.type,
+        "date_debut_act": debut.isoformat() if debut else None,
+        "date_fin_act": fin.isoformat() if fin else None,
+        "statut_duree": statut,
+    }
+
 @bp.get("/activites/<int:activite_id>/responsables")
+@query_budget(2)
 @swag_from({
     "tags": ["projets"],
     "summary": "Project Activite Responsables",
@@ -382,33 +468,26 @@ def project_activite_responsables(activite_id: int):
 
     rows = db.session.execute(stmt).all()
     today = date.today()
-    out = []
-    for r in rows:
-        debut = r.date_debut_act
-        fin = r.date_fin_act
-        if debut:
-            end_ref = fin or today
-            m, d = _diff_months_days(debut, end_ref)
-            prefix = "Complétée après " if fin else "En cours depuis "
-            statut = f"{prefix}{m} mois" + (f" et {d} jours" if d > 0 else "")
-        else:
-            statut = None
-
-        out.append({
-            "nom_personnel": r.nom_personnel,
-            "fonction": r.fonction,
-            "email": r.email,
-            "telephone": r.telephone,
-            "type": r.type,
-            "date_debut_act": debut.isoformat() if debut else None,
-            "date_fin_act": fin.isoformat() if fin else None,
-            "statut_duree": statut,
-        })
+    out = [_responsable_to_dict(r, today) for r in rows]
     return jsonify(out)
 
 
 
+def _exercice_to_dict(r) -> dict:
+    # annee peut être VARCHAR(4) côté DB ; on renvoie un int si possible (comme FastAPI)
+    try:
+        annee_val = int(r.annee) if r.annee is not None else None
+    except ValueError:
+        annee_val = None
+    return {
+        "annee": annee_val,
+        "date_debut_exe": r.date_debut_exe.isoformat() if r.date_debut_exe else None,
+        "date_fin_exe": r.date_fin_exe.isoformat() if r.date_fin_exe else None,
+    }
+
+
 @bp.get("/activites/<int:activite_id>/exercices")
+@query_budget(2)
 def get_api_v1_projets_activites__activite_id__exercices(activite_id: int):
     """
     Project Activite Exercices
@@ -462,25 +541,185 @@ def get_api_v1_projets_activites__activite_id__exercices(activite_id: int):
             .all()
         )
 
-        def _row_to_dict(r):
-            # annee peut être VARCHAR(4) côté DB ; on renvoie un int si possible (comme FastAPI)
-            try:
-                annee_val = int(r.annee) if r.annee is not None else None
-            except ValueError:
-                annee_val = None
-            return {
-                "annee": annee_val,
-                "date_debut_exe": r.date_debut_exe.isoformat() if r.date_debut_exe else None,
-                "date_fin_exe": r.date_fin_exe.isoformat() if r.date_fin_exe else None,
-            }
-
-        payload = [_row_to_dict(r) for r in rows]
+        payload = [_exercice_to_dict(r) for r in rows]
         return jsonify(payload), 200
 
     except Exception:
         # Tu peux logger l'erreur si besoin
         return jsonify({"detail": "Erreur serveur lors du chargement des exercices fiscaux"}), 500
-    
+
+
+def _group_by_activite(rows, serialize) -> dict[int, list]:
+    """Répartit des lignes portant `idactivite` en {idactivite: [dict, ...]} (ordre SQL conservé)."""
+    out: dict[int, list] = {}
+    for r in rows:
+        out.setdefault(r.idactivite, []).append(serialize(r))
+    return out
+
+
+@bp.get("/<int:project_id>/dossier")
+@query_budget(8)
+def get_projet_dossier(project_id: int):
+    """
+    Project Dossier
+    ---
+    tags: [projets]
+    description: >
+      Projet + toutes ses activités, avec pour chacune les sites d'implantation,
+      le suivi des indicateurs, les responsables et les exercices fiscaux.
+      Chaque collection enfant est chargée en une seule requête `idactivite IN (...)`.
+    parameters:
+      - in: path
+        name: project_id
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Successful Response
+        schema:
+          allOf:
+            - $ref: "#/definitions/Projet"
+            - type: object
+              properties:
+                activites:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      idactivite:              {type: integer}
+                      titre_act:               {type: string}
+                      description_act:         {type: string}
+                      dateDemarragePrevue_act: {type: string, format: date}
+                      dateFinPrevue_act:       {type: string, format: date}
+                      implantations:           {type: array, items: {type: object}}
+                      suivi:                   {type: array, items: {type: object}}
+                      responsables:            {type: array, items: {type: object}}
+                      exercices:               {type: array, items: {type: object}}
+      404:
+        description: Project not found
+    """
+    projet = db.session.get(Projet, project_id)
+    if not projet:
+        return jsonify({"detail": "Project not found"}), 404
+
+    # Même tri que /<project_id>/activites
+    nulls_last = case((Activite.dateDemarragePrevue_act.is_(None), 1), else_=0)
+    activites = (
+        Activite.query
+        .filter(Activite.idprojet == project_id)
+        .order_by(nulls_last, Activite.dateDemarragePrevue_act, Activite.idactivite)
+        .all()
+    )
+    ids = [a.idactivite for a in activites]
+
+    implantations: dict[int, list] = {}
+    suivis: dict[int, list] = {}
+    responsables: dict[int, list] = {}
+    exercices: dict[int, list] = {}
+
+    if ids:
+        # Sites (mêmes colonnes que /activites/<id>/implantations)
+        site_nulls_last = case((Site.localite.is_(None), 1), else_=0)
+        rows = (
+            db.session.query(
+                Implantation.idactivite.label("idactivite"),
+                Site.idsite.label("idsite"),
+                Site.localite.label("site"),
+                Departement.departement.label("departement"),
+            )
+            .join(Implantation, Implantation.idsite == Site.idsite)
+            .join(Departement, Departement.iddepartement == Site.iddepartement)
+            .filter(Implantation.idactivite.in_(ids))
+            .order_by(site_nulls_last, Site.localite)
+            .all()
+        )
+        implantations = _group_by_activite(
+            rows, lambda r: {"idsite": r.idsite, "site": r.site, "departement": r.departement}
+        )
+
+        # Indicateurs (mêmes colonnes que /activites/<id>/suivi)
+        statut_expr = case(
+            (Indicateur.niveau_actuel >= Indicateur.niveau_cible, "Atteint"),
+            else_="Pas encore atteint",
+        ).label("statut_indicateur")
+        rows = (
+            db.session.query(
+                Suivi.idactivite.label("idactivite"),
+                Indicateur.libelle_indicateur.label("libelle_indicateur"),
+                Indicateur.niveau_base.label("niveau_base"),
+                Indicateur.niveau_cible.label("niveau_cible"),
+                Indicateur.niveau_actuel.label("niveau_actuel"),
+                statut_expr,
+            )
+            .join(Suivi, Suivi.idindicateur == Indicateur.idindicateur)
+            .filter(Suivi.idactivite.in_(ids))
+            .order_by(Indicateur.libelle_indicateur)
+            .all()
+        )
+        suivis = _group_by_activite(
+            rows,
+            lambda r: {
+                "libelle_indicateur": r.libelle_indicateur,
+                "niveau_base": r.niveau_base,
+                "niveau_cible": r.niveau_cible,
+                "niveau_actuel": r.niveau_actuel,
+                "statut_indicateur": r.statut_indicateur,
+            },
+        )
+
+        # Responsables (mêmes colonnes que /activites/<id>/responsables)
+        stmt = (
+            select(
+                Responsabilites.idactivite.label("idactivite"),
+                Personnel.nom_personnel.label("nom_personnel"),
+                Personnel.fonction_personnel.label("fonction"),
+                Personnel.email_personnel.label("email"),
+                Personnel.telephone_personnel.label("telephone"),
+                Personnel.type_personnel.label("type"),
+                Responsabilites.date_debut_act.label("date_debut_act"),
+                Responsabilites.date_fin_act.label("date_fin_act"),
+            )
+            .join(Responsabilites, Responsabilites.idpersonnel == Personnel.idpersonnel)
+            .where(Responsabilites.idactivite.in_(ids))
+            .order_by(Responsabilites.date_debut_act)
+        )
+        today = date.today()
+        responsables = _group_by_activite(
+            db.session.execute(stmt).all(), lambda r: _responsable_to_dict(r, today)
+        )
+
+        # Exercices (mêmes colonnes que /activites/<id>/exercices)
+        rows = (
+            db.session.query(
+                Programmation.idactivite.label("idactivite"),
+                ExerciceBudgetaire.annee.label("annee"),
+                ExerciceBudgetaire.date_debut_exe.label("date_debut_exe"),
+                ExerciceBudgetaire.date_fin_exe.label("date_fin_exe"),
+            )
+            .distinct()
+            .join(
+                Programmation,
+                Programmation.idexercice_budgetaire == ExerciceBudgetaire.idexercice_budgetaire,
+            )
+            .filter(Programmation.idactivite.in_(ids))
+            .order_by(ExerciceBudgetaire.date_debut_exe)
+            .all()
+        )
+        exercices = _group_by_activite(rows, _exercice_to_dict)
+
+    data = projet.to_dict()
+    data["activites"] = [
+        {
+            **a.to_dict(),
+            "implantations": implantations.get(a.idactivite, []),
+            "suivi": suivis.get(a.idactivite, []),
+            "responsables": responsables.get(a.idactivite, []),
+            "exercices": exercices.get(a.idactivite, []),
+        }
+        for a in activites
+    ]
+    return jsonify(data), 200
+
 
 
 
@@ -955,6 +1194,8 @@ def create_projet():
 
     try:
         db.session.add(projet)
+        db.session.flush()
+        search.reindex(db.session, "projet", [projet.idprojet])
         db.session.commit()
     except IntegrityError as e:
         db.session.rollback()
@@ -1015,6 +1256,8 @@ def update_projet(idprojet: int):
     apply_payload_to_instance(projet, payload, partial=True)
 
     try:
+        db.session.flush()
+        search.reindex(db.session, "projet", [idprojet])
         db.session.commit()
     except IntegrityError as e:
         db.session.rollback()
@@ -1052,5 +1295,6 @@ def delete_projet(idprojet: int):
     if not projet:
         abort(404, description="Projet introuvable.")
     db.session.delete(projet)
+    search.unindex(db.session, "projet", [idprojet])
     db.session.commit()
     return jsonify({"ok": True, "deleted": idprojet}), 200
\ No newline at end of file
@@ -4,6 +4,9 @@ from typing import Optional, Dict, Any, List
 from flask import Blueprint, request, jsonify
 from sqlalchemy import text
 from app.extensions import db
+from app.core.cache import response_cache
+from app.core.pagination import keyset_sql, page_payload
+from app.core.fk import FkRef, fk_detail, missing_fks
 from flasgger import swag_from
 
 bp_responsabilites = Blueprint(
@@ -12,6 +15,8 @@ bp_responsabilites = Blueprint(
     url_prefix="/api/v1/responsabilites",
 )
 
+response_cache.writes(bp_responsabilites, "responsabilites")
+
 # ───────────── Helpers ─────────────
 
 _SQL_SELECT_JOIN = """
@@ -51,21 +56,12 @@ def _get_one(rid: int) -> Optional[Dict[str, Any]]:
     ).mappings().fetchone()
     return _iso_dates(dict(row), ["date_debut_act", "date_fin_act"]) if row else None
 
-def _exists_personnel(idpersonnel: int) -> bool:
-    return bool(
-        db.session.execute(
-            text("SELECT 1 FROM personnel WHERE idpersonnel = :id LIMIT 1"),
-            {"id": idpersonnel},
-        ).first()
-    )
-
-def _exists_activite(idactivite: int) -> bool:
-    return bool(
-        db.session.execute(
-            text("SELECT 1 FROM activite WHERE idactivite = :id LIMIT 1"),
-            {"id": idactivite},
-        ).first()
-    )
+def _fk_error(payload: Dict[str, Any]) -> Optional[str]:
+    missing = missing_fks(db.session, [
+        FkRef("personnel", "idpersonnel", payload.get("idpersonnel"), "idpersonnel inexistant."),
+        FkRef("activite", "idactivite", payload.get("idactivite"), "idactivite inexistante."),
+    ])
+    return fk_detail(missing) if missing else None
 
 def _validate_input(payload: Dict[str, Any]) -> Optional[str]:
     idpersonnel = payload.get("idpersonnel")
@@ -126,6 +122,7 @@ ResponsabiliteExample = {
         {"in": "query", "name": "end_to", "schema": {"type": "string", "format": "date"}, "description": "date_fin_act <= end_to"},
         {"in": "query", "name": "skip", "schema": {"type": "integer"}, "default": 0},
         {"in": "query", "name": "limit", "schema": {"type": "integer", "maximum": 500}, "default": 100},
+        {"in": "query", "name": "cursor", "schema": {"type": "string"}, "description": "Pagination par curseur (vide pour la 1re page) ; renvoie {items, next_cursor}"},
     ],
 })
 def list_responsabilites():
@@ -133,8 +130,6 @@ def list_responsabilites():
     idpersonnel = request.args.get("idpersonnel", type=int)
     start_from = request.args.get("start_from")
     end_to = request.args.get("end_to")
-    skip = request.args.get("skip", default=0, type=int)
-    limit = min(request.args.get("limit", default=100, type=int), 500)
 
     sql = _SQL_SELECT_JOIN + " WHERE 1=1"
     params: Dict[str, Any] = {}
@@ -152,12 +147,11 @@ def list_responsabilites():
         sql += " AND (r.date_fin_act IS NULL OR r.date_fin_act <= :end_to)"
         params["end_to"] = end_to
 
-    sql += " ORDER BY r.idresponsabilites DESC LIMIT :limit OFFSET :skip"
-    params.update({"limit": limit, "skip": skip})
+    sql, params, page = keyset_sql(sql, params, request.args, id_col="r.idresponsabilites")
 
     rows = db.session.execute(text(sql), params).mappings().all()
     data = [_iso_dates(dict(r), ["date_debut_act", "date_fin_act"]) for r in rows]
-    return jsonify(data)
+    return jsonify(page_payload(data, page))
 
 @bp_responsabilites.get("/<int:idresponsabilites>")
 @swag_from({
@@ -190,12 +184,11 @@ def create_responsabilite():
     if msg:
         return jsonify({"detail": msg}), 400
 
-    if not _exists_personnel(body["idpersonnel"]):
-        return jsonify({"detail": "idpersonnel inexistant."}), 400
-    if body.get("idactivite") is not None and not _exists_activite(body["idactivite"]):
-        return jsonify({"detail": "idactivite inexistante."}), 400
+    err = _fk_error(body)
+    if err:
+        return jsonify({"detail": err}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             INSERT INTO responsabilites (
                 idactivite, idpersonnel, date_debut_act, date_fin_act
@@ -208,10 +201,11 @@ def create_responsabilite():
             "date_fin_act": body.get("date_fin_act"),
         },
     )
-    db.session.commit()
 
-    new_id = db.session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
-    return jsonify(_get_one(int(new_id))), 201
+    new_id = res.lastrowid
+    out = _get_one(int(new_id))
+    db.session.commit()
+    return jsonify(out), 201
 
 @bp_responsabilites.put("/<int:idresponsabilites>")
 @swag_from({
@@ -225,20 +219,16 @@ def create_responsabilite():
     ],
 })
 def update_responsabilite(idresponsabilites: int):
-    if not _get_one(idresponsabilites):
-        return jsonify({"detail": "Responsabilite introuvable."}), 404
-
     body = request.get_json(silent=True) or {}
     msg = _validate_input(body)
     if msg:
         return jsonify({"detail": msg}), 400
 
-    if not _exists_personnel(body["idpersonnel"]):
-        return jsonify({"detail": "idpersonnel inexistant."}), 400
-    if body.get("idactivite") is not None and not _exists_activite(body["idactivite"]):
-        return jsonify({"detail": "idactivite inexistante."}), 400
+    err = _fk_error(body)
+    if err:
+        return jsonify({"detail": err}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             UPDATE responsabilites
                SET idactivite = :idactivite,
@@ -255,8 +245,12 @@ def update_responsabilite(idresponsabilites: int):
             "date_fin_act": body.get("date_fin_act"),
         },
     )
+    if res.rowcount == 0:
+        db.session.rollback()
+        return jsonify({"detail": "Responsabilite introuvable."}), 404
+    out = _get_one(idresponsabilites)
     db.session.commit()
-    return jsonify(_get_one(idresponsabilites))
+    return jsonify(out)
 
 @bp_responsabilites.delete("/<int:idresponsabilites>")
 @swag_from({
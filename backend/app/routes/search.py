@@ -0,0 +1,52 @@
+# app/routes/search.py
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+from flasgger import swag_from
+
+from app.extensions import db
+from app.core import search
+from app.core.cache import response_cache
+
+bp_search = Blueprint("search", __name__, url_prefix="/api/v1/search")
+
+# l'index est mis à jour dans la même transaction que les tables sources
+response_cache.reads(bp_search, *(src.table for src in search.SOURCES.values()))
+
+
+@bp_search.get("/")
+@swag_from({
+    "tags": ["search"],
+    "summary": "Recherche globale (projets, activités, personnels, soumissionnaires, commandes, événements, documents)",
+    "parameters": [
+        {"in": "query", "name": "q", "required": True, "type": "string",
+         "description": "Termes (sans accents ni casse, par préfixe) ; tous doivent correspondre"},
+        {"in": "query", "name": "types", "type": "string",
+         "description": "Types séparés par des virgules (défaut : tous)",
+         "example": "projet,commande"},
+        {"in": "query", "name": "limit", "type": "integer", "default": 20, "maximum": 100},
+    ],
+    "responses": {
+        "200": {
+            "description": "Résultats triés par pertinence",
+            "examples": {"application/json": {
+                "q": "forage", "items": [
+                    {"type": "projet", "id": 3, "label": "Forages Nord", "detail": "PRJ-003", "score": 16},
+                    {"type": "commande", "id": 12, "label": "Forage puits", "detail": "Travaux",
+                     "idprojet": 3, "score": 12},
+                ],
+            }},
+        },
+        "400": {"description": "Paramètre invalide"},
+    },
+})
+def global_search():
+    q = (request.args.get("q") or "").strip()
+    types = [t.strip() for t in (request.args.get("types") or "").split(",") if t.strip()]
+    unknown = [t for t in types if t not in search.SOURCES]
+    if unknown:
+        return jsonify({"detail": f"types inconnus : {', '.join(unknown)} (valeurs : {', '.join(search.SOURCES)})"}), 400
+    limit = min(max(request.args.get("limit", default=20, type=int), 1), 100)
+
+    items = search.search_all(db.session, q, types or None, limit) if q else []
+    return jsonify({"q": q, "items": items})
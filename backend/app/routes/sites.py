@@ -2,11 +2,18 @@
 from flask import Blueprint, request, jsonify, abort
 from sqlalchemy import or_
 from ..extensions import db
+from ..core.cache import response_cache
+from ..core.suggest import PrefixIndex, suggest_response
 from ..models.site import Site
 from ..models.departement import Departement
 
 bp = Blueprint("sites", __name__, url_prefix="/api/v1/sites")
 
+response_cache.reads(bp, "site", "departement")
+response_cache.writes(bp, "site")
+
+_suggest = PrefixIndex("site", "idsite", "localite", extra=["iddepartement"])
+
 # --------- helpers ---------
 def site_to_dict(s: Site) -> dict:
     return {
@@ -116,6 +123,33 @@ def create_site():
     return jsonify(site_to_dict(s)), 201
 
 
+# --------- GET /api/v1/sites/suggest ---------
+@bp.get("/suggest")
+def suggest_sites():
+    """
+    Suggest (autocomplétion)
+    ---
+    tags: [sites]
+    parameters:
+      - in: query
+        name: prefix
+        required: true
+        type: string
+        description: Préfixe d'un mot du libellé (sans accents ni casse)
+      - in: query
+        name: limit
+        type: integer
+        default: 10
+        maximum: 50
+    responses:
+      200:
+        description: Éléments correspondants (id + libellé)
+        examples:
+          application/json: [{"idsite": 1, "localite": "Hinche", "iddepartement": 10}]
+    """
+    return suggest_response(_suggest)
+
+
 # --------- GET /api/v1/sites/{idsite} ---------
 @bp.get("/<int:idsite>")
 def get_site(idsite: int):
@@ -6,6 +6,10 @@ from flask import Blueprint, request, jsonify
 from sqlalchemy import text
 from flasgger import swag_from
 from app.extensions import db
+from app.core.cache import response_cache
+from app.core import search
+from app.core.suggest import PrefixIndex, suggest_response, suggest_spec
+from app.core.pagination import keyset_sql, page_payload
 
 bp_soumissionnaires = Blueprint(
     "soumissionnaires",
@@ -13,6 +17,8 @@ bp_soumissionnaires = Blueprint(
     url_prefix="/api/v1/soumissionnaires",
 )
 
+response_cache.writes(bp_soumissionnaires, "soumissionnaire")
+
 # ──────────────────────────────────────────────────────────────────────────────
 # SQL helpers
 # ──────────────────────────────────────────────────────────────────────────────
@@ -26,15 +32,13 @@ SELECT
   s.telephone_soum,
   s.statut_soum,
   s.email_soum,
-  COALESCE(COUNT(so.idsoumission), 0) AS nb_soumissions
+  s.nb_soumissions
 FROM soumissionnaire s
-LEFT JOIN soumission so
-  ON so.idsoumissionnaire = s.idsoumissionnaire
 """
 
 def _one(sid: int) -> Optional[Dict[str, Any]]:
     row = db.session.execute(
-        text(_SQL_SELECT + " WHERE s.idsoumissionnaire = :id GROUP BY s.idsoumissionnaire"),
+        text(_SQL_SELECT + " WHERE s.idsoumissionnaire = :id"),
         {"id": sid},
     ).mappings().fetchone()
     return dict(row) if row else None
@@ -97,6 +101,7 @@ SoumissionnaireCreateExample = {
         },
         {"in": "query", "name": "skip", "schema": {"type": "integer"}, "default": 0},
         {"in": "query", "name": "limit", "schema": {"type": "integer", "maximum": 500}, "default": 100},
+        {"in": "query", "name": "cursor", "schema": {"type": "string"}, "description": "Pagination par curseur (vide pour la 1re page) ; renvoie {items, next_cursor}"},
     ],
     "responses": {
         "200": {
@@ -107,8 +112,6 @@ SoumissionnaireCreateExample = {
 })
 def list_soumissionnaires():
     q = request.args.get("q")
-    skip = request.args.get("skip", default=0, type=int)
-    limit = min(request.args.get("limit", default=100, type=int), 500)
 
     sql = _SQL_SELECT + " WHERE 1=1"
     params: Dict[str, Any] = {}
@@ -126,11 +129,19 @@ def list_soumissionnaires():
         """
         params["q"] = f"%{q}%"
 
-    sql += " GROUP BY s.idsoumissionnaire ORDER BY s.idsoumissionnaire DESC LIMIT :limit OFFSET :skip"
-    params.update({"limit": limit, "skip": skip})
+    sql, params, page = keyset_sql(sql, params, request.args, id_col="s.idsoumissionnaire")
 
     rows = db.session.execute(text(sql), params).mappings().all()
-    return jsonify([dict(r) for r in rows])
+    return jsonify(page_payload([dict(r) for r in rows], page))
+
+
+_suggest = PrefixIndex("soumissionnaire", "idsoumissionnaire", "nom_Soum", extra=["nif_soum"])
+
+
+@bp_soumissionnaires.get("/suggest")
+@swag_from(suggest_spec("soumissionnaires", {"idsoumissionnaire": 4, "nom_Soum": "Forex SA", "nif_soum": "000-123"}))
+def suggest_soumissionnaires():
+    return suggest_response(_suggest)
 
 
 @bp_soumissionnaires.get("/<int:idsoumissionnaire>")
@@ -172,7 +183,7 @@ def create_soumissionnaire():
     if not nom:
         return jsonify({"detail": "nom_Soum est obligatoire."}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             INSERT INTO soumissionnaire
               (nom_Soum, nif_soum, adresse_soum, telephone_soum, statut_soum, email_soum)
@@ -188,9 +199,11 @@ def create_soumissionnaire():
             "email_soum": body.get("email_soum"),
         },
     )
+    new_id = res.lastrowid
+    search.reindex(db.session, "soumissionnaire", [int(new_id)])
+    out = _one(int(new_id))
     db.session.commit()
-    new_id = db.session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
-    return jsonify(_one(int(new_id))), 201
+    return jsonify(out), 201
 
 
 @bp_soumissionnaires.put("/<int:idsoumissionnaire>")
@@ -210,15 +223,12 @@ def create_soumissionnaire():
     }
 })
 def update_soumissionnaire(idsoumissionnaire: int):
-    if not _one(idsoumissionnaire):
-        return jsonify({"detail": "Soumissionnaire introuvable."}), 404
-
     body = request.get_json(silent=True) or {}
     nom = (body.get("nom_Soum") or "").strip()
     if not nom:
         return jsonify({"detail": "nom_Soum est obligatoire."}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             UPDATE soumissionnaire
                SET nom_Soum       = :nom_Soum,
@@ -239,8 +249,13 @@ def update_soumissionnaire(idsoumissionnaire: int):
             "email_soum": body.get("email_soum"),
         },
     )
+    if res.rowcount == 0:
+        db.session.rollback()
+        return jsonify({"detail": "Soumissionnaire introuvable."}), 404
+    search.reindex(db.session, "soumissionnaire", [idsoumissionnaire])
+    out = _one(idsoumissionnaire)
     db.session.commit()
-    return jsonify(_one(idsoumissionnaire))
+    return jsonify(out)
 
 
 @bp_soumissionnaires.delete("/<int:idsoumissionnaire>")
@@ -271,6 +286,7 @@ def delete_soumissionnaire(idsoumissionnaire: int):
         text("DELETE FROM soumissionnaire WHERE idsoumissionnaire = :id"),
         {"id": idsoumissionnaire},
     )
+    search.unindex(db.session, "soumissionnaire", [idsoumissionnaire])
     db.session.commit()
     return jsonify({
         "deleted": res.rowcount > 0,
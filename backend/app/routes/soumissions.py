@@ -5,6 +5,10 @@ from typing import Optional, Dict, Any, List
 from flask import Blueprint, request, jsonify
 from sqlalchemy import text
 from app.extensions import db
+from app.core.cache import response_cache
+from app.core.pagination import keyset_sql, page_payload
+from app.core import counters
+from app.core.fk import FkRef, fk_detail, missing_fks
 from flasgger import swag_from
 from datetime import date, datetime
 
@@ -14,6 +18,8 @@ bp_soumissions = Blueprint(
     url_prefix="/api/v1/soumissions",
 )
 
+response_cache.writes(bp_soumissions, "soumission", "commande", "soumissionnaire")
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────────────────────
@@ -72,21 +78,14 @@ def _one(sid: int) -> Optional[Dict[str, Any]]:
     ).mappings().fetchone()
     return _iso_row(dict(row), ["date_soumission"]) if row else None
 
-def _exists_commande(idcommande: int) -> bool:
-    return bool(
-        db.session.execute(
-            text("SELECT 1 FROM commande WHERE idcommande = :id LIMIT 1"),
-            {"id": idcommande},
-        ).first()
-    )
-
-def _exists_soumissionnaire(idsoumissionnaire: int) -> bool:
-    return bool(
-        db.session.execute(
-            text("SELECT 1 FROM soumissionnaire WHERE idsoumissionnaire = :id LIMIT 1"),
-            {"id": idsoumissionnaire},
-        ).first()
-    )
+def _fk_error(idcommande, idsoumissionnaire) -> Optional[str]:
+    if idcommande is None:
+        return "idcommande inexistant."
+    missing = missing_fks(db.session, [
+        FkRef("commande", "idcommande", idcommande, "idcommande inexistant."),
+        FkRef("soumissionnaire", "idsoumissionnaire", idsoumissionnaire, "idsoumissionnaire inexistant."),
+    ])
+    return fk_detail(missing) if missing else None
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Schemas (réutilisés dans la doc)
@@ -142,6 +141,7 @@ SoumissionCreateExample = {
         {"in": "query", "name": "end_to", "schema": {"type": "string", "format": "date"}, "description": "date_soumission <= end_to"},
         {"in": "query", "name": "skip", "schema": {"type": "integer"}, "default": 0},
         {"in": "query", "name": "limit", "schema": {"type": "integer", "maximum": 500}, "default": 100},
+        {"in": "query", "name": "cursor", "schema": {"type": "string"}, "description": "Pagination par curseur (vide pour la 1re page) ; renvoie {items, next_cursor}"},
     ],
     "responses": {
         "200": {
@@ -156,8 +156,6 @@ def list_soumissions():
     statut = request.args.get("statut")
     start_from = request.args.get("start_from")
     end_to = request.args.get("end_to")
-    skip = request.args.get("skip", default=0, type=int)
-    limit = min(request.args.get("limit", default=100, type=int), 500)
 
     sql = _SQL_JOIN + " WHERE 1=1"
     params: Dict[str, Any] = {}
@@ -178,12 +176,11 @@ def list_soumissions():
         sql += " AND s.date_soumission <= :end_to"
         params["end_to"] = end_to
 
-    sql += " ORDER BY s.idsoumission DESC LIMIT :limit OFFSET :skip"
-    params.update({"limit": limit, "skip": skip})
+    sql, params, page = keyset_sql(sql, params, request.args, id_col="s.idsoumission")
 
     rows = db.session.execute(text(sql), params).mappings().all()
     data = [_iso_row(dict(r), ["date_soumission"]) for r in rows]
-    return jsonify(data)
+    return jsonify(page_payload(data, page))
 
 
 @bp_soumissions.get("/<int:idsoumission>")
@@ -230,14 +227,12 @@ def create_soumission():
     body = request.get_json(silent=True) or {}
 
     idcommande = body.get("idcommande")
-    if idcommande is None or not _exists_commande(idcommande):
-        return jsonify({"detail": "idcommande inexistant."}), 400
-
     idsoumissionnaire = body.get("idsoumissionnaire")
-    if idsoumissionnaire is not None and not _exists_soumissionnaire(idsoumissionnaire):
-        return jsonify({"detail": "idsoumissionnaire inexistant."}), 400
+    err = _fk_error(idcommande, idsoumissionnaire)
+    if err:
+        return jsonify({"detail": err}), 400
 
-    db.session.execute(
+    res = db.session.execute(
         text("""
             INSERT INTO soumission (
                 idsoumissionnaire,
@@ -258,10 +253,11 @@ def create_soumission():
             "statut_soumission": body.get("statut_soumission", "en cours"),
         },
     )
-    db.session.commit()
+    counters.bump("soumission", {"idcommande": idcommande, "idsoumissionnaire": idsoumissionnaire}, +1)
 
-    new_id = db.session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
+    new_id = res.lastrowid
     out = _one(int(new_id))  # _one() renvoie déjà la date normalisée
+    db.session.commit()
     return jsonify(out), 201
 
 
@@ -288,18 +284,17 @@ def create_soumission():
     }
 })
 def update_soumission(idsoumission: int):
-    if not _one(idsoumission):
+    old = _one(idsoumission)
+    if not old:
         return jsonify({"detail": "Soumission introuvable."}), 404
 
     body = request.get_json(silent=True) or {}
 
     idcommande = body.get("idcommande")
-    if idcommande is None or not _exists_commande(idcommande):
-        return jsonify({"detail": "idcommande inexistant."}), 400
-
     idsoumissionnaire = body.get("idsoumissionnaire")
-    if idsoumissionnaire is not None and not _exists_soumissionnaire(idsoumissionnaire):
-        return jsonify({"detail": "idsoumissionnaire inexistant."}), 400
+    err = _fk_error(idcommande, idsoumissionnaire)
+    if err:
+        return jsonify({"detail": err}), 400
 
     db.session.execute(
         text("""
@@ -318,8 +313,10 @@ def update_soumission(idsoumission: int):
             "statut_soumission": body.get("statut_soumission", "en cours"),
         },
     )
+    counters.move("soumission", old, {"idcommande": idcommande, "idsoumissionnaire": idsoumissionnaire})
+    out = _one(idsoumission)  # normalisé
     db.session.commit()
-    return jsonify(_one(idsoumission))  # normalisé
+    return jsonify(out)
 
 
 @bp_soumissions.delete("/<int:idsoumission>")
@@ -336,10 +333,16 @@ def update_soumission(idsoumission: int):
     }
 })
 def delete_soumission(idsoumission: int):
+    row = db.session.execute(
+        text("SELECT idcommande, idsoumissionnaire FROM soumission WHERE idsoumission = :id"),
+        {"id": idsoumission},
+    ).mappings().fetchone()
     res = db.session.execute(
         text("DELETE FROM soumission WHERE idsoumission = :id"),
         {"id": idsoumission},
     )
+    if row and res.rowcount == 1:      # DELETE concurrent : un seul décrémente
+        counters.bump("soumission", row, -1)
     db.session.commit()
     if res.rowcount == 0:
         return jsonify("Aucune ligne supprimée."), 404
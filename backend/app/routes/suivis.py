@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from flasgger import swag_from
 from sqlalchemy.orm import joinedload
 from ..extensions import db
+from ..core.cache import response_cache
 from ..models.suivi import Suivi
 from ..models.indicateur import Indicateur
 # Optionnel mais recommandé si tu veux renvoyer titre_act / code_projet
@@ -10,6 +11,8 @@ from ..models.activite import Activite  # assure-toi que le modèle existe
 
 suivis_bp = Blueprint("suivis_v1", __name__, url_prefix="/api/v1/suivis")
 
+response_cache.writes(suivis_bp, "suivi")
+
 # --------- Utils ---------
 def _serialize_suivi(s: Suivi) -> dict:
     libelle_indic = None
@@ -2,11 +2,14 @@
 from flask import Blueprint, jsonify, request
 from sqlalchemy import text
 from ..extensions import db
+from ..core.cache import response_cache
 
 transactions_bp = Blueprint(
     "transactions", __name__, url_prefix="/api/v1/transactions"
 )
 
+response_cache.reads(transactions_bp, "transaction", "personnel", "activite")
+
 @transactions_bp.route("/projets/<int:idprojet>/transactions", methods=["GET"])
 def list_transactions_by_project(idprojet: int):
     """
@@ -9,9 +9,17 @@ from sqlalchemy.orm import Session
 from flasgger import swag_from
 
 from ..extensions import db  # db.session
+from ..core.cache import response_cache
+from app.core.pagination import keyset_sql, page_payload
+from app.core import bulk, rollup
+from app.core.fk import FkRef, fk_detail, missing_fks
 
 bp_transactions = Blueprint("transaction", __name__, url_prefix="/api/v1/transactions")
 
+response_cache.reads(bp_transactions, "transaction", "transaction_rollup", "personnel", "activite", "projet",
+                     "programmation", "exercice_budgetaire")
+response_cache.writes(bp_transactions, "transaction", "transaction_rollup")
+
 # ------------------------ Normalisation des dates -----------------------------
 
 def _to_iso_date(v) -> Optional[str]:
@@ -69,6 +77,17 @@ def _one_join(session: Session, idtrans: int) -> Dict[str, Any]:
         return {}
     return _iso_row(dict(row), ["date_transaction"])
 
+def _rollup_row(session: Session, idtrans: int) -> Optional[Dict[str, Any]]:
+    """Colonnes utiles au rollup (état avant UPDATE / DELETE)."""
+    row = session.execute(
+        text("""
+            SELECT idprojet, idactivite, date_transaction, devise, montant_transaction
+              FROM transaction WHERE idtransaction = :id
+        """),
+        {"id": idtrans},
+    ).mappings().first()
+    return dict(row) if row else None
+
 def _decimal_or_400(v: Any, field: str) -> Decimal:
     from werkzeug.exceptions import BadRequest
     try:
@@ -80,28 +99,59 @@ def raise_bad_request(msg: str):
     from werkzeug.exceptions import BadRequest
     raise BadRequest(description=msg)
 
+def _fk_refs(payload: Dict[str, Any]) -> List[FkRef]:
+    return [
+        FkRef("personnel", "idpersonnel", payload.get("idpersonnel"), "personnel inexistant."),
+        FkRef("activite", "idactivite", payload.get("idactivite"), "activite inexistante."),
+        FkRef("projet", "idprojet", payload.get("idprojet"), "projet inexistant."),
+    ]
+
 def _validate_fk(session: Session, payload: Dict[str, Any]) -> None:
-    if payload.get("idpersonnel") is not None:
-        ok = session.execute(
-            text("SELECT 1 FROM personnel WHERE idpersonnel=:id LIMIT 1"),
-            {"id": payload["idpersonnel"]},
-        ).first()
-        if not ok:
-            raise_bad_request("personnel inexistant.")
-    if payload.get("idactivite") is not None:
-        ok = session.execute(
-            text("SELECT 1 FROM activite WHERE idactivite=:id LIMIT 1"),
-            {"id": payload["idactivite"]},
-        ).first()
-        if not ok:
-            raise_bad_request("activite inexistante.")
-    if payload.get("idprojet") is not None:
-        ok = session.execute(
-            text("SELECT 1 FROM projet WHERE idprojet=:id LIMIT 1"),
-            {"id": payload["idprojet"]},
-        ).first()
-        if not ok:
-            raise_bad_request("projet inexistant.")
+    missing = missing_fks(session, _fk_refs(payload))
+    if missing:
+        raise_bad_request(fk_detail(missing))
+
+_COLUMNS = (
+    "idpersonnel", "idactivite", "montant_transaction", "type_transaction",
+    "receveur_type", "type_paiement", "date_transaction", "commentaire",
+    "devise", "idprojet",
+)
+
+_INSERT = text("""
+    INSERT INTO transaction(
+        idpersonnel, idactivite, montant_transaction, type_transaction,
+        receveur_type, type_paiement, date_transaction, commentaire,
+        devise, idprojet
+    ) VALUES (
+        :idpersonnel, :idactivite, :montant_transaction, :type_transaction,
+        :receveur_type, :type_paiement, :date_transaction, :commentaire,
+        :devise, :idprojet
+    )
+""")
+
+def _prepare_transaction(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Valide et normalise une transaction à créer (BadRequest si invalide)."""
+    if "montant_transaction" not in payload:
+        raise_bad_request("montant_transaction est obligatoire.")
+    montant = _decimal_or_400(payload.get("montant_transaction"), "montant_transaction")
+    if not montant.is_finite():
+        raise_bad_request("montant_transaction doit être un nombre valide.")
+    if montant < 0:
+        raise_bad_request("montant_transaction doit être >= 0")
+    # colonnes NOT NULL : une seule ligne invalide ferait échouer tout un paquet d'INSERT (bulk)
+    for k in ("devise", "date_transaction"):
+        if payload.get(k) is None or str(payload.get(k)).strip() == "":
+            raise_bad_request(f"{k} est obligatoire.")
+    date_iso = _to_iso_date(payload.get("date_transaction"))
+    try:
+        date.fromisoformat(date_iso)
+    except ValueError:
+        raise_bad_request("date_transaction doit être au format YYYY-MM-DD.")
+
+    row = {k: payload.get(k) for k in _COLUMNS}
+    row["montant_transaction"] = str(montant)
+    row["date_transaction"] = date_iso
+    return row
 
 # ------------------------ Specs Swagger (dicts Python) ------------------------
 
@@ -119,7 +169,7 @@ _body_schema = {
         "devise":              {"type": "string"},
         "idprojet":            {"type": "integer"},
     },
-    "required": ["montant_transaction"],
+    "required": ["montant_transaction", "devise", "date_transaction"],
 }
 
 spec_list_by_project = {
@@ -148,6 +198,10 @@ spec_list = {
         {"in": "query", "name": "date_to",   "type": "string", "description": "YYYY-MM-DD"},
         {"in": "query", "name": "skip", "type": "integer", "default": 0},
         {"in": "query", "name": "limit","type": "integer", "default": 100},
+        {"in": "query", "name": "cursor", "type": "string",
+         "description": "Pagination par curseur (vide pour la 1re page) ; renvoie {items, next_cursor}"},
+        {"in": "query", "name": "sort", "type": "string", "enum": ["idtransaction", "date_transaction"],
+         "default": "idtransaction", "description": "Clé de tri (toujours DESC)"},
     ],
     "responses": {"200": {"description": "Successful Response"}}
 }
@@ -165,6 +219,29 @@ spec_post = {
     "responses": {"201": {"description": "Created"}, "400": {"description": "Validation error"}}
 }
 
+spec_bulk = {
+    "tags": ["transaction"],
+    "summary": "Création en lot (executemany, FK vérifiées en une requête)",
+    "consumes": ["application/json"],
+    "parameters": [
+        {"in": "query", "name": "mode", "type": "string", "enum": ["atomic", "partial"], "default": "atomic",
+         "description": "atomic : tout ou rien ; partial : insère les lignes valides"},
+        {"in": "body", "name": "payload", "required": True,
+         "schema": {"type": "array", "maxItems": 1000, "items": _body_schema}},
+    ],
+    "responses": {
+        "201": {
+            "description": "Résultat par ligne",
+            "examples": {"application/json": {
+                "mode": "partial", "created": 1, "failed": 1,
+                "results": [{"index": 0, "id": 42, "error": None},
+                            {"index": 1, "id": None, "error": "projet inexistant."}],
+            }},
+        },
+        "400": {"description": "Lot invalide (mode atomic : rien n'est inséré)"},
+    },
+}
+
 spec_put = {
     "tags": ["transaction"],
     "consumes": ["application/json"],
@@ -185,6 +262,26 @@ spec_delete = {
     "responses": {"200": {"description": "Successful Response"}}
 }
 
+spec_execution = {
+    "tags": ["transaction"],
+    "summary": "Exécution budgétaire d'un projet (budget vs dépenses)",
+    "parameters": [{"in": "path", "name": "idprojet", "required": True, "type": "integer"}],
+    "responses": {
+        "200": {
+            "description": "Totaux par devise, activité, exercice budgétaire et mois",
+            "examples": {"application/json": {
+                "idprojet": 1, "budget_previsionnel": 1000000.0, "devise": "HTG",
+                "depense": 250000.0, "taux_execution": 0.25,
+                "par_devise": [{"devise": "HTG", "total": 250000.0, "nb": 12}],
+                "par_activite": [{"idactivite": 3, "titre_act": "Forage", "devise": "HTG", "total": 250000.0, "nb": 12}],
+                "par_exercice": [{"idexercice_budgetaire": 2, "annee": "2025", "devise": "HTG", "total": 250000.0, "nb": 12}],
+                "par_mois": [{"mois": "2025-03", "devise": "HTG", "total": 250000.0, "nb": 12}],
+            }},
+        },
+        "404": {"description": "Projet introuvable."},
+    },
+}
+
 # ------------------------------- Endpoints ------------------------------------
 
 @bp_transactions.get("/projets/<int:idprojet>/transactions")
@@ -236,6 +333,91 @@ def list_transactions_by_project(idprojet: int):
     rows = session.execute(sql, {"pid": idprojet}).mappings().all()
     return jsonify([_iso_row(dict(r), ["date_transaction"]) for r in rows])
 
+def _add(acc: Dict[Any, Dict[str, Any]], key: tuple, base: Dict[str, Any], total: Decimal, nb: int) -> None:
+    cur = acc.setdefault(key, dict(base, total=Decimal("0"), nb=0))
+    cur["total"] += total
+    cur["nb"] += nb
+
+def _rollup_out(acc: Dict[Any, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [dict(v, total=float(v["total"])) for v in acc.values()]
+
+@bp_transactions.get("/projets/<int:idprojet>/execution")
+@swag_from(spec_execution)
+def get_projet_execution(idprojet: int):
+    session: Session = db.session
+    projet = session.execute(
+        text("SELECT idprojet, budget_previsionnel, devise FROM projet WHERE idprojet = :id"),
+        {"id": idprojet},
+    ).mappings().first()
+    if not projet:
+        return jsonify({"detail": "Projet introuvable."}), 404
+
+    rows = session.execute(
+        text("""
+            SELECT r.idactivite, r.mois, r.devise, r.total, r.nb, a.titre_act
+              FROM transaction_rollup r
+              LEFT JOIN activite a ON a.idactivite = r.idactivite
+             WHERE r.idprojet = :id
+             ORDER BY r.mois, r.idactivite, r.devise
+        """),
+        {"id": idprojet},
+    ).mappings().all()
+
+    # exercices programmés par activité (via programmation)
+    progs: Dict[int, List[Dict[str, Any]]] = {}
+    for p in session.execute(
+        text("""
+            SELECT pg.idactivite, e.idexercice_budgetaire, e.annee, e.date_debut_exe, e.date_fin_exe
+              FROM programmation pg
+              JOIN activite a             ON a.idactivite = pg.idactivite
+              JOIN exercice_budgetaire e  ON e.idexercice_budgetaire = pg.idexercice_budgetaire
+             WHERE a.idprojet = :id
+        """),
+        {"id": idprojet},
+    ).mappings():
+        progs.setdefault(p["idactivite"], []).append({
+            "idexercice_budgetaire": p["idexercice_budgetaire"],
+            "annee": str(p["annee"]),
+            "debut": _to_iso_date(p["date_debut_exe"])[:7],
+            "fin": _to_iso_date(p["date_fin_exe"])[:7],
+        })
+
+    par_devise: Dict[Any, Dict[str, Any]] = {}
+    par_activite: Dict[Any, Dict[str, Any]] = {}
+    par_exercice: Dict[Any, Dict[str, Any]] = {}
+    par_mois: Dict[Any, Dict[str, Any]] = {}
+
+    for r in rows:
+        total, nb, dev = Decimal(str(r["total"])), int(r["nb"]), r["devise"]
+        idact = r["idactivite"] or None
+        _add(par_devise, (dev,), {"devise": dev}, total, nb)
+        _add(par_activite, (idact, dev),
+             {"idactivite": idact, "titre_act": r["titre_act"] if idact else None, "devise": dev}, total, nb)
+        _add(par_mois, (r["mois"], dev), {"mois": r["mois"], "devise": dev}, total, nb)
+
+        exe = next((e for e in progs.get(idact, []) if e["debut"] <= r["mois"] <= e["fin"]), None)
+        exe_base = {
+            "idexercice_budgetaire": exe["idexercice_budgetaire"] if exe else None,
+            "annee": exe["annee"] if exe else None,
+            "devise": dev,
+        }
+        _add(par_exercice, (exe_base["idexercice_budgetaire"], dev), exe_base, total, nb)
+
+    budget = float(projet["budget_previsionnel"] or 0)
+    devise = projet["devise"]
+    depense = float(par_devise.get((devise,), {}).get("total", 0))
+    return jsonify({
+        "idprojet": idprojet,
+        "budget_previsionnel": budget,
+        "devise": devise,
+        "depense": depense,  # dans la devise du projet uniquement (pas de conversion)
+        "taux_execution": round(depense / budget, 4) if budget > 0 else None,
+        "par_devise": _rollup_out(par_devise),
+        "par_activite": _rollup_out(par_activite),
+        "par_exercice": _rollup_out(par_exercice),
+        "par_mois": _rollup_out(par_mois),
+    })
+
 @bp_transactions.get("/")
 @swag_from(spec_list)
 def list_transactions():
@@ -265,20 +447,23 @@ def list_transactions():
         where.append("t.date_transaction <= :dto")
         params["dto"] = _to_iso_date(date_to)
 
-    limit = min(int(args.get("limit", 100)), 500)
-    skip  = int(args.get("skip", 0))
+    sort = args.get("sort", "idtransaction")
+    if sort not in ("idtransaction", "date_transaction"):
+        raise_bad_request("sort doit être 'idtransaction' ou 'date_transaction'.")
 
     sql = f"""
         {_SQL_JOIN}
         WHERE {" AND ".join(where)}
-        ORDER BY t.idtransaction DESC
-        LIMIT :limit OFFSET :skip
     """
-    params.update({"limit": limit, "skip": skip})
+    sql, params, page = keyset_sql(
+        sql, params, args,
+        id_col="t.idtransaction",
+        sort_col="t.date_transaction" if sort == "date_transaction" else None,
+    )
 
     session: Session = db.session
     rows = session.execute(text(sql), params).mappings().all()
-    return jsonify([_iso_row(dict(r), ["date_transaction"]) for r in rows])
+    return jsonify(page_payload([_iso_row(dict(r), ["date_transaction"]) for r in rows], page))
 
 @bp_transactions.get("/<int:idtransaction>")
 @swag_from(spec_get)
@@ -292,45 +477,33 @@ def get_transaction(idtransaction: int):
 @bp_transactions.post("/")
 @swag_from(spec_post)
 def create_transaction():
-    payload: Dict[str, Any] = request.get_json(silent=True) or {}
-
-    if "montant_transaction" not in payload:
-        raise_bad_request("montant_transaction est obligatoire.")
-    montant = _decimal_or_400(payload.get("montant_transaction"), "montant_transaction")
-    if montant < 0:
-        raise_bad_request("montant_transaction doit être >= 0")
-
-    payload["montant_transaction"] = str(montant)
-    payload["date_transaction"] = _to_iso_date(payload.get("date_transaction"))
+    payload = _prepare_transaction(request.get_json(silent=True) or {})
 
     session: Session = db.session
     _validate_fk(session, payload)
 
-    ins = text("""
-        INSERT INTO transaction(
-            idpersonnel, idactivite, montant_transaction, type_transaction,
-            receveur_type, type_paiement, date_transaction, commentaire,
-            devise, idprojet
-        ) VALUES (
-            :idpersonnel, :idactivite, :montant_transaction, :type_transaction,
-            :receveur_type, :type_paiement, :date_transaction, :commentaire,
-            :devise, :idprojet
-        )
-    """)
-    session.execute(ins, payload)
+    res = session.execute(_INSERT, payload)
+    rollup.apply(session, payload, +1)
+    new_id = res.lastrowid
+    out = _one_join(session, int(new_id))
     session.commit()
-    new_id = session.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().one()["id"]
-    return jsonify(_one_join(session, int(new_id))), 201
+    return jsonify(out), 201
+
+@bp_transactions.post("/bulk")
+@swag_from(spec_bulk)
+def create_transactions_bulk():
+    session: Session = db.session
+    return bulk.run_bulk(
+        session, _INSERT, _prepare_transaction, _fk_refs,
+        after_insert=lambda rows, ids: rollup.apply_many(session, rows),
+    )
 
 @bp_transactions.put("/<int:idtransaction>")
 @swag_from(spec_put)
 def update_transaction(idtransaction: int):
     session: Session = db.session
-    exists = session.execute(
-        text("SELECT 1 FROM transaction WHERE idtransaction=:id LIMIT 1"),
-        {"id": idtransaction},
-    ).first()
-    if not exists:
+    old = _rollup_row(session, idtransaction)
+    if not old:
         return jsonify({"detail": "Transaction introuvable."}), 404
 
     payload: Dict[str, Any] = request.get_json(silent=True) or {}
@@ -362,8 +535,11 @@ def update_transaction(idtransaction: int):
     """)
     payload["id"] = idtransaction
     session.execute(upd, payload)
+    rollup.apply(session, old, -1)
+    rollup.apply(session, payload, +1)
+    out = _one_join(session, idtransaction)
     session.commit()
-    return jsonify(_one_join(session, idtransaction))
+    return jsonify(out)
 
 @bp_transactions.delete("/<int:idtransaction>")
 @swag_from(spec_delete)
@@ -381,10 +557,13 @@ def delete_transaction(idtransaction: int):
             "reason": "Impossible de supprimer : transaction déjà liée à au moins un événement.",
         })
 
+    old = _rollup_row(session, idtransaction)
     res = session.execute(
         text("DELETE FROM transaction WHERE idtransaction = :id"),
         {"id": idtransaction},
     )
+    if res.rowcount > 0:
+        rollup.apply(session, old, -1)
     session.commit()
     return jsonify({
         "deleted": res.rowcount > 0,
@@ -0,0 +1,24 @@
+# gunicorn.conf.py — lu automatiquement par `gunicorn wsgi:app` (Procfile)
+import os
+import shutil
+import tempfile
+
+# Métriques multi-processus (app/core/metrics.py) : chaque worker écrit ses
+# valeurs dans des fichiers mmap de ce répertoire, /metrics les agrège.
+# Défini ici (avant le chargement de l'app, --preload compris).
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "gestionprojet-metrics"))
+
+
+def on_starting(server):
+    # valeurs d'un démarrage précédent : on repart de zéro
+    d = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(d, ignore_errors=True)
+    os.makedirs(d, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)